@@ -1,12 +1,26 @@
 import pytest
 from colorama import Style, init
 from source.helpers.work_with_api import API
+from source.helpers.work_with_session import SessionPool
+from source.helpers.work_with_cassette import Cassette
+from source.helpers.work_with_limiter import AdaptiveLimiter
+from source.helpers.work_with_cache import ResponseCache
+from source.helpers.work_with_bulk import BulkCharacters
+from source.helpers.work_with_asserting_respose import ParseResponse
+from source.helpers.work_with_timing import subscribe, unsubscribe
+from source.helpers import work_with_schema
+from source.emulator.server import CharacterService, CharacterStorage
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
 from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY, DATA_CHANGED_NAME_FOR_PUT, \
     DATA_FOR_MANY_CHARS_MANIPULATIONS, WRONG_ORDER_OF_FIELDS_EXPECTED, DATA_STANDARD_CHARACTER
 from source.data.data_expected_responses import RESPONSE_NO_SUCH_NAME_CHARACTER
 
 init(autoreset=True)
 
+pytest_plugins = ["source.plugins.latency_report", "source.plugins.parallel", "source.plugins.cleanup",
+                  "source.plugins.latency_slo", "source.plugins.durations",
+                  "source.plugins.metrics"]
+
 
 # TODO: Make some cleaning with validation repeating. It hurts my eyes
 
@@ -19,24 +33,28 @@ def printing_fixture_setup_teardown(setup_or_teardown):
     print('-' * 75)
 
 
+def deleting_characters(names, login_auth, password_auth):
+    verified = BulkCharacters(login_auth, password_auth).delete_and_verify(names)
+    if not all(verified.values()):
+        print(f'Characters were NOT deleted: {[name for name, is_ok in verified.items() if not is_ok]}')
+
+
+def creating_characters(data, login_auth, password_auth):
+    verified = BulkCharacters(login_auth, password_auth).create_and_verify(data)
+    if not all(verified.values()):
+        print(f'Characters were NOT posted: {[name for name, is_ok in verified.items() if not is_ok]}')
+
+
 def deleting_character(data, login_auth, password_auth):
-    response = API().delete_character(raw_character_name=data["name"],
-                                      login=login_auth, password=password_auth)
-    if response.compare_status_code(200):
-        validate_response = API().get_character_by_name(raw_character_name=data["name"],
-                                                        login=login_auth,
-                                                        password=password_auth)
-        if not validate_response.compare_body({"error": "No such name"}):
-            print('Characters were NOT deleted!')
+    deleting_characters([data["name"]], login_auth, password_auth)
+
+
+def registering_characters(names):
+    API.cleanup.register(names)
 
 
 def creating_character(data, login_auth, password_auth):
-    response = API().post_character_by_body(json=data, login=login_auth, password=password_auth)
-    if response.compare_status_code(200):
-        validate_response = API().get_character_by_name(raw_character_name=data["name"], login=login_auth,
-                                                        password=password_auth)
-        if not validate_response.compare_status_code(200) or not validate_response.compare_body({"result": data}):
-            print('Characters were NOT posted')
+    creating_characters([data], login_auth, password_auth)
 
 
 def pytest_addoption(parser):
@@ -46,6 +64,145 @@ def pytest_addoption(parser):
     parser.addoption(
         "--password_auth", action="store", default=False, help="The password argument authorization"
     )
+    parser.addoption(
+        "--base_url", action="store", default=None, help="Base URL of the characters service, e.g. "
+                                                          "http://127.0.0.1:8000/v2"
+    )
+    parser.addoption(
+        "--emulator", action="store_true", default=False,
+        help="Run the tests against the in-process emulator of the characters service"
+    )
+    parser.addoption(
+        "--lean_responses", action="store_true", default=False,
+        help="Print data of requests only when a comparison fails"
+    )
+    parser.addoption(
+        "--session_pool", action="store_true", default=False,
+        help="Reuse one shared keep-alive connection pool for all requests of the session"
+    )
+    parser.addoption(
+        "--pool_connections", action="store", type=int, default=10, help="Count of cached per-host pools"
+    )
+    parser.addoption(
+        "--pool_maxsize", action="store", type=int, default=10, help="Max count of connections kept per host"
+    )
+    parser.addoption(
+        "--pool_block", action="store_true", default=False,
+        help="Wait for a free pooled connection instead of opening an extra one"
+    )
+    parser.addoption(
+        "--no_keep_alive", action="store_true", default=False,
+        help="Send 'Connection: close' even in the session pool mode"
+    )
+    parser.addoption(
+        "--adaptive_limit", action="store", type=int, default=None,
+        help="Max count of requests in flight; the AIMD limiter finds the sustainable count below it"
+    )
+    parser.addoption(
+        "--response_cache", action="store", type=int, default=None,
+        help="Answer repeated GET of a character and of the listing from a client cache of this size"
+    )
+    parser.addoption(
+        "--response_cache_ttl", action="store", type=float, default=5.0,
+        help="Lifetime of a cached answer in seconds"
+    )
+    parser.addoption(
+        "--record_cassette", action="store", default=None,
+        help="Write every request and its answer into the cassette file"
+    )
+    parser.addoption(
+        "--replay_cassette", action="store", default=None,
+        help="Take the answers from the cassette file instead of the network"
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("--lean_responses"):
+        ParseResponse.verbose = False
+    if config.getoption("--record_cassette") and config.getoption("--replay_cassette"):
+        raise pytest.UsageError("Use one of --record_cassette and --replay_cassette")
+    if config.getoption("--record_cassette") and getattr(config.option, "numprocesses", None):
+        raise pytest.UsageError("The cassette is recorded by one process only, run it without xdist")
+    if config.getoption("--replay_cassette"):
+        API.cassette = Cassette(config.getoption("--replay_cassette"), mode='replay')
+    elif config.getoption("--emulator"):
+        config.option.login_auth = config.option.login_auth or EMULATOR_LOGIN
+        config.option.password_auth = config.option.password_auth or EMULATOR_PASSWORD
+        config.character_service = CharacterService(login=config.option.login_auth,
+                                                    password=config.option.password_auth).start()
+        API.base_url = config.character_service.base_url
+    elif config.getoption("--base_url"):
+        API.base_url = config.getoption("--base_url").rstrip('/')
+    if config.getoption("--session_pool"):
+        SessionPool.open(pool_connections=config.getoption("--pool_connections"),
+                         pool_maxsize=config.getoption("--pool_maxsize"),
+                         pool_block=config.getoption("--pool_block"),
+                         keep_alive=not config.getoption("--no_keep_alive"))
+    if config.getoption("--record_cassette"):
+        API.cassette = Cassette(config.getoption("--record_cassette"), mode='record')
+    if config.getoption("--adaptive_limit"):
+        API.limiter = AdaptiveLimiter(max_limit=config.getoption("--adaptive_limit"))
+    if config.getoption("--response_cache"):
+        API.cache = ResponseCache(max_size=config.getoption("--response_cache"),
+                                  ttl_s=config.getoption("--response_cache_ttl"),
+                                  listing=getattr(config, 'workerinput', None) is None)
+
+
+def pytest_unconfigure(config):
+    SessionPool.close()
+    if API.cassette is not None:
+        API.cassette.close()
+        API.cassette = None
+    API.limiter = None
+    API.cache = None
+    if getattr(config, "character_service", None) is not None:
+        config.character_service.stop()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if config.getoption("--session_pool"):
+        stats = SessionPool.stats()
+        terminalreporter.section('Session pool')
+        terminalreporter.write_line(f'Requests: {stats["requests"]}; connections opened: {stats["opened"]}; '
+                                    f'connections reused: {stats["reused"]}')
+    if API.limiter is not None:
+        summary = API.limiter.summary()
+        terminalreporter.section('Adaptive limit')
+        terminalreporter.write_line(f'Limit: {summary["limit"]} (seen {summary["min_limit_seen"]}..'
+                                    f'{summary["max_limit_seen"]}); healthy answers: {summary["successes"]}; '
+                                    f'failed or slow answers: {summary["failures"]}')
+    if API.cache is not None:
+        stats = API.cache.stats()
+        terminalreporter.section('Response cache')
+        terminalreporter.write_line(f'Hits: {stats["hits"]}; misses: {stats["misses"]} ({stats["hit_ratio"]:.1%}); '
+                                    f'invalidations: {stats["invalidations"]}; evictions: {stats["evictions"]}; '
+                                    f'expired: {stats["expirations"]}')
+
+
+@pytest.fixture()
+def emulator_service(monkeypatch):
+    """
+    Own emulator with an empty collection of 2 characters for the tests of the client features.
+    'API' is pointed to it with no cassette, cleanup, cache, limiter, namespace, capture and metrics of the session
+    """
+    service = CharacterService(storage=CharacterStorage(default_characters=[], limit=2)).start()
+    monkeypatch.setattr(API, 'base_url', service.base_url)
+    for attribute in ('cassette', 'cleanup', 'cache', 'limiter', 'namespace', 'capture', 'metrics'):
+        monkeypatch.setattr(API, attribute, None)
+    monkeypatch.setattr(work_with_schema, 'metrics', None)
+    yield service
+    service.stop()
+
+
+@pytest.fixture()
+def recorded_timings():
+    """
+    :return: list every 'RequestTiming' of the test is appended to
+    """
+    timings = []
+    subscribe(timings.append)
+    yield timings
+    unsubscribe(timings.append)
 
 
 @pytest.fixture()
@@ -63,7 +220,7 @@ def password_auth(request):
 def delete_several_characters(data, login_auth, password_auth):
     yield
     printing_fixture_setup_teardown('teardown')
-    deleting_character(data, login_auth, password_auth)
+    registering_characters([data["name"]])
     print('-' * 75)
 
 
@@ -93,32 +250,18 @@ def create_n_del_character(login_auth, password_auth):
     print('-' * 75)
     yield
     printing_fixture_setup_teardown('teardown')
-    data_changed = DATA_CHANGED_NAME_FOR_PUT[0]["result"]
-    deleting_character(data_changed, login_auth, password_auth)
+    registering_characters([DATA_CHANGED_NAME_FOR_PUT[0]["result"]["name"]])
     print('-' * 75)
 
 
 @pytest.fixture(scope="function")
 def delete_3_characters_same_time(login_auth, password_auth):
     printing_fixture_setup_teardown('setup')
-    for character in DATA_FOR_MANY_CHARS_MANIPULATIONS:
-        response = API().delete_character(raw_character_name=character["result"]["name"], login=login_auth,
-                                          password=password_auth)
-        if response.compare_status_code(200):
-            validate_response = API().get_character_by_name(raw_character_name=character["result"]["name"],
-                                                            login=login_auth, password=password_auth)
-            if not validate_response.compare_body({"error": "No such name"}):
-                print('Characters were NOT deleted!')
+    names = [character["result"]["name"] for character in DATA_FOR_MANY_CHARS_MANIPULATIONS]
+    deleting_characters(names, login_auth, password_auth)
     yield
     printing_fixture_setup_teardown('teardown')
-    for character in DATA_FOR_MANY_CHARS_MANIPULATIONS:
-        response = API().delete_character(raw_character_name=character["result"]["name"], login=login_auth,
-                                          password=password_auth)
-        if response.compare_status_code(200):
-            validate_response = API().get_character_by_name(raw_character_name=character["result"]["name"],
-                                                            login=login_auth, password=password_auth)
-            if not validate_response.compare_body({"error": "No such name"}):
-                print('Characters were NOT deleted!')
+    registering_characters(names)
     print('-' * 75)
 
 
@@ -130,7 +273,7 @@ def double_delete_character(login_auth, password_auth):
     print('-' * 75)
     yield
     printing_fixture_setup_teardown('teardown')
-    deleting_character(data, login_auth, password_auth)
+    registering_characters([data["name"]])
     print('-' * 75)
 
 
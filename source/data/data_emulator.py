@@ -0,0 +1,64 @@
+EMULATOR_LOGIN = "emulator"
+
+EMULATOR_PASSWORD = "emulator"
+
+EMULATOR_BASE_PATH = "/v2"
+
+EMULATOR_COLLECTION_LIMIT = 500
+
+EMULATOR_FIELD_MAX_LENGTH = 350
+
+EMULATOR_STRING_FIELDS = ("identity", "education", "universe", "name", "other_aliases")
+
+EMULATOR_NUMBER_FIELDS = ("height", "weight")
+
+EMULATOR_RESET_RESULT = {"result": "Database was reset to default"}
+
+EMULATOR_NOT_FOUND = '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 3.2 Final//EN">\n<title>404 Not Found</title>\n' \
+                     '<h1>Not Found</h1>\n<p>The requested URL was not found on the server. If you entered the URL ' \
+                     'manually please check your spelling and try again.</p>\n'
+
+EMULATOR_METHOD_NOT_ALLOWED = '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 3.2 Final//EN">\n<title>405 Method Not ' \
+                              'Allowed</title>\n<h1>Method Not Allowed</h1>\n<p>The method is not allowed for the ' \
+                              'requested URL.</p>\n'
+
+EMULATOR_DEFAULT_CHARACTERS = [
+    {
+        "education": "Unrevealed",
+        "height": 188.0,
+        "identity": "Publicly known",
+        "name": "Captain America",
+        "other_aliases": "Nomad, The Captain",
+        "universe": "Marvel Universe",
+        "weight": 108.0
+    },
+    {
+        "education": "Unrevealed",
+        "height": 198.0,
+        "identity": "Publicly known",
+        "name": "Thor",
+        "other_aliases": "God of Thunder",
+        "universe": "Marvel Universe",
+        "weight": 290.0
+    },
+    {
+        "education": "Ph.D in Nuclear Physics",
+        "height": 244.0,
+        "identity": "Publicly known",
+        "name": "Hulk",
+        "other_aliases": "Green Goliath, Jade Giant",
+        "universe": "Marvel Universe",
+        "weight": 635.0
+    },
+    {
+        "education": "Unrevealed",
+        "height": 170.0,
+        "identity": "Secret",
+        "name": "Black Widow",
+        "universe": "Marvel Universe",
+        "weight": 59.0
+    },
+    {
+        "name": "Doctor Strange"
+    }
+]
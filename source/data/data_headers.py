@@ -1 +1,3 @@
 HEADERS = {"Content-Type": "application/json", "Connection": "close"}
+
+HEADERS_KEEP_ALIVE = {"Content-Type": "application/json", "Connection": "keep-alive"}
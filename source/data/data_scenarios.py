@@ -0,0 +1,38 @@
+from source.helpers.work_with_scenario import Scenario, Step, Ref, ECHO
+from source.data.schema import CHARACTER_SCHEMA, ERROR_SCHEMA, RESULT_SCHEMA
+
+SPIDER_MAN = Ref('DATA_FOR_POST_CHARACTER_BY_BODY', 1)
+
+SPIDER_MAN_CHANGED = Ref('DATA_CHANGED_NAME_FOR_PUT', 0, 'result')
+
+HAWKEYE = Ref('DATA_FOR_POST_CHARACTER_BY_BODY', 0)
+
+WRONG_ORDER = Ref('WRONG_ORDER_OF_FIELDS', 'result')
+
+SCENARIOS = [
+    Scenario('crud', [
+        Step('post', SPIDER_MAN, schema=CHARACTER_SCHEMA, body=ECHO),
+        Step('get', SPIDER_MAN, schema=CHARACTER_SCHEMA, body=ECHO),
+        Step('put', SPIDER_MAN_CHANGED, schema=CHARACTER_SCHEMA, body=ECHO),
+        Step('get', SPIDER_MAN_CHANGED, schema=CHARACTER_SCHEMA, body=ECHO),
+        Step('get_all', SPIDER_MAN_CHANGED, schema=CHARACTER_SCHEMA, listed=True),
+        Step('delete', SPIDER_MAN, schema=RESULT_SCHEMA),
+        Step('get', SPIDER_MAN, status=400, schema=ERROR_SCHEMA, body=Ref('RESPONSE_NO_SUCH_NAME_CHARACTER')),
+    ]),
+    Scenario('create_existing', [
+        Step('post', SPIDER_MAN, schema=CHARACTER_SCHEMA, body=ECHO),
+        Step('post', SPIDER_MAN, status=400, schema=ERROR_SCHEMA, body=Ref('RESPONSE_CHARACTER_CREATED_ALREADY')),
+        Step('delete', SPIDER_MAN, schema=RESULT_SCHEMA),
+    ]),
+    Scenario('double_delete', [
+        Step('post', HAWKEYE, schema=CHARACTER_SCHEMA, body=ECHO),
+        Step('delete', HAWKEYE, schema=RESULT_SCHEMA),
+        Step('delete', HAWKEYE, status=400, schema=ERROR_SCHEMA, body=Ref('RESPONSE_NO_SUCH_NAME_CHARACTER')),
+        Step('get_all', HAWKEYE, schema=CHARACTER_SCHEMA, listed=False),
+    ]),
+    Scenario('wrong_order_of_fields', [
+        Step('post', WRONG_ORDER, schema=CHARACTER_SCHEMA, body=Ref('WRONG_ORDER_OF_FIELDS_EXPECTED')),
+        Step('get', WRONG_ORDER, schema=CHARACTER_SCHEMA, body=Ref('WRONG_ORDER_OF_FIELDS_EXPECTED')),
+        Step('delete', WRONG_ORDER, schema=RESULT_SCHEMA),
+    ]),
+]
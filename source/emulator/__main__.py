@@ -0,0 +1,24 @@
+import argparse
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.emulator.server import CharacterService
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the characters service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--login', default=EMULATOR_LOGIN)
+    parser.add_argument('--password', default=EMULATOR_PASSWORD)
+    args = parser.parse_args()
+    service = CharacterService(host=args.host, port=args.port, login=args.login, password=args.password)
+    print(f'Serving the characters service on {service.base_url}', flush=True)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+import base64
+import binascii
+import json
+import threading
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD, EMULATOR_BASE_PATH, \
+    EMULATOR_COLLECTION_LIMIT, EMULATOR_FIELD_MAX_LENGTH, EMULATOR_STRING_FIELDS, EMULATOR_NUMBER_FIELDS, \
+    EMULATOR_RESET_RESULT, EMULATOR_NOT_FOUND, EMULATOR_METHOD_NOT_ALLOWED, EMULATOR_DEFAULT_CHARACTERS
+from source.data.data_expected_responses import RESPONSE_FULL_DB, RESPONSE_NO_SUCH_NAME_CHARACTER, \
+    RESPONSE_NEEDED_AUTHORIZATION, RESPONSE_SLICE_LOGIN, RESPONSE_INVALID_INPUT, RESPONSE_INVALID_POST_JSON
+
+
+class CharacterStorage(object):
+    """
+    Thread-safe in-memory collection of characters
+    """
+    def __init__(self, default_characters: list = None, limit: int = EMULATOR_COLLECTION_LIMIT):
+        self.default_characters = deepcopy(EMULATOR_DEFAULT_CHARACTERS if default_characters is None
+                                           else default_characters)
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._characters = {}
+        self.reset()
+
+    def reset(self):
+        """
+        Resets characters to default
+        """
+        with self._lock:
+            self._characters = {character["name"]: deepcopy(character) for character in self.default_characters}
+
+    def get(self, name: str) -> dict | None:
+        with self._lock:
+            character = self._characters.get(name)
+            return deepcopy(character) if character is not None else None
+
+    def all(self) -> list:
+        with self._lock:
+            return deepcopy(list(self._characters.values()))
+
+    def create(self, character: dict) -> dict:
+        """
+        :return: error body or None if the character is created
+        """
+        with self._lock:
+            if character["name"] in self._characters:
+                return {"error": f'{character["name"]} is already exists'}
+            if len(self._characters) >= self.limit:
+                return RESPONSE_FULL_DB
+            self._characters[character["name"]] = character
+
+    def update(self, character: dict) -> dict:
+        """
+        :return: error body or None if the character is updated
+        """
+        with self._lock:
+            if character["name"] not in self._characters:
+                return RESPONSE_NO_SUCH_NAME_CHARACTER
+            self._characters[character["name"]] = character
+
+    def delete(self, name: str) -> bool:
+        with self._lock:
+            return self._characters.pop(name, None) is not None
+
+
+def validate_character(payload) -> tuple:
+    """
+    Validates the fields like the real service does
+    :param payload: decoded JSON body
+    :return: (character, None) or (None, error body)
+    """
+    if not isinstance(payload, dict):
+        return None, RESPONSE_INVALID_INPUT
+    errors = []
+    character = {}
+    for field in EMULATOR_STRING_FIELDS:
+        if field not in payload:
+            if field == "name":
+                errors.append(f"{field}: ['Missing data for required field.']")
+            continue
+        value = payload[field]
+        if not isinstance(value, str):
+            errors.append(f"{field}: ['Not a valid string.']")
+        elif not 1 <= len(value) <= EMULATOR_FIELD_MAX_LENGTH:
+            errors.append(f"{field}: ['Length must be between 1 and {EMULATOR_FIELD_MAX_LENGTH}.']")
+        else:
+            character[field] = value
+    for field in EMULATOR_NUMBER_FIELDS:
+        if field not in payload:
+            continue
+        value = payload[field]
+        try:
+            if isinstance(value, bool):
+                raise ValueError
+            character[field] = float(value)
+        except (TypeError, ValueError):
+            errors.append(f"{field}: ['Not a valid number.']")
+    for field in payload:
+        if field not in EMULATOR_STRING_FIELDS and field not in EMULATOR_NUMBER_FIELDS:
+            errors.append(f"{field}: ['Unknown field.']")
+    if errors:
+        return None, {"error": ", ".join(errors)}
+    return dict(sorted(character.items())), None
+
+
+class CharacterRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles requests like the '/v2/character' service
+    """
+    protocol_version = 'HTTP/1.1'
+    server_version = 'nginx'
+    # Headers and body leave in one send, so keep-alive clients do not wait for a delayed ACK
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    sys_version = ''
+
+    def version_string(self):
+        return self.server_version
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, status_code: int, body, content_type: str = 'application/json'):
+        if isinstance(body, str):
+            content = body.encode('utf-8')
+        else:
+            content = (json.dumps(body, sort_keys=True) + '\n').encode('utf-8')
+        keep_alive = self.headers.get('Connection', '').lower() != 'close'
+        self.close_connection = not keep_alive
+        self.send_response(status_code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Connection', 'keep-alive' if keep_alive else 'close')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(content)
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def check_auth(self) -> bool:
+        """
+        Sends the error itself if the credentials are wrong
+        :return: bool value
+        """
+        header = self.headers.get('Authorization', '')
+        login, password = None, None
+        if header.startswith('Basic '):
+            try:
+                login, _, password = base64.b64decode(header[6:]).decode('latin1').partition(':')
+            except (binascii.Error, ValueError):
+                pass
+        if login == '':
+            self.send_body(500, RESPONSE_SLICE_LOGIN, content_type='text/html; charset=utf-8')
+            return False
+        if (login, password) != (self.server.login, self.server.password):
+            self.send_body(401, RESPONSE_NEEDED_AUTHORIZATION)
+            return False
+        return True
+
+    def dispatch(self):
+        split = urlsplit(self.path)
+        route = split.path[len(EMULATOR_BASE_PATH):] if split.path.startswith(EMULATOR_BASE_PATH) else None
+        allowed = {'/character': ('GET', 'POST', 'PUT', 'DELETE'),
+                   '/characters': ('GET', 'HEAD'),
+                   '/reset': ('POST',)}
+        body = self.read_body()
+        if route not in allowed:
+            return self.send_body(404, EMULATOR_NOT_FOUND, content_type='text/html; charset=utf-8')
+        if self.command not in allowed[route]:
+            return self.send_body(405, EMULATOR_METHOD_NOT_ALLOWED, content_type='text/html; charset=utf-8')
+        if not self.check_auth():
+            return
+        storage = self.server.storage
+        if route == '/characters':
+            return self.send_body(200, {"result": storage.all()})
+        if route == '/reset':
+            storage.reset()
+            return self.send_body(200, EMULATOR_RESET_RESULT)
+        name = parse_qs(split.query).get('name', [''])[0]
+        if self.command == 'GET':
+            character = storage.get(name)
+            if character is None:
+                return self.send_body(400, RESPONSE_NO_SUCH_NAME_CHARACTER)
+            return self.send_body(200, {"result": character})
+        if self.command == 'DELETE':
+            if not storage.delete(name):
+                return self.send_body(400, RESPONSE_NO_SUCH_NAME_CHARACTER)
+            return self.send_body(200, {"result": f'Hero {name} is deleted'})
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return self.send_body(400, RESPONSE_INVALID_POST_JSON)
+        character, error = validate_character(payload)
+        if error is None:
+            error = storage.create(character) if self.command == 'POST' else storage.update(character)
+        if error is not None:
+            return self.send_body(400, error)
+        return self.send_body(200, {"result": character})
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = dispatch
+
+
+class CharacterService(ThreadingHTTPServer):
+    """
+    In-process stand-in for the characters service
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, login: str = EMULATOR_LOGIN,
+                 password: str = EMULATOR_PASSWORD, storage: CharacterStorage = None):
+        super().__init__((host, port), CharacterRequestHandler)
+        self.login = login
+        self.password = password
+        self.storage = storage or CharacterStorage()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        :return: URL to use as 'API.base_url'
+        """
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}{EMULATOR_BASE_PATH}'
+
+    def start(self) -> 'CharacterService':
+        """
+        Serves requests in a background thread
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name='character-service', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
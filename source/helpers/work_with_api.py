@@ -1,133 +1,308 @@
+import time
 import requests
-import allure
+from source.helpers import work_with_reporting as reporting
 from source.helpers.work_with_asserting_respose import ParseResponse as Results
-from source.data.data_headers import HEADERS
+from source.helpers.work_with_session import SessionPool, ONE_SHOT_HTTP
+from source.helpers import work_with_phases
+from source.helpers.work_with_stream import CharacterStream
+from source.helpers.work_with_payloads import PreparedPayload
+from source.helpers.work_with_timing import RequestTiming, endpoint_template, publish
 
 
-@allure.title('Общение с API')
+@reporting.title('Общение с API')
 class API(object):
     """
     Class describes working with API
     """
+    base_url = 'http://rest.test.ivi.ru/v2'
+    namespace = None
+    cassette = None
+    limiter = None
+    cleanup = None
+    cache = None
+    capture = None
+    metrics = None
+
     def __init__(self):
-        self.raw_url = 'http://rest.test.ivi.ru/v2/character'
+        self.raw_url = self.base_url + '/character'
+        self.http = SessionPool.current() or ONE_SHOT_HTTP
+        self.headers = SessionPool.headers()
 
-    @allure.step('Создание URL для 1 персонажа')
+    @reporting.step('Создание URL для 1 персонажа')
     def make_url(self, raw_character_name):
         """
         Replaces spaces with a valid symbol
         :param raw_character_name: raw variant of character's name
         :return: legal character's name
         """
+        if self.cleanup is not None:
+            self.cleanup.claim(raw_character_name)
+        if self.namespace is not None:
+            raw_character_name = self.namespace.apply_name(raw_character_name)
         character_name = raw_character_name.replace(' ', '+')
         return self.raw_url + '?name=' + character_name
 
-    @allure.step('Выполнение GET-запроса')
+    def with_body(self, kwargs: dict) -> dict:
+        """
+        'PreparedPayload' of 'json' is sent as its bytes with its headers; in the namespace mode the fields
+        are namespaced and serialized as usual
+        :param kwargs: keyword arguments of the request
+        :return: the same arguments with the headers
+        """
+        payload = kwargs.get('json')
+        if self.cleanup is not None:
+            name = payload.name if isinstance(payload, PreparedPayload) else \
+                payload.get("name") if isinstance(payload, dict) else None
+            self.cleanup.claim(name)
+        if isinstance(payload, PreparedPayload):
+            if self.namespace is not None:
+                kwargs['json'] = self.namespace.apply_payload(payload.fields)
+            else:
+                del kwargs['json']
+                kwargs['data'] = payload.body
+                kwargs.setdefault('headers', payload.headers(self.headers))
+        elif self.namespace is not None and 'json' in kwargs:
+            kwargs['json'] = self.namespace.apply_payload(payload)
+        kwargs.setdefault('headers', self.headers)
+        return kwargs
+
+    def flush_cleanup(self):
+        """
+        Deletes the characters left for the cleanup registry, so the listing does not see them
+        """
+        if self.cleanup is not None and self.cleanup.pending:
+            self.cleanup.flush()
+
+    def send(self, method, *args, **kwargs):
+        """
+        Makes the request and measures its time. The timing is published to the listeners
+        of 'work_with_timing' and kept in the 'timing' of the result. With the cassette the pair is recorded,
+        or the answer is taken from the cassette with no network at all. With the limiter the request waits
+        for a free slot of the adaptive concurrency limit. With the response cache GET of one character
+        and of the listing may be answered without the network; such answers are not published.
+        GET and HEAD requests are appended to the 'capture' list if it's set. The 'metrics' registry of
+        'work_with_metrics' counts every request, cache hits too
+        :return: Calls the 'ParseResponse' class to handle HTTP data
+        """
+        if method == 'HEAD':
+            kwargs.setdefault('allow_redirects', False)
+        url = kwargs['url'] if 'url' in kwargs else args[0]
+        if self.capture is not None and method in ('GET', 'HEAD'):
+            self.capture.append((method, args, dict(kwargs)))
+        cache = self.cache
+        if cache is not None and method == 'GET' and cache.is_cacheable(url):
+            auth = kwargs.get('auth')
+            cached, generation = cache.get(url, auth)
+            if cached is not None:
+                moment = time.perf_counter()
+                timing = RequestTiming(method, endpoint_template(url, self.base_url), cached.status_code,
+                                       moment, moment)
+                if self.metrics is not None:
+                    self.metrics.cache_hit(timing.key)
+                return Results(cached, timing=timing)
+            response = self.send_uncached(method, *args, **kwargs)
+            cache.put(url, auth, response.response, generation)
+            return response
+        if cache is None or method not in ('POST', 'PUT', 'DELETE'):
+            return self.send_uncached(method, *args, **kwargs)
+        try:
+            return self.send_uncached(method, *args, **kwargs)
+        finally:
+            cache.written(url, kwargs)
+
+    def send_uncached(self, method, *args, quiet: bool = False, **kwargs):
+        """
+        Makes the request with the network or the cassette, see 'send'. With stream=True the timing ends
+        at the headers, the body is left to the caller and is not printed
+        :param quiet: do not publish the timing and do not feed the metrics, e.g. for the repeats
+            of the latency SLO
+        """
+        url = kwargs['url'] if 'url' in kwargs else args[0]
+        limiter = self.limiter
+        metrics = self.metrics if not quiet else None
+        sent = limiter.acquire() if limiter is not None else None
+        if metrics is not None:
+            metrics.request_started()
+        phases = work_with_phases.start()
+        started = time.perf_counter()
+        try:
+            if self.cassette is not None and self.cassette.replaying:
+                response = self.cassette.replay(method, url, kwargs)
+            else:
+                response = self.http.request(method, *args, **kwargs)
+                if self.cassette is not None:
+                    self.cassette.record(method, url, kwargs, response)
+        except requests.RequestException as err:
+            finished = time.perf_counter()
+            if limiter is not None:
+                limiter.release(sent, failed=True)
+            timing = RequestTiming(method, endpoint_template(url, self.base_url), type(err).__name__,
+                                   started, finished)
+            if not quiet:
+                publish(timing)
+            if metrics is not None:
+                metrics.request_finished(timing, kwargs)
+            raise
+        except BaseException:
+            if limiter is not None:
+                limiter.release(sent)
+            if metrics is not None:
+                metrics.request_finished(None)
+            raise
+        finally:
+            work_with_phases.stop()
+        finished = time.perf_counter()
+        phases.finished(finished)
+        timing = RequestTiming(method, endpoint_template(url, self.base_url), response.status_code,
+                               started, finished, phases if phases.request_started is not None else None)
+        if limiter is not None:
+            limiter.release(sent, elapsed_ms=timing.elapsed_ms, failed=response.status_code >= 500)
+        if not quiet:
+            publish(timing)
+        if metrics is not None:
+            metrics.request_finished(timing, kwargs, response)
+        if self.namespace is not None:
+            response = self.namespace.strip_stream(response) if kwargs.get('stream') else \
+                self.namespace.strip_response(response)
+        return Results(response, verbose=False if kwargs.get('stream') else None, timing=timing)
+
+    @reporting.step('Выполнение GET-запроса')
     def get_request(self, *args, **kwargs):
         """
         Make GET request
         :return: Calls the 'ParseResponse' class to handle HTTP data
         """
-        return Results(requests.get(*args, **kwargs))
+        return self.send('GET', *args, **kwargs)
 
-    @allure.step('Выполнение POST-запроса')
+    @reporting.step('Выполнение POST-запроса')
     def post_request(self, *args, **kwargs):
         """
         Make POST request
         :return: Calls the 'ParseResponse' class to handle HTTP data
         """
-        return Results(requests.post(*args, **kwargs))
+        return self.send('POST', *args, **kwargs)
 
-    @allure.step('Выполнение DELETE-запроса')
+    @reporting.step('Выполнение DELETE-запроса')
     def delete_request(self, *args, **kwargs):
         """
         Make DELETE request
         :return: Calls the 'ParseResponse' class to handle HTTP data
         """
-        return Results(requests.delete(*args, **kwargs))
+        return self.send('DELETE', *args, **kwargs)
 
-    @allure.step('Выполнение PUT-запроса')
+    @reporting.step('Выполнение PUT-запроса')
     def put_request(self, *args, **kwargs):
         """
         Make PUT request
         :return: Calls the 'ParseResponse' class to handle HTTP data
         """
-        return Results(requests.put(*args, **kwargs))
+        return self.send('PUT', *args, **kwargs)
 
-    @allure.step('Выполнение HEAD-запроса')
+    @reporting.step('Выполнение HEAD-запроса')
     def head_request(self, *args, **kwargs):
         """
         Make HEAD request
         :return: Calls the 'ParseResponse' class to handle HTTP data
         """
-        return Results(requests.head(*args, **kwargs))
+        return self.send('HEAD', *args, **kwargs)
 
-    @allure.step('Формирование GET-запроса 1 персонажа')
+    @reporting.step('Формирование GET-запроса 1 персонажа')
     def get_character_by_name(self, raw_character_name, login, password):
         """
         Forms GET request
         :return: Ready-made request
         """
         request_url = self.make_url(raw_character_name=raw_character_name)
-        return self.get_request(url=request_url, headers=HEADERS, auth=(login, password))
+        return self.get_request(url=request_url, headers=self.headers, auth=(login, password))
 
-    @allure.step('Формирование POST-запроса 1 персонажа')
+    @reporting.step('Формирование POST-запроса 1 персонажа')
     def post_character_by_body(self, login, password, *args, **kwargs):
         """
         Forms POST request
         :return: Ready-made request
         """
-        return self.post_request(url=self.raw_url, headers=HEADERS, auth=(login, password), *args, **kwargs)
+        kwargs = self.with_body(kwargs)
+        if self.namespace is None:
+            return self.post_request(url=self.raw_url, auth=(login, password), *args, **kwargs)
+        self.namespace.reserve()
+        response = self.post_request(url=self.raw_url, auth=(login, password), *args, **kwargs)
+        if response.status_code != 200:
+            self.namespace.release()
+        return response
 
-    @allure.step('Формирование DELETE-запроса 1 персонажа')
+    @reporting.step('Формирование DELETE-запроса 1 персонажа')
     def delete_character(self, raw_character_name, login, password):
         """
         Forms DELETE request
         :return: Ready-made request
         """
         request_url = self.make_url(raw_character_name=raw_character_name)
-        return self.delete_request(url=request_url, headers=HEADERS, auth=(login, password))
+        response = self.delete_request(url=request_url, headers=self.headers, auth=(login, password))
+        if self.namespace is not None and response.status_code == 200:
+            self.namespace.release()
+        return response
 
-    @allure.step('Формирование HEAD-запроса')
+    @reporting.step('Формирование HEAD-запроса')
     def head_characters_page(self, login, password):
         """
         Forms HEAD request
         :return: Ready-made request
         """
+        self.flush_cleanup()
         request_url = self.raw_url + 's'
-        return self.head_request(url=request_url, headers=HEADERS, auth=(login, password))
+        return self.head_request(url=request_url, headers=self.headers, auth=(login, password))
 
-    @allure.step('Формирование PUT-запроса 1 персонажа')
+    @reporting.step('Формирование PUT-запроса 1 персонажа')
     def put_character_by_name(self, login, password, *args, **kwargs):
         """
         Forms PUT request
         :return: Ready-made request
         """
-        return self.put_request(url=self.raw_url, headers=HEADERS, auth=(login, password), *args, **kwargs)
+        kwargs = self.with_body(kwargs)
+        return self.put_request(url=self.raw_url, auth=(login, password), *args, **kwargs)
 
-    @allure.step('Формирование GET-запроса всех персонажа')
+    @reporting.step('Формирование GET-запроса всех персонажа')
     def get_all_characters(self, login, password):
         """
         Forms GET request for all characters
         :return: Ready-made request
         """
+        self.flush_cleanup()
+        request_url = self.raw_url + 's'
+        return self.get_request(url=request_url, headers=self.headers, auth=(login, password))
+
+    @reporting.step('Формирование потокового GET-запроса всех персонажей')
+    def get_all_characters_stream(self, login, password, chunk_size=16384):
+        """
+        Forms GET request for all characters which body is parsed while it's downloaded
+        :return: 'CharacterStream', it has to be closed after use
+        """
+        self.flush_cleanup()
         request_url = self.raw_url + 's'
-        return self.get_request(url=request_url, headers=HEADERS, auth=(login, password))
+        response = self.send_uncached('GET', url=request_url, headers=self.headers, auth=(login, password),
+                                      stream=True)
+        return CharacterStream(response.response, chunk_size=chunk_size, timing=response.timing)
 
-    @allure.step('Формирование DELETE-запроса всех персонажей')
+    @reporting.step('Формирование DELETE-запроса всех персонажей')
     def delete_all_characters(self, login, password):
         """
         Resets DB characters to default
         :return: Ready-made request
         """
-        request_url = 'http://rest.test.ivi.ru/v2/reset'
-        return self.post_request(url=request_url, headers=HEADERS, auth=(login, password))
+        request_url = self.base_url + '/reset'
+        response = self.post_request(url=request_url, headers=self.headers, auth=(login, password))
+        if response.status_code == 200:
+            if self.cleanup is not None:
+                self.cleanup.forget()
+            if self.namespace is not None:
+                self.namespace.forget()
+        return response
 
-    @allure.step('Формирование GET-запроса с есуществующbv URL')
+    @reporting.step('Формирование GET-запроса с есуществующbv URL')
     def get_wrong_url_resource(self, login, password):
         """
         Tries to get non-existed resource for testing code 404
         :return: Ready-made request
         """
-        request_url = 'http://rest.test.ivi.ru/v2/character/unexpected'
-        return self.get_request(url=request_url, headers=HEADERS, auth=(login, password))
+        request_url = self.raw_url + '/unexpected'
+        return self.get_request(url=request_url, headers=self.headers, auth=(login, password))
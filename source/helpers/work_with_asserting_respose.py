@@ -1,76 +1,132 @@
-import allure
-from colorama import Style, init
+import json
 from json.decoder import JSONDecodeError
+from source.helpers import work_with_reporting as reporting
+
+NOT_DECODED = object()
 
 
 class ParseResponse(object):
     """
-    Class works with the obtained values
+    Class works with the obtained values. Body is decoded on the first access only; in the lean mode
+    ('verbose' is False) data of the request is printed only when a comparison fails
     """
-    def __init__(self, response):
+    verbose = True
+
+    def __init__(self, response, verbose: bool = None, timing=None):
         """
         Dividing the answer into components
         :param response: HTTP answer
+        :param verbose: print data of every request; the class default is used if None
+        :param timing: 'RequestTiming' of the request
+        """
+        self.response = response
+        self.timing = timing
+        if verbose is not None:
+            self.verbose = verbose
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self._text = None
+        self._body = NOT_DECODED
+        if self.verbose:
+            print(self.describe())
+
+    @property
+    def text(self) -> str:
+        """
+        :return: decoded raw body
+        """
+        if self._text is None:
+            self._text = self.response.text
+        return self._text
+
+    @property
+    def body(self):
+        """
+        :return: JSON body or None if the body is not JSON. It's decoded once
         """
-        try:
-            print(f'Data of executed request:\n    Request Method: {response.request.method};'
-                  f'\n    Got Status Code: {response.status_code};'
-                  f'\n    Callable URL: {response.request.url};'
-                  f'\n    Got Headers: {response.headers};'
-                  f'\n    Got Body: {response.text}')
-            self.status_code = response.status_code
-            self.headers = response.headers
-            self.text = response.text
-            self.body = response.json()
-            init(autoreset=True)
-        except JSONDecodeError:
-            print('I\'ve got not JSON type!')
+        if self._body is NOT_DECODED:
+            try:
+                self._body = json.loads(self.response.content)
+            except (JSONDecodeError, UnicodeDecodeError):
+                if self.verbose:
+                    print('I\'ve got not JSON type!')
+                self._body = None
+        return self._body
 
-    @allure.step('Сравнение кода ответа. Ждём: {expected_status_code}')
+    @property
+    def phases(self):
+        """
+        :return: 'PhaseTiming' (dns, connect, tls, ttfb, download in ms) or None for the answers not from the network
+        """
+        return self.timing.phases if self.timing is not None else None
+
+    def describe(self) -> str:
+        """
+        :return: data of executed request
+        """
+        return (f'Data of executed request:\n    Request Method: {self.response.request.method};'
+                f'\n    Got Status Code: {self.status_code};'
+                f'\n    Callable URL: {self.response.request.url};'
+                f'\n    Got Headers: {self.headers};'
+                f'\n    Got Body: {self.text}')
+
+    def _report(self, is_equal: bool, message: str):
+        if self.verbose:
+            print(message)
+        elif not is_equal:
+            print(self.describe())
+            print(message)
+
+    @reporting.step('Сравнение кода ответа. Ждём: {expected_status_code}')
     def compare_status_code(self, expected_status_code: int) -> bool:
         """
         HTTP code status comparison
         :param expected_status_code: expected code
         :return: bool value
         """
-        print(f'{Style.BRIGHT}Check if the expected status code: \"{expected_status_code}\" '
-              f'is equal to the actual code: \"{self.status_code}\"')
-        return self.status_code == expected_status_code
+        is_equal = self.status_code == expected_status_code
+        self._report(is_equal, f'{reporting.bright()}Check if the expected status code: \"{expected_status_code}\" '
+                               f'is equal to the actual code: \"{self.status_code}\"')
+        return is_equal
 
-    @allure.step('Сравнение тела ответа')
+    @reporting.step('Сравнение тела ответа')
     def compare_body(self, expected_body: dict) -> bool:
         """
         HTTP JSON body comparison
         :param expected_body: expected body
         :return: bool value
         """
-        print(f'{Style.BRIGHT}Check if the expected body: '
-              f'\n\t\t\"{expected_body}\" '
-              f'\n\tis equal to the actual body: '
-              f'\n\t\t\"{self.body}\"')
-        return self.body == expected_body
+        is_equal = self.body == expected_body
+        if self.verbose or not is_equal:
+            self._report(is_equal, f'{reporting.bright()}Check if the expected body: '
+                                   f'\n\t\t\"{expected_body}\" '
+                                   f'\n\tis equal to the actual body: '
+                                   f'\n\t\t\"{self.body}\"')
+        return is_equal
 
-    @allure.step('Сравнение текста ответа')
+    @reporting.step('Сравнение текста ответа')
     def compare_raw_text(self, expected_text: str) -> bool:
         """
         HTTP raw body comparison
         :param expected_text: expected text
         :return: bool value
         """
-        print(f'{Style.BRIGHT}Check if the expected text: '
-              f'\n\t\t\"{expected_text}\" '
-              f'\n\tis equal to the actual text: '
-              f'\n\t\t\"{self.text}\"')
-        return self.text == expected_text
+        is_equal = self.text == expected_text
+        if self.verbose or not is_equal:
+            self._report(is_equal, f'{reporting.bright()}Check if the expected text: '
+                                   f'\n\t\t\"{expected_text}\" '
+                                   f'\n\tis equal to the actual text: '
+                                   f'\n\t\t\"{self.text}\"')
+        return is_equal
 
-    @allure.step('Возврат заголовков')
+    @reporting.step('Возврат заголовков')
     def return_headers(self) -> dict:
         """
         :return: HTTP headers
         """
         return self.headers
 
-    @allure.step('Возврат тела ответа')
+    @reporting.step('Возврат тела ответа')
     def return_body(self) -> dict:
         """
         :return: HTTP JSON body
@@ -82,11 +138,12 @@ class ParseResponse(object):
         else:
             return self.body["result"]
 
-    @allure.step('Посчитать количество персонажей')
+    @reporting.step('Посчитать количество персонажей')
     def count_all_characters(self) -> int:
         """
         :return: Count of all characters
         """
-        print(f'{Style.BRIGHT}\n\t  The current number of characters in the database: {len(self.body["result"])}')
-        return len(self.body["result"])
-
+        count = len(self.body["result"])
+        if self.verbose:
+            print(f'{reporting.bright()}\n\t  The current number of characters in the database: {count}')
+        return count
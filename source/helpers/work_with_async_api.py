@@ -0,0 +1,283 @@
+import asyncio
+import base64
+import json as json_lib
+import ssl
+import time
+from urllib.parse import urlsplit
+from requests.utils import requote_uri
+from source.helpers.work_with_api import API
+from source.helpers.work_with_asserting_respose import ParseResponse as Results
+from source.helpers.work_with_raw_response import RawRequest, RawResponse
+from source.helpers.work_with_session import SessionPool
+from source.helpers.work_with_payloads import PreparedPayload
+from source.helpers.work_with_timing import RequestTiming, endpoint_template, publish
+from source.data.data_headers import HEADERS, HEADERS_KEEP_ALIVE
+
+NO_BODY_STATUSES = (204, 304)
+
+
+class AsyncConnection(object):
+    """
+    One keep-alive connection to the host
+    """
+    def __init__(self, key: tuple, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.used = False
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncConnectionPool(object):
+    """
+    Keeps idle connections per (scheme, host, port)
+    """
+    def __init__(self, max_idle: int):
+        self.max_idle = max_idle
+        self._idle = {}
+
+    async def acquire(self, key: tuple) -> AsyncConnection:
+        """
+        :param key: (scheme, host, port)
+        :return: idle connection or a new one
+        """
+        idle = self._idle.get(key)
+        while idle:
+            connection = idle.pop()
+            if not connection.reader.at_eof() and not connection.writer.is_closing():
+                return connection
+            connection.close()
+        scheme, host, port = key
+        ssl_context = ssl.create_default_context() if scheme == 'https' else None
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+        return AsyncConnection(key, reader, writer)
+
+    def release(self, connection: AsyncConnection, reusable: bool):
+        """
+        Returns the connection to the pool or closes it
+        """
+        connection.used = True
+        idle = self._idle.setdefault(connection.key, [])
+        if reusable and len(idle) < self.max_idle:
+            idle.append(connection)
+        else:
+            connection.close()
+
+    def close(self):
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
+
+
+class AsyncAPI(object):
+    """
+    Class describes working with API by coroutines. Count of requests in flight is bounded by 'limit'.
+    It does not take part in the xdist namespaces and the deferred cleanup of 'API'
+    """
+    namespace = None
+    cleanup = None
+    make_url = API.make_url
+
+    def __init__(self, limit: int = 100, timeout: float = 30.0, keep_alive: bool | None = None):
+        """
+        :param keep_alive: send 'Connection: keep-alive' or 'Connection: close'; None takes the mode
+            of the shared 'SessionPool' if it's open and keep-alive otherwise
+        """
+        self.base_url = API.base_url
+        self.raw_url = self.base_url + '/character'
+        self.timeout = timeout
+        if keep_alive is None and SessionPool.current() is not None:
+            self.headers = SessionPool.headers()
+        else:
+            self.headers = HEADERS if keep_alive is False else HEADERS_KEEP_ALIVE
+        self._semaphore = asyncio.Semaphore(limit)
+        self._pool = AsyncConnectionPool(max_idle=limit)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes all idle connections
+        """
+        self._pool.close()
+
+    @staticmethod
+    def _make_request_bytes(request: RawRequest, host_header: str, auth: tuple | None) -> bytes:
+        split = urlsplit(request.url)
+        target = split.path or '/'
+        if split.query:
+            target += '?' + split.query
+        lines = [f'{request.method} {target} HTTP/1.1', f'Host: {host_header}']
+        for key, value in request.headers.items():
+            lines.append(f'{key}: {value}')
+        if auth is not None:
+            token = base64.b64encode(f'{auth[0]}:{auth[1]}'.encode('latin1')).decode('ascii')
+            lines.append(f'Authorization: Basic {token}')
+        if request.body is not None or request.method in ('POST', 'PUT'):
+            lines.append(f'Content-Length: {len(request.body or b"")}')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin1') + (request.body or b'')
+
+    @staticmethod
+    async def _read_response(connection: AsyncConnection, method: str) -> tuple:
+        """
+        :return: status code, headers, body and the flag of connection reusing
+        """
+        reader = connection.reader
+        status_line = await reader.readuntil(b'\r\n')
+        status_code = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            key, _, value = line.decode('latin1').partition(':')
+            headers[key.strip()] = value.strip()
+        lowered = {key.lower(): value for key, value in headers.items()}
+        reusable = lowered.get('connection', '').lower() != 'close'
+        if method == 'HEAD' or status_code in NO_BODY_STATUSES or 100 <= status_code < 200:
+            content = b''
+        elif 'chunked' in lowered.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    while await reader.readuntil(b'\r\n') != b'\r\n':
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            content = b''.join(chunks)
+        elif 'content-length' in lowered:
+            content = await reader.readexactly(int(lowered['content-length']))
+        else:
+            content = await reader.read()
+            reusable = False
+        return status_code, headers, content, reusable
+
+    async def _exchange(self, request: RawRequest, auth: tuple | None) -> RawResponse:
+        split = urlsplit(request.url)
+        scheme = split.scheme or 'http'
+        port = split.port or (443 if scheme == 'https' else 80)
+        key = (scheme, split.hostname, port)
+        host_header = split.netloc.rpartition('@')[2]
+        payload = self._make_request_bytes(request, host_header, auth)
+        for attempt in range(2):
+            connection = await self._pool.acquire(key)
+            try:
+                connection.writer.write(payload)
+                await connection.writer.drain()
+                status_code, headers, content, reusable = await self._read_response(connection, request.method)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                connection.close()
+                # A kept-alive connection may be closed by the server meanwhile; retry once with a fresh one
+                if connection.used and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            reusable = reusable and request.headers.get('Connection', '').lower() != 'close'
+            self._pool.release(connection, reusable)
+            return RawResponse(request, status_code, headers, content)
+
+    async def request(self, method: str, url: str, headers: dict | None = None, auth: tuple | None = None,
+                      json=None, data: bytes | None = None) -> Results:
+        """
+        Makes HTTP request
+        :return: Calls the 'ParseResponse' class to handle HTTP data
+        """
+        if isinstance(json, PreparedPayload):
+            data = json.body
+        elif json is not None:
+            data = json_lib.dumps(json).encode('utf-8')
+        request = RawRequest(method, requote_uri(url), headers, data)
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self._exchange(request, auth), timeout=self.timeout)
+            except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError) as err:
+                publish(RequestTiming(method, endpoint_template(url, self.base_url), type(err).__name__,
+                                      started, time.perf_counter()))
+                raise
+        timing = RequestTiming(method, endpoint_template(url, self.base_url), response.status_code,
+                               started, time.perf_counter())
+        publish(timing)
+        return Results(response, timing=timing)
+
+    async def get_request(self, *args, **kwargs):
+        return await self.request('GET', *args, **kwargs)
+
+    async def post_request(self, *args, **kwargs):
+        return await self.request('POST', *args, **kwargs)
+
+    async def delete_request(self, *args, **kwargs):
+        return await self.request('DELETE', *args, **kwargs)
+
+    async def put_request(self, *args, **kwargs):
+        return await self.request('PUT', *args, **kwargs)
+
+    async def head_request(self, *args, **kwargs):
+        return await self.request('HEAD', *args, **kwargs)
+
+    async def get_character_by_name(self, raw_character_name, login, password):
+        """
+        Forms GET request
+        :return: Ready-made request
+        """
+        request_url = self.make_url(raw_character_name=raw_character_name)
+        return await self.get_request(url=request_url, headers=self.headers, auth=(login, password))
+
+    async def post_character_by_body(self, login, password, *args, **kwargs):
+        """
+        Forms POST request
+        :return: Ready-made request
+        """
+        return await self.post_request(url=self.raw_url, headers=self.headers, auth=(login, password),
+                                       *args, **kwargs)
+
+    async def delete_character(self, raw_character_name, login, password):
+        """
+        Forms DELETE request
+        :return: Ready-made request
+        """
+        request_url = self.make_url(raw_character_name=raw_character_name)
+        return await self.delete_request(url=request_url, headers=self.headers, auth=(login, password))
+
+    async def head_characters_page(self, login, password):
+        """
+        Forms HEAD request
+        :return: Ready-made request
+        """
+        request_url = self.raw_url + 's'
+        return await self.head_request(url=request_url, headers=self.headers, auth=(login, password))
+
+    async def put_character_by_name(self, login, password, *args, **kwargs):
+        """
+        Forms PUT request
+        :return: Ready-made request
+        """
+        return await self.put_request(url=self.raw_url, headers=self.headers, auth=(login, password),
+                                      *args, **kwargs)
+
+    async def get_all_characters(self, login, password):
+        """
+        Forms GET request for all characters
+        :return: Ready-made request
+        """
+        request_url = self.raw_url + 's'
+        return await self.get_request(url=request_url, headers=self.headers, auth=(login, password))
+
+    async def delete_all_characters(self, login, password):
+        """
+        Resets DB characters to default
+        :return: Ready-made request
+        """
+        request_url = self.base_url + '/reset'
+        return await self.post_request(url=request_url, headers=self.headers, auth=(login, password))
@@ -0,0 +1,100 @@
+import allure
+from concurrent.futures import ThreadPoolExecutor
+from source.helpers.work_with_api import API
+
+
+class BulkCharacters(object):
+    """
+    Class makes writes of many characters concurrently and verifies them by one listing of all characters
+    """
+    def __init__(self, login: str, password: str, workers: int = 8):
+        self.login = login
+        self.password = password
+        self.workers = workers
+
+    def _run_concurrently(self, function, items: list) -> list:
+        if len(items) <= 1:
+            return [function(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as executor:
+            return list(executor.map(function, items))
+
+    @allure.step('Создание нескольких персонажей одновременно')
+    def create_characters(self, payloads: list) -> dict:
+        """
+        POSTs all characters concurrently
+        :param payloads: characters fields
+        :return: dict (key: character's name, value: response)
+        """
+        responses = self._run_concurrently(
+            lambda payload: API().post_character_by_body(json=payload, login=self.login, password=self.password),
+            payloads)
+        return {payload["name"]: response for payload, response in zip(payloads, responses)}
+
+    @allure.step('Удаление нескольких персонажей одновременно')
+    def delete_characters(self, names: list) -> dict:
+        """
+        DELETEs all characters concurrently
+        :param names: characters names
+        :return: dict (key: character's name, value: response)
+        """
+        responses = self._run_concurrently(
+            lambda name: API().delete_character(raw_character_name=name, login=self.login, password=self.password),
+            names)
+        return dict(zip(names, responses))
+
+    @allure.step('Проверка состояния нескольких персонажей')
+    def verify_characters(self, present: list = (), absent: list = ()) -> dict:
+        """
+        Checks that characters exist with the same fields or do not exist. Several characters are checked
+        by one listing of all characters, a single one by GET of its name
+        :param present: characters fields which must be in the database
+        :param absent: characters names which must not be in the database
+        :return: dict (key: character's name, value: bool)
+        """
+        if not present and not absent:
+            return {}
+        if len(present) + len(absent) == 1:
+            return self._verify_one(present, absent)
+        response = API().get_all_characters(login=self.login, password=self.password)
+        return self.verify_in_snapshot(response, present, absent)
+
+    @staticmethod
+    def verify_in_snapshot(response, present: list = (), absent: list = ()) -> dict:
+        """
+        Checks characters by an already received listing of all characters
+        :param response: response of GET all characters
+        :param present: characters fields which must be in the database
+        :param absent: characters names which must not be in the database
+        :return: dict (key: character's name, value: bool)
+        """
+        if not response.compare_status_code(200):
+            return {name: False for name in [payload["name"] for payload in present] + list(absent)}
+        stored = {character["name"]: character for character in response.return_body()}
+        verified = {payload["name"]: stored.get(payload["name"]) == payload for payload in present}
+        verified.update({name: name not in stored for name in absent})
+        return verified
+
+    def _verify_one(self, present: list, absent: list) -> dict:
+        name = present[0]["name"] if present else absent[0]
+        response = API().get_character_by_name(raw_character_name=name, login=self.login, password=self.password)
+        if present:
+            return {name: response.compare_status_code(200) and response.compare_body({"result": present[0]})}
+        return {name: response.compare_body({"error": "No such name"})}
+
+    def create_and_verify(self, payloads: list) -> dict:
+        """
+        :param payloads: characters fields
+        :return: dict (key: character's name, value: True if it was posted and is stored as sent)
+        """
+        responses = self.create_characters(payloads)
+        created = [payload for payload in payloads if responses[payload["name"]].compare_status_code(200)]
+        verified = self.verify_characters(present=created)
+        return {payload["name"]: verified.get(payload["name"], False) for payload in payloads}
+
+    def delete_and_verify(self, names: list) -> dict:
+        """
+        :param names: characters names
+        :return: dict (key: character's name, value: True if it is not in the database anymore)
+        """
+        self.delete_characters(names)
+        return self.verify_characters(absent=names)
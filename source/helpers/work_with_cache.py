@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+CACHED_STATUSES = (200, 400)
+
+
+class ResponseCache(object):
+    """
+    Bounded LRU cache with TTL of the answers of GET one character and GET all characters.
+    Keys are the URL (with the namespaced name as it's sent) and the credentials. Writes through 'API' drop
+    the entries of the written name and the listing, the reset drops everything. An answer which was
+    requested before a write and received after it is not stored
+    """
+    def __init__(self, max_size: int = 256, ttl_s: float = 5.0, listing_ttl_s: float = None, listing: bool = True):
+        """
+        :param ttl_s: lifetime of an answer about one character
+        :param listing_ttl_s: lifetime of the listing of all characters; 'ttl_s' if None
+        :param listing: cache the listing; it has to be off if other clients write into the same collection
+        """
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self.listing_ttl_s = ttl_s if listing_ttl_s is None else listing_ttl_s
+        self.listing = listing
+        self.hits = self.misses = self.invalidations = self.evictions = self.expirations = 0
+        self.generation = 0
+        self._entries = OrderedDict()
+        self._auths = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_listing(url: str) -> bool:
+        return url.endswith('/characters')
+
+    def is_cacheable(self, url: str) -> bool:
+        return '/character?name=' in url or (self.listing and self.is_listing(url))
+
+    def get(self, url: str, auth: tuple):
+        """
+        :return: (stored answer or None, generation the answer has to be stored with)
+        """
+        with self._lock:
+            entry = self._entries.get((url, auth))
+            if entry is not None:
+                expires, response = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end((url, auth))
+                    self.hits += 1
+                    return response, self.generation
+                del self._entries[(url, auth)]
+                self.expirations += 1
+            self.misses += 1
+            return None, self.generation
+
+    def put(self, url: str, auth: tuple, response, generation: int):
+        """
+        :param generation: value returned by 'get' before the request was sent
+        """
+        if response.status_code not in CACHED_STATUSES:
+            return
+        ttl_s = self.listing_ttl_s if self.is_listing(url) else self.ttl_s
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._auths.add(auth)
+            self._entries[(url, auth)] = (time.monotonic() + ttl_s, response)
+            self._entries.move_to_end((url, auth))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def written(self, url: str, kwargs: dict):
+        """
+        Drops the entries changed by POST, PUT or DELETE
+        :param url: URL of the write
+        :param kwargs: keyword arguments of the request; the name of a POST or PUT is taken from the body
+        """
+        if url.endswith('/reset'):
+            self.clear()
+            return
+        if '?name=' in url:
+            character_url = url
+        else:
+            name = self.body_name(kwargs)
+            if name is None:
+                self.clear()
+                return
+            character_url = url + '?name=' + name.replace(' ', '+')
+        listing_url = character_url.split('?', 1)[0] + 's'
+        with self._lock:
+            self.generation += 1
+            for auth in self._auths:
+                for key in ((character_url, auth), (listing_url, auth)):
+                    if self._entries.pop(key, None) is not None:
+                        self.invalidations += 1
+
+    @staticmethod
+    def body_name(kwargs: dict) -> str | None:
+        """
+        :return: name of the character in 'json' or 'data' of the request, None if there is no valid one
+        """
+        body = kwargs.get('json')
+        if body is None and kwargs.get('data') is not None:
+            try:
+                body = json.loads(kwargs['data'])
+            except ValueError:
+                return None
+        name = body.get("name") if isinstance(body, dict) else None
+        return name if isinstance(name, str) else None
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses,
+                    "hit_ratio": self.hits / lookups if lookups else 0.0, "invalidations": self.invalidations,
+                    "evictions": self.evictions, "expirations": self.expirations}
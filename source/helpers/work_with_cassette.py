@@ -0,0 +1,116 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+from source.helpers.work_with_raw_response import RawRequest, RawResponse
+
+VOLATILE_HEADERS = {"date", "set-cookie", "x-request-id", "age", "expires", "last-modified", "etag"}
+
+
+class CassetteMiss(Exception):
+    """
+    The cassette has no answer for the request
+    """
+
+
+def request_body(kwargs: dict) -> bytes:
+    """
+    :param kwargs: keyword arguments of 'requests'
+    :return: bytes of the body as it's sent
+    """
+    if kwargs.get('json') is not None and not kwargs.get('data'):
+        return json.dumps(kwargs['json']).encode('utf-8')
+    data = kwargs.get('data') or b''
+    return data.encode('utf-8') if isinstance(data, str) else bytes(data)
+
+
+class Cassette(object):
+    """
+    On-disk record of request/response pairs. Entries are JSON lines, the index file keeps byte offsets
+    of the entries for every key, so replay reads only the needed lines.
+    Key is method, path with query, body hash and the alias of credentials: credentials are never written,
+    they get aliases 'auth0', 'auth1'... in order of the first use
+    """
+    def __init__(self, path: str, mode: str):
+        if mode not in ('record', 'replay'):
+            raise ValueError('Mode of the cassette is "record" or "replay"')
+        self.path = path
+        self.mode = mode
+        self.index_path = path + '.idx'
+        self._lock = threading.Lock()
+        self._aliases = {}
+        self._played = {}
+        if mode == 'record':
+            self._file = open(path, 'wb')
+            self.index = {}
+        else:
+            self._file = open(path, 'rb')
+            self.index = self._load_index()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def _load_index(self) -> dict:
+        if os.path.exists(self.index_path) and os.path.getmtime(self.index_path) >= os.path.getmtime(self.path):
+            with open(self.index_path) as file:
+                return json.load(file)
+        index, offset = {}, 0
+        for line in self._file:
+            index.setdefault(json.loads(line)["key"], []).append(offset)
+            offset += len(line)
+        return index
+
+    def _auth_alias(self, auth) -> str:
+        with self._lock:
+            return self._aliases.setdefault(tuple(auth) if auth is not None else None, f'auth{len(self._aliases)}')
+
+    def make_key(self, method: str, url: str, kwargs: dict) -> str:
+        split = urlsplit(url)
+        target = split.path + ('?' + split.query if split.query else '')
+        digest = hashlib.sha1(request_body(kwargs)).hexdigest()[:16]
+        return f'{method} {target} {digest} {self._auth_alias(kwargs.get("auth"))}'
+
+    def record(self, method: str, url: str, kwargs: dict, response):
+        """
+        Writes the pair into the cassette
+        """
+        content = response.content
+        try:
+            body, encoding = content.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode('ascii'), 'base64'
+        headers = {key: value for key, value in response.headers.items() if key.lower() not in VOLATILE_HEADERS}
+        key = self.make_key(method, url, kwargs)
+        line = (json.dumps({"key": key, "status": response.status_code, "headers": headers, "body": body,
+                            "encoding": encoding}, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._lock:
+            self.index.setdefault(key, []).append(self._file.tell())
+            self._file.write(line)
+
+    def replay(self, method: str, url: str, kwargs: dict) -> RawResponse:
+        """
+        :return: recorded answer. Repeated requests get the recorded answers in the same order,
+            the last one is repeated when they are over
+        """
+        key = self.make_key(method, url, kwargs)
+        offsets = self.index.get(key)
+        if not offsets:
+            raise CassetteMiss(f'No recorded answer for "{key}" in {self.path}')
+        with self._lock:
+            number = self._played.get(key, 0)
+            self._played[key] = number + 1
+            self._file.seek(offsets[min(number, len(offsets) - 1)])
+            entry = json.loads(self._file.readline())
+        content = base64.b64decode(entry["body"]) if entry["encoding"] == 'base64' else entry["body"].encode('utf-8')
+        return RawResponse(RawRequest(method, url, kwargs.get('headers'), request_body(kwargs) or None),
+                           entry["status"], entry["headers"], content)
+
+    def close(self):
+        if self.mode == 'record' and not self._file.closed:
+            self._file.flush()
+            with open(self.index_path, 'w') as file:
+                json.dump(self.index, file, separators=(',', ':'))
+        self._file.close()
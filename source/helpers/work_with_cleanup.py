@@ -0,0 +1,104 @@
+import threading
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_bulk import BulkCharacters
+
+MAX_PENDING = 32
+
+RESET_THRESHOLD = 16
+
+
+class CleanupRegistry(object):
+    """
+    Characters created by tests, deleted later in one concurrent deduplicated batch and verified by one listing.
+    A pending character is deleted earlier if a request works with its name or with the listing of all characters,
+    so tests see the same database as with the immediate deletion. Such early deletions go by name only:
+    the test may have characters of its own which the reset would wipe
+    """
+    def __init__(self, login: str, password: str, deferred: bool = True, reset_threshold: int = 0,
+                 max_pending: int = MAX_PENDING, workers: int = 8):
+        """
+        :param deferred: keep the characters till 'flush'; they are deleted at once if False
+        :param reset_threshold: reset the database instead of deleting a batch of this size or bigger
+            on 'flush' with reset=True; 0 is never. It can't exceed 'max_pending', a bigger batch is never kept.
+            The batch with namespaced (xdist) characters is never reset
+        :param max_pending: the batch is deleted when it gets so many characters, so the collection limit is kept
+        """
+        if reset_threshold > max_pending:
+            raise ValueError(f'reset_threshold {reset_threshold} is bigger than max_pending {max_pending}')
+        self.login = login
+        self.password = password
+        self.deferred = deferred
+        self.reset_threshold = reset_threshold
+        self.max_pending = max_pending
+        self.workers = workers
+        self.pending = {}
+        self.failed = []
+        self._lock = threading.RLock()
+
+    def register(self, names: list):
+        """
+        :param names: characters names which have to be deleted, in the current namespace of 'API'
+        """
+        with self._lock:
+            for name in names:
+                self.pending[(API.namespace, name)] = None
+        if not self.deferred or len(self.pending) >= self.max_pending:
+            self.flush()
+
+    def claim(self, name: str):
+        """
+        Deletes the pending character before a request with its name
+        """
+        if not isinstance(name, str):
+            return
+        key = (API.namespace, name)
+        if key in self.pending:
+            with self._lock:
+                batch = [key] if self.pending.pop(key, False) is None else []
+            self._delete(batch)
+
+    def forget(self):
+        """
+        Drops the pending characters of the current process, e.g. after the reset of the database
+        """
+        with self._lock:
+            self.pending.clear()
+
+    @allure.step('Удаление накопленных персонажей')
+    def flush(self, reset: bool = False) -> dict:
+        """
+        Deletes all pending characters concurrently and checks them by one listing
+        :param reset: allow the reset of the database for a batch of 'reset_threshold' characters; only when
+            no test is running, e.g. at the end of a module or the session
+        :return: dict (key: character's name, value: True if it is not in the database anymore)
+        """
+        with self._lock:
+            batch, self.pending = list(self.pending), {}
+        return self._delete(batch, reset=reset)
+
+    def _delete(self, batch: list, reset: bool = False) -> dict:
+        if not batch:
+            return {}
+        bulk = BulkCharacters(self.login, self.password, workers=self.workers)
+        namespace = API.namespace
+        verified = {}
+        try:
+            if reset and self.reset_threshold and len(batch) >= self.reset_threshold and \
+                    all(space is None for space, _ in batch):
+                API.namespace = None
+                API().delete_all_characters(self.login, self.password)
+                verified = bulk.verify_characters(absent=[name for _, name in batch])
+            else:
+                for space in {space for space, _ in batch}:
+                    API.namespace = space
+                    names = [name for key_space, name in batch if key_space == space]
+                    bulk.delete_characters(names)
+                    verified.update(bulk.verify_characters(absent=names))
+        finally:
+            API.namespace = namespace
+        failed = [name for name, is_ok in verified.items() if not is_ok]
+        if failed:
+            self.failed.extend(failed)
+            print(f'Characters were NOT deleted: {failed}')
+        return verified
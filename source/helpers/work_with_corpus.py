@@ -0,0 +1,43 @@
+from copy import deepcopy
+from source.helpers.work_with_fields import WorkCharacters
+from source.helpers.work_with_payloads import PreparedPayload
+from source.data.data_expected_bodies import DATA_STANDARD_CHARACTER, DATA_FOR_POST_CHARACTER_BY_BODY, \
+    DATA_CHANGED_NAME_FOR_PUT, DATA_FOR_MANY_CHARS_MANIPULATIONS, WRONG_ORDER_OF_FIELDS, MIN_LENGTH_FIELD, \
+    POST_ONLY_REQUIRED_NAME, MISSING_REQUIRED_FIELD
+
+BOUNDARY_WIDTHS = (0, 1, 350, 351)
+
+
+class PayloadCorpus(object):
+    """
+    Every character variant of the suite built once: standard, boundary-length, missing-field and wrong-order
+    """
+    def __init__(self):
+        self.payloads = {"standard": PreparedPayload(DATA_STANDARD_CHARACTER[0]["result"]),
+                         "changed_name": PreparedPayload(DATA_CHANGED_NAME_FOR_PUT[0]["result"]),
+                         "wrong_order": PreparedPayload(WRONG_ORDER_OF_FIELDS["result"]),
+                         "only_required": PreparedPayload(POST_ONLY_REQUIRED_NAME["result"]),
+                         "missing_required": PreparedPayload(MISSING_REQUIRED_FIELD)}
+        for number, fields in enumerate(DATA_FOR_POST_CHARACTER_BY_BODY):
+            self.payloads[f'post_{number}'] = PreparedPayload(fields)
+        for number, character in enumerate(DATA_FOR_MANY_CHARS_MANIPULATIONS):
+            self.payloads[f'many_{number}'] = PreparedPayload(character["result"])
+        for width in BOUNDARY_WIDTHS:
+            self.payloads[f'boundary_{width}'] = self.boundary(width)
+
+    def __getitem__(self, name: str) -> PreparedPayload:
+        return self.payloads[name]
+
+    def boundary(self, width: int) -> PreparedPayload:
+        """
+        :param width: count of symbols of the fields
+        :return: 'WorkCharacters.make_field_symbols' payload of the width
+        """
+        name = f'boundary_{width}'
+        if name not in self.payloads:
+            self.payloads[name] = PreparedPayload(
+                WorkCharacters().make_field_symbols(deepcopy(MIN_LENGTH_FIELD["result"]), width))
+        return self.payloads[name]
+
+
+CORPUS = PayloadCorpus()
@@ -0,0 +1,109 @@
+import hashlib
+import json
+from urllib.parse import unquote_plus
+
+
+def normalize_name(name: str) -> str:
+    """
+    Brings the name to the form in which 'Spider Man', 'spider+man' and ' SPIDER  MAN ' are equal
+    :param name: raw name or the name encoded like 'API.make_url' does
+    :return: normalized name
+    """
+    return ' '.join(unquote_plus(str(name)).casefold().split())
+
+
+def content_hash(character: dict, fields: tuple = None) -> str:
+    """
+    :param character: character fields
+    :param fields: projection of fields to hash; all fields if None
+    :return: hash of the content. Numbers are hashed as floats, so 180 and 180.0 are equal
+    """
+    projection = {}
+    for field in sorted(character if fields is None else fields):
+        value = character.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        projection[field] = value
+    return hashlib.sha1(json.dumps(projection, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class SnapshotDiff(object):
+    """
+    Difference between two snapshots of the collection
+    """
+    def __init__(self, added: list, removed: list, changed: list):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def as_dict(self) -> dict:
+        return {"added": self.added, "removed": self.removed, "changed": self.changed}
+
+
+class DuplicateIndex(object):
+    """
+    Hash index of characters by exact name, normalized name and content of the chosen fields.
+    All groups are found in one pass; only the names, counts and content hashes are kept, not the characters.
+    'hashes' keeps the content hashes of all characters of a normalized name
+    """
+    def __init__(self, fields: tuple = None, contents: bool = True):
+        """
+        :param contents: hash the contents for 'content_duplicates' and 'diff'; without them only
+            the name groups are kept
+        """
+        self.fields = fields
+        self.contents = contents
+        self.by_name = {}
+        self.by_normalized_name = {}
+        self.by_content = {}
+        self.hashes = {}
+
+    def add(self, character: dict):
+        name = character.get("name")
+        self.by_name[name] = self.by_name.get(name, 0) + 1
+        self.by_normalized_name.setdefault(normalize_name(name), []).append(name)
+        if self.contents:
+            digest = content_hash(character, self.fields)
+            self.by_content.setdefault(digest, []).append(name)
+            self.hashes.setdefault(normalize_name(name), []).append(digest)
+
+    def add_all(self, characters: list) -> 'DuplicateIndex':
+        for character in characters:
+            self.add(character)
+        return self
+
+    def name_duplicates(self) -> dict:
+        """
+        :return: dict (key: character's name, value: count of repeats)
+        """
+        return {name: count for name, count in self.by_name.items() if count > 1}
+
+    def near_duplicates(self) -> dict:
+        """
+        :return: dict (key: normalized name, value: names which differ only in case, spaces or encoding)
+        """
+        return {key: names for key, names in self.by_normalized_name.items() if len(set(names)) > 1}
+
+    def content_duplicates(self) -> dict:
+        """
+        :return: dict (key: content hash, value: names of the characters with the same projected content)
+        """
+        return {digest: names for digest, names in self.by_content.items() if len(names) > 1}
+
+    def diff(self, newer: 'DuplicateIndex') -> SnapshotDiff:
+        """
+        Compares this snapshot with the newer one by normalized names and all content hashes of every name,
+        so a changed one of the repeated characters is found too
+        :param newer: index of the newer snapshot
+        :return: names as they are in the snapshot they are taken from
+        """
+        if not self.contents or not newer.contents:
+            raise ValueError('The snapshots are compared by the content hashes, index them with contents=True')
+        added = [newer.by_normalized_name[key][0] for key in newer.hashes if key not in self.hashes]
+        removed = [self.by_normalized_name[key][0] for key in self.hashes if key not in newer.hashes]
+        changed = [newer.by_normalized_name[key][0] for key, digests in newer.hashes.items()
+                   if key in self.hashes and sorted(self.hashes[key]) != sorted(digests)]
+        return SnapshotDiff(added, removed, changed)
@@ -1,7 +1,11 @@
 import allure
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
 from colorama import Style
 from source.helpers.work_with_api import API
+from source.helpers.work_with_bulk import BulkCharacters
+from source.helpers.work_with_schema import collect_violations, format_violations
+from source.helpers.work_with_stream import CollectionAudit
+from source.helpers.work_with_duplicates import DuplicateIndex
 from source.data.data_expected_bodies import DATA_FOR_MANY_CHARS_MANIPULATIONS
 
 
@@ -11,39 +15,63 @@ class WorkCharacters(object):
     @allure.step('Подсчёт количество персонажей после добавления новых')
     def count_after_create_chars(self, login: str, password: str) -> int:
         """
-        Counts the number of all characters before creating new ones. Some validates also
+        Counts the number of all characters after creating new ones concurrently. The same listing validates
+        the created ones; a character which is not posted, e.g. it exists already, is not checked
         :param login: login auth
         :param password: password auth
         :return: call the method of counting all characters by response
         """
-        for character in DATA_FOR_MANY_CHARS_MANIPULATIONS:
-            response = API().post_character_by_body(json=character["result"], login=login, password=password)
-            if response.compare_status_code(200):
-                validate_response = API().get_character_by_name(raw_character_name=character["result"]["name"],
-                                                                login=login, password=password)
-                if not validate_response.compare_status_code(200) or \
-                        not validate_response.compare_body(character):
-                    assert False, print('Characters were NOT posted')
+        payloads = [character["result"] for character in DATA_FOR_MANY_CHARS_MANIPULATIONS]
+        bulk = BulkCharacters(login, password)
+        responses = bulk.create_characters(payloads)
         response = API().get_all_characters(login=login, password=password)
+        created = [payload for payload in payloads if responses[payload["name"]].compare_status_code(200)]
+        verified = bulk.verify_in_snapshot(response, present=created)
+        if not all(verified.values()):
+            assert False, print('Characters were NOT posted')
         return response.count_all_characters()
 
+    @allure.step('Потоковая проверка всех персонажей')
+    def audit_all_characters(self, login: str, password: str, schema: dict = None) -> CollectionAudit:
+        """
+        Counts, looks for duplicates and validates all characters in one pass while they are downloaded
+        :param login: login auth
+        :param password: password auth
+        :param schema: schema sample for validation or None to skip it
+        :return: audit of the collection
+        """
+        with API().get_all_characters_stream(login=login, password=password) as stream:
+            audit = stream.audit(schema)
+        if audit.violations:
+            allure.attach(body=format_violations(audit.violations), name='validation_stderr',
+                          attachment_type=allure.attachment_type.TEXT)
+        if audit.duplicates:
+            print(f'{Style.BRIGHT}\n\tThere is a recurring character in the database '
+                  f'(key: character, value: count of repeats): {audit.duplicates}')
+        return audit
+
     @allure.step('Поиск одинаковых экземпляров персонажей')
-    def find_duplicate_characters(self, payload: dict) -> bool:
+    def find_duplicate_characters(self, payload: list, normalized: bool = False, fields: tuple = None) -> bool:
         """
-        Looks for the same characters and adds them to the 'duplicates'. 'duplicates' specifies the character
+        Looks for the same characters by the hash index. 'duplicates' specifies the character
         to be repeated and the number of repetitions
         :param payload: payload
+        :param normalized: also treat names which differ only in case, spaces or '+' encoding as the same
+        :param fields: if set, also treat characters with the same values of these fields as the same
         :return: bool value
         """
         print(f'\n\t  The current number of characters in the database: {len(payload)}')
-        counter = {}
-        for character_fields in payload:
-            counter[character_fields["name"]] = counter.get(character_fields["name"], 0) + 1
-        duplicates = {element: count for element, count in counter.items() if count > 1}
+        index = DuplicateIndex(fields=fields, contents=fields is not None).add_all(payload)
+        duplicates = index.name_duplicates()
+        if normalized:
+            duplicates.update(index.near_duplicates())
+        if fields is not None:
+            duplicates.update(index.content_duplicates())
         if duplicates != {}:
             print(f'{Style.BRIGHT}\n\tThere is a recurring character in the database '
-                  f'(key: character, value: count of repeats): {duplicates}')
+                  f'(key: character, value: count of repeats or the same characters): {duplicates}')
             return False
+        return True
 
     @allure.step('Задание длины string полей')
     def make_field_symbols(self, payload: dict, count_of_symbols: int) -> dict:
@@ -64,23 +92,15 @@ class WorkCharacters(object):
     @allure.step('Валидация полей')
     def validate_fields(payload: dict | list, schema: dict) -> bool:
         """
-        Compares the received characters fields with the sample 'SCHEMA'
+        Compares the received characters fields with the sample 'SCHEMA'. The validator of the schema is compiled
+        once; all violations of all characters are collected into one report
         :param schema: schema sample for validation
         :param payload: character fields
         :return: bool value
         """
-        try:
-            if isinstance(payload, list):
-                # bad_cases = {}
-                for character_fields in payload:
-                    validate(instance=character_fields, schema=schema)
-            else:
-                validate(instance=payload, schema=schema)
-            return True
-        except ValidationError as err:
-            allure.attach(body=err, name='validation_stderr', attachment_type=allure.attachment_type.TEXT)
-            # raw_error_msg = (str(err)).split()
-            # parsed_key, value = raw_error_msg[-2], raw_error_msg[-1]
-            # key = parsed_key.split("[")[-1].split("]")[0].split("\'")[1]
-            # bad_cases.update({character_fields["name"]: {key: value}})
-            raise err
+        violations = collect_violations(payload, schema)
+        if violations:
+            report = format_violations(violations)
+            allure.attach(body=report, name='validation_stderr', attachment_type=allure.attachment_type.TEXT)
+            raise ValidationError(f'{len(violations)} invalid record(s):\n{report}')
+        return True
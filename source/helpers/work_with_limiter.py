@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+LimitChange = namedtuple('LimitChange', 'time limit reason')
+
+
+class AdaptiveLimiter(object):
+    """
+    AIMD limit of requests in flight. The limit grows by 'increase' per window of healthy answers
+    and is multiplied by 'backoff' on 5xx, failed requests (timeouts, broken connections) and latency spikes.
+    One drop is made per window: answers of requests sent before the last drop do not drop the limit again
+    """
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 64, increase: float = 1.0,
+                 backoff: float = 0.5, latency_factor: float = 3.0, latency_floor_ms: float = 20.0,
+                 history_size: int = 1000):
+        """
+        :param latency_factor: latency above 'latency_factor' * baseline latency is a spike. The baseline follows
+            faster latencies quickly and slower ones slowly, so the growing queue of the service is noticed
+        :param latency_floor_ms: latency below it is never a spike
+        :param history_size: count of kept limit changes
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.latency_floor_ms = latency_floor_ms
+        self.baseline_ms = None
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self._limit = float(max(min(initial, max_limit), min_limit))
+        self._condition = threading.Condition()
+        self._started = time.monotonic()
+        self._last_drop = self._started
+        self.history = deque([LimitChange(0.0, self.limit, 'initial')], maxlen=history_size)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> float:
+        """
+        Waits for a free slot
+        :return: time the request was let in, it's passed to 'release'
+        """
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, sent: float, elapsed_ms: float = None, failed: bool = False):
+        """
+        Frees the slot and adapts the limit
+        :param sent: value returned by 'acquire'
+        :param elapsed_ms: latency of the request
+        :param failed: 5xx answer or no answer at all
+        """
+        with self._condition:
+            self.in_flight -= 1
+            reason = 'failure' if failed else self._spike(elapsed_ms)
+            if reason is None:
+                self.successes += 1
+                self._set_limit(min(self._limit + self.increase / max(self._limit, 1.0), self.max_limit), 'increase')
+            else:
+                self.failures += 1
+                if sent >= self._last_drop:
+                    self._last_drop = time.monotonic()
+                    self._set_limit(max(self._limit * self.backoff, self.min_limit), reason)
+            self._condition.notify_all()
+
+    def _spike(self, elapsed_ms: float | None) -> str | None:
+        if elapsed_ms is None:
+            return None
+        if self.baseline_ms is not None and \
+                elapsed_ms > max(self.baseline_ms * self.latency_factor, self.latency_floor_ms):
+            return 'latency'
+        if self.baseline_ms is None:
+            self.baseline_ms = elapsed_ms
+        else:
+            weight = 0.5 if elapsed_ms < self.baseline_ms else 0.01
+            self.baseline_ms += (elapsed_ms - self.baseline_ms) * weight
+        return None
+
+    def _set_limit(self, value: float, reason: str):
+        previous = self.limit
+        self._limit = value
+        if self.limit != previous:
+            self.history.append(LimitChange(round(time.monotonic() - self._started, 3), self.limit, reason))
+
+    def summary(self) -> dict:
+        with self._condition:
+            limits = [change.limit for change in self.history]
+            return {"limit": self.limit, "min_limit_seen": min(limits), "max_limit_seen": max(limits),
+                    "successes": self.successes, "failures": self.failures,
+                    "changes": [list(change) for change in self.history]}
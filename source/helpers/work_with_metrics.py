@@ -0,0 +1,321 @@
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from source.helpers import work_with_schema
+from source.helpers.work_with_api import API
+from source.helpers.work_with_stats import LatencyHistogram
+
+BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = 'characters_api'
+
+
+def label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def body_size(body) -> int:
+    """
+    :param body: body of the request: bytes, str or None
+    """
+    if not body:
+        return 0
+    return len(body.encode('utf-8')) if isinstance(body, str) else len(body)
+
+
+def exchanged_bytes(kwargs: dict, response=None) -> tuple:
+    """
+    :param kwargs: keyword arguments of the request
+    :param response: answer or None if there is no one; the body of a streamed answer is read by the caller,
+        so only its Content-Length is known
+    :return: (bytes of the request body, bytes of the answer body)
+    """
+    request = getattr(response, 'request', None)
+    sent = body_size(getattr(request, 'body', None) or kwargs.get('data'))
+    if response is None:
+        return sent, 0
+    if kwargs.get('stream'):
+        return sent, int(response.headers.get('Content-Length') or 0)
+    return sent, len(response.content or b'')
+
+
+class BucketHistogram(object):
+    """
+    Cumulative Prometheus buckets in seconds
+    """
+    def __init__(self, bounds: tuple = BUCKETS_S):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum_s = 0.0
+        self.count = 0
+
+    def observe(self, value_s: float):
+        self.counts[bisect.bisect_left(self.bounds, value_s)] += 1
+        self.sum_s += value_s
+        self.count += 1
+
+    def exposition(self, name: str, labels: str) -> list:
+        """
+        :param labels: labels of the series without braces, e.g. 'method="GET"'
+        :return: lines of the '_bucket', '_sum' and '_count' series
+        """
+        lines, cumulative = [], 0
+        separator = ',' if labels else ''
+        for bound, count in zip(self.bounds + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+        braces = f'{{{labels}}}' if labels else ''
+        lines.append(f'{name}_sum{braces} {self.sum_s}')
+        lines.append(f'{name}_count{braces} {self.count}')
+        return lines
+
+
+class EndpointMetrics(object):
+    """
+    Counters and latencies of one method and endpoint template
+    """
+    def __init__(self):
+        self.statuses = {}
+        self.buckets = BucketHistogram()
+        self.window = LatencyHistogram()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.cache_hits = 0
+
+
+class MetricsRegistry(object):
+    """
+    Live metrics of the requests of 'API': counters by endpoint and status, the in-flight gauge,
+    latency histograms, bytes of the bodies and the time of the schema validation.
+    'prometheus' renders them for scraping, 'snapshot' returns the totals and the window since the last snapshot
+    """
+    def __init__(self):
+        self.endpoints = {}
+        self.in_flight = 0
+        self.validation = BucketHistogram()
+        self.window_validation_s = 0.0
+        self.started = time.time()
+        self._window_started = time.perf_counter()
+        self._window_requests = 0
+        self._lock = threading.Lock()
+
+    def install(self) -> 'MetricsRegistry':
+        """
+        Makes 'API' and 'collect_violations' feed the registry
+        """
+        API.metrics = self
+        work_with_schema.metrics = self
+        return self
+
+    @staticmethod
+    def uninstall():
+        API.metrics = None
+        work_with_schema.metrics = None
+
+    def _endpoint(self, key: str) -> EndpointMetrics:
+        endpoint = self.endpoints.get(key)
+        if endpoint is None:
+            endpoint = self.endpoints[key] = EndpointMetrics()
+        return endpoint
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, timing, kwargs: dict = None, response=None):
+        """
+        :param timing: 'RequestTiming' of the request or None if it was interrupted
+        :param kwargs: keyword arguments of the request
+        :param response: answer of the request or None if it failed
+        """
+        sent, received = exchanged_bytes(kwargs or {}, response)
+        with self._lock:
+            self.in_flight -= 1
+            if timing is None:
+                return
+            endpoint = self._endpoint(timing.key)
+            endpoint.statuses[timing.status] = endpoint.statuses.get(timing.status, 0) + 1
+            endpoint.buckets.observe(timing.elapsed_ms / 1000)
+            endpoint.window.record(timing.elapsed_ms)
+            endpoint.bytes_sent += sent
+            endpoint.bytes_received += received
+            self._window_requests += 1
+
+    def cache_hit(self, key: str):
+        with self._lock:
+            self._endpoint(key).cache_hits += 1
+
+    def validated(self, elapsed_s: float):
+        with self._lock:
+            self.validation.observe(elapsed_s)
+            self.window_validation_s += elapsed_s
+
+    def prometheus(self) -> str:
+        """
+        :return: text exposition format 0.0.4
+        """
+        with self._lock:
+            lines = [f'# TYPE {PREFIX}_requests_total counter']
+            for key, endpoint in sorted(self.endpoints.items()):
+                method, path = key.split(' ', 1)
+                for status, count in sorted(endpoint.statuses.items(), key=str):
+                    lines.append(f'{PREFIX}_requests_total{{method="{label(method)}",endpoint="{label(path)}",'
+                                 f'status="{label(status)}"}} {count}')
+            lines.append(f'# TYPE {PREFIX}_requests_in_flight gauge')
+            lines.append(f'{PREFIX}_requests_in_flight {self.in_flight}')
+            lines.append(f'# TYPE {PREFIX}_request_duration_seconds histogram')
+            for key, endpoint in sorted(self.endpoints.items()):
+                method, path = key.split(' ', 1)
+                if endpoint.buckets.count:
+                    lines.extend(endpoint.buckets.exposition(f'{PREFIX}_request_duration_seconds',
+                                                             f'method="{label(method)}",endpoint="{label(path)}"'))
+            for series, attribute in ((f'{PREFIX}_sent_bytes_total', 'bytes_sent'),
+                                      (f'{PREFIX}_received_bytes_total', 'bytes_received'),
+                                      (f'{PREFIX}_cache_hits_total', 'cache_hits')):
+                lines.append(f'# TYPE {series} counter')
+                for key, endpoint in sorted(self.endpoints.items()):
+                    method, path = key.split(' ', 1)
+                    lines.append(f'{series}{{method="{label(method)}",endpoint="{label(path)}"}} '
+                                 f'{getattr(endpoint, attribute)}')
+            lines.append(f'# TYPE {PREFIX}_schema_validation_seconds histogram')
+            lines.extend(self.validation.exposition(f'{PREFIX}_schema_validation_seconds', ''))
+            return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> dict:
+        """
+        Starts a new window
+        :return: totals and the throughput and latency percentiles of the window since the previous snapshot
+        """
+        with self._lock:
+            now = time.perf_counter()
+            elapsed_s = now - self._window_started
+            endpoints = {}
+            for key, endpoint in sorted(self.endpoints.items()):
+                window = endpoint.window.summary()
+                endpoints[key] = {"requests": sum(endpoint.statuses.values()),
+                                  "statuses": {str(status): count for status, count in endpoint.statuses.items()},
+                                  "window_requests": window["count"],
+                                  "window_p50_ms": window["p50_ms"], "window_p99_ms": window["p99_ms"],
+                                  "window_max_ms": window["max_ms"], "bytes_sent": endpoint.bytes_sent,
+                                  "bytes_received": endpoint.bytes_received, "cache_hits": endpoint.cache_hits}
+                endpoint.window = LatencyHistogram()
+            snapshot = {"time": time.time(), "uptime_s": time.time() - self.started, "in_flight": self.in_flight,
+                        "window_s": elapsed_s,
+                        "window_rps": self._window_requests / elapsed_s if elapsed_s > 0 else 0.0,
+                        "schema_validations": self.validation.count,
+                        "window_schema_validation_s": self.window_validation_s, "endpoints": endpoints}
+            self._window_started = now
+            self._window_requests = 0
+            self.window_validation_s = 0.0
+            return snapshot
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        content = self.server.registry.prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """
+    Local HTTP endpoint '/metrics' for Prometheus
+    """
+    daemon_threads = True
+
+    def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 0):
+        """
+        :param port: 0 takes a free port
+        """
+        super().__init__((host, port), MetricsRequestHandler)
+        self.registry = registry
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/metrics'
+
+    def start(self) -> 'MetricsServer':
+        self._thread = threading.Thread(target=self.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class SnapshotWriter(object):
+    """
+    Appends a JSON line of 'MetricsRegistry.snapshot' to the file every interval and once more on stop
+    """
+    def __init__(self, registry: MetricsRegistry, path: str, interval_s: float = 5.0):
+        self.registry = registry
+        self.path = path
+        self.interval_s = interval_s
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def write(self):
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(self.registry.snapshot()) + '\n')
+
+    def _run(self):
+        while not self._stopped.wait(self.interval_s):
+            self.write()
+
+    def start(self) -> 'SnapshotWriter':
+        self._thread = threading.Thread(target=self._run, name='metrics-snapshots', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+
+class MetricsExporter(object):
+    """
+    Registry installed into 'API' with the optional HTTP endpoint and JSON lines snapshots
+    """
+    def __init__(self, port: int = None, jsonl: str = None, interval_s: float = 5.0):
+        """
+        :param port: port of the '/metrics' endpoint, 0 takes a free one, None does not serve it
+        :param jsonl: file the snapshots are appended to, None does not write them
+        """
+        self.registry = MetricsRegistry()
+        self.server = MetricsServer(self.registry, port=port) if port is not None else None
+        self.writer = SnapshotWriter(self.registry, jsonl, interval_s) if jsonl else None
+
+    def start(self) -> 'MetricsExporter':
+        self.registry.install()
+        if self.server is not None:
+            self.server.start()
+        if self.writer is not None:
+            self.writer.start()
+        return self
+
+    def stop(self):
+        if self.writer is not None:
+            self.writer.stop()
+        if self.server is not None:
+            self.server.stop()
+        self.registry.uninstall()
@@ -0,0 +1,100 @@
+import json
+import threading
+from source.helpers.work_with_raw_response import RawRequest, RawResponse
+
+
+class NamespaceBudgetExceeded(Exception):
+    """
+    The worker tries to keep more characters than its share of the collection limit
+    """
+
+
+class CharacterNamespace(object):
+    """
+    Per-worker namespace of characters names. Names of sent characters get the suffix, the suffix is removed
+    from the answers, so tests work with the original names
+    """
+    def __init__(self, worker: str, budget: int):
+        self.suffix = f' [{worker}]'
+        self.budget = budget
+        self.live = 0
+        self.resets = 0
+        self._lock = threading.Lock()
+        self._encoded_suffix = json.dumps(self.suffix)[1:-1].encode('utf-8')
+
+    def apply_name(self, name: str) -> str:
+        return name + self.suffix if isinstance(name, str) and name else name
+
+    def apply_payload(self, payload):
+        """
+        :return: copy of the character fields with the namespaced name
+        """
+        if isinstance(payload, dict) and "name" in payload:
+            return dict(payload, name=self.apply_name(payload["name"]))
+        return payload
+
+    def strip_response(self, response) -> RawResponse:
+        """
+        :param response: HTTP answer
+        :return: the same answer without the suffix in the body
+        """
+        request = RawRequest(response.request.method, response.request.url)
+        return RawResponse(request, response.status_code, response.headers,
+                           response.content.replace(self._encoded_suffix, b''))
+
+    def strip_stream(self, response) -> 'StrippedStream':
+        """
+        :param response: streamed HTTP answer
+        :return: the answer which body is stripped while it's iterated
+        """
+        return StrippedStream(response, self._encoded_suffix)
+
+    def reserve(self):
+        """
+        Counts one more character of the worker before POST
+        """
+        with self._lock:
+            if self.live >= self.budget:
+                raise NamespaceBudgetExceeded(f'The worker may keep only {self.budget} characters')
+            self.live += 1
+
+    def release(self, count: int = 1):
+        with self._lock:
+            self.live = max(self.live - count, 0)
+
+    def forget(self, resets: int = None):
+        """
+        Drops the count of the kept characters after the reset of the database
+        :param resets: count of the resets of the run the worker has seen, it's kept if None
+        """
+        with self._lock:
+            self.live = 0
+            if resets is not None:
+                self.resets = resets
+
+
+class StrippedStream(object):
+    """
+    Streamed answer without the suffix in the body; a suffix split between two chunks is removed too
+    """
+    def __init__(self, response, suffix: bytes):
+        self.response = response
+        self.request = response.request
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.suffix = suffix
+
+    def iter_content(self, chunk_size: int = 1, decode_unicode: bool = False):
+        keep = len(self.suffix) - 1
+        tail = b''
+        for chunk in self.response.iter_content(chunk_size=chunk_size):
+            data = (tail + chunk).replace(self.suffix, b'')
+            # The end shorter than the suffix may be the beginning of the suffix, it waits for the next chunk
+            data, tail = (data[:-keep], data[-keep:]) if keep and len(data) > keep else (b'', data)
+            if data:
+                yield data
+        if tail:
+            yield tail
+
+    def close(self):
+        self.response.close()
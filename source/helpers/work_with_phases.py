@@ -0,0 +1,62 @@
+import threading
+
+PHASES = ("dns", "connect", "tls", "ttfb", "download")
+
+_CURRENT = threading.local()
+
+
+class PhaseTiming(object):
+    """
+    Phases of one request in ms. Phases of a reused connection (dns, connect, tls) are 0.
+    'ttfb' is from sending the request to the headers of the answer, 'download' is reading of the body
+    """
+    __slots__ = ('dns', 'connect', 'tls', 'ttfb', 'download', 'reused', 'request_started', 'headers_received')
+
+    def __init__(self):
+        self.dns = self.connect = self.tls = self.ttfb = self.download = 0.0
+        self.reused = True
+        self.request_started = self.headers_received = None
+
+    def sent(self, moment: float):
+        """
+        :param moment: 'time.perf_counter()' before the request is sent; phases of the previous try are dropped
+        """
+        self.dns = self.connect = self.tls = 0.0
+        self.reused = True
+        self.request_started = moment
+
+    def received(self, moment: float):
+        """
+        :param moment: 'time.perf_counter()' after the headers of the answer are read
+        """
+        self.headers_received = moment
+        self.ttfb = max((moment - self.request_started) * 1000 - self.dns - self.connect - self.tls, 0.0)
+
+    def finished(self, moment: float):
+        """
+        :param moment: 'time.perf_counter()' after the body is read
+        """
+        if self.headers_received is not None:
+            self.download = (moment - self.headers_received) * 1000
+
+    def as_dict(self) -> dict:
+        return {phase: getattr(self, phase) for phase in PHASES}
+
+    def __repr__(self):
+        return '<PhaseTiming ' + ' '.join(f'{phase}={getattr(self, phase):.2f}' for phase in PHASES) + ' ms>'
+
+
+def start() -> PhaseTiming:
+    """
+    :return: phases of the request which the current thread starts; the transport fills them
+    """
+    _CURRENT.phases = PhaseTiming()
+    return _CURRENT.phases
+
+
+def current() -> PhaseTiming | None:
+    return getattr(_CURRENT, 'phases', None)
+
+
+def stop():
+    _CURRENT.phases = None
@@ -0,0 +1,62 @@
+import json
+from requests.structures import CaseInsensitiveDict
+
+
+class RawRequest(object):
+    """
+    Minimal description of a sent HTTP request
+    """
+    def __init__(self, method: str, url: str, headers: dict | None = None, body: bytes | None = None):
+        self.method = method
+        self.url = url
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.body = body
+
+
+class RawResponse(object):
+    """
+    HTTP answer which has the same fields as 'requests.Response', that 'ParseResponse' uses
+    """
+    def __init__(self, request: RawRequest, status_code: int, headers: dict, content: bytes):
+        self.request = request
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self._text = None
+
+    @property
+    def encoding(self) -> str:
+        """
+        :return: charset from 'Content-Type' or utf-8
+        """
+        for part in self.headers.get('Content-Type', '').split(';')[1:]:
+            key, _, value = part.strip().partition('=')
+            if key.lower() == 'charset' and value:
+                return value.strip('"\'')
+        return 'utf-8'
+
+    @property
+    def text(self) -> str:
+        """
+        :return: decoded body
+        """
+        if self._text is None:
+            self._text = self.content.decode(self.encoding, errors='replace')
+        return self._text
+
+    def iter_content(self, chunk_size: int = 1, decode_unicode: bool = False):
+        """
+        :return: generator of the slices of the body, like 'requests.Response.iter_content' of a read body
+        """
+        size = chunk_size or len(self.content) or 1
+        for start in range(0, len(self.content), size):
+            yield self.content[start:start + size]
+
+    def close(self):
+        pass
+
+    def json(self):
+        """
+        :return: JSON body. Raises 'JSONDecodeError' like 'requests' does
+        """
+        return json.loads(self.text)
@@ -0,0 +1,47 @@
+import functools
+import sys
+
+BRIGHT = '\x1b[1m'
+
+
+def _allure():
+    """
+    :return: allure module if the running process already imported it (the pytest session does), else None
+    """
+    return sys.modules.get('allure')
+
+
+def step(title: str):
+    """
+    'allure.step' which does not import allure: outside the pytest session the function is called as it is
+    """
+    def decorator(function):
+        reported = []
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            allure = _allure()
+            if allure is None:
+                return function(*args, **kwargs)
+            if not reported:
+                reported.append(allure.step(title)(function))
+            return reported[0](*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def title(name: str):
+    """
+    'allure.title' which is applied only if allure is already imported
+    """
+    def decorator(obj):
+        allure = _allure()
+        return obj if allure is None else allure.title(name)(obj)
+    return decorator
+
+
+def bright() -> str:
+    """
+    :return: bright style of colorama if the process uses colorama, else an empty string
+    """
+    return BRIGHT if 'colorama' in sys.modules else ''
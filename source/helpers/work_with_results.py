@@ -0,0 +1,167 @@
+import itertools
+import json
+import math
+import os
+import random
+import sqlite3
+import subprocess
+import time
+import uuid
+from statistics import NormalDist
+from source.helpers.work_with_stats import LatencyHistogram
+
+COMPARED_PERCENTILES = (50, 99)
+
+
+def current_commit() -> str:
+    """
+    :return: short hash of the checked out git commit (with '+' if the tree is changed) or 'unknown'
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=directory, capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+        changed = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=directory,
+                                 capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+    return (commit + ('+' if changed else '')) if commit else 'unknown'
+
+
+class ResultStore(object):
+    """
+    SQLite store of latency results. A row is one endpoint of one run; a run is keyed by git commit,
+    base URL of the service and scenario. Histograms are kept whole, so runs can be compared statistically
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS results (run_id TEXT, created REAL, git_commit TEXT, base_url TEXT, '
+            'scenario TEXT, endpoint TEXT, duration_s REAL, throughput REAL, p50_ms REAL, p99_ms REAL, '
+            'histogram TEXT)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS results_run ON results (run_id)')
+
+    def save_run(self, scenario: str, base_url: str, endpoints: dict, duration_s: float = None,
+                 commit: str = None) -> str:
+        """
+        :param endpoints: dict (key: endpoint, value: 'LatencyHistogram')
+        :param duration_s: duration of the run, throughput is count of requests by it
+        :return: id of the run
+        """
+        run_id = time.strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+        created, commit = time.time(), commit or current_commit()
+        with self._connection:
+            self._connection.executemany(
+                'INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(run_id, created, commit, base_url, scenario, endpoint, duration_s,
+                  histogram.total / duration_s if duration_s else None, histogram.percentile(50),
+                  histogram.percentile(99), json.dumps(histogram.to_dict()))
+                 for endpoint, histogram in endpoints.items()])
+        return run_id
+
+    def runs(self, scenario: str = None, base_url: str = None) -> list:
+        """
+        :return: runs from the oldest one, every run is dict of its keys
+        """
+        query = 'SELECT run_id, MIN(created), git_commit, base_url, scenario, COUNT(*) FROM results'
+        conditions = [(column, value) for column, value in (('scenario', scenario), ('base_url', base_url))
+                      if value is not None]
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(f'{column} = ?' for column, _ in conditions)
+        query += ' GROUP BY run_id ORDER BY MIN(created)'
+        return [{"run_id": row[0], "created": row[1], "commit": row[2], "base_url": row[3], "scenario": row[4],
+                 "endpoints": row[5]}
+                for row in self._connection.execute(query, [value for _, value in conditions])]
+
+    def load_run(self, run_id: str) -> dict:
+        """
+        :return: dict (key: endpoint, value: dict with 'histogram', 'throughput' and keys of the run)
+        """
+        rows = self._connection.execute('SELECT endpoint, throughput, histogram, git_commit, base_url, scenario '
+                                        'FROM results WHERE run_id = ?', (run_id,)).fetchall()
+        if not rows:
+            raise KeyError(f'No run "{run_id}" in {self.path}')
+        return {endpoint: {"throughput": throughput, "histogram": LatencyHistogram.from_dict(json.loads(histogram)),
+                           "commit": commit, "base_url": base_url, "scenario": scenario}
+                for endpoint, throughput, histogram, commit, base_url, scenario in rows}
+
+    def close(self):
+        self._connection.close()
+
+
+def _percentile_of_sorted(values: list, percent: float) -> float:
+    return values[min(max(math.ceil(len(values) * percent / 100), 1), len(values)) - 1]
+
+
+def bootstrap_ratio(baseline: LatencyHistogram, candidate: LatencyHistogram, percent: float,
+                    resamples: int = 200, sample_size: int = 1000, confidence: float = 0.95,
+                    seed: int = 0) -> tuple:
+    """
+    Bootstrap interval of the ratio candidate/baseline of the percentile. Samples are drawn from the buckets
+    :return: (low, high) bounds of the ratio
+    """
+    rng = random.Random(seed)
+    sides = []
+    for histogram in (baseline, candidate):
+        values, counts = zip(*histogram.buckets())
+        sides.append((values, list(itertools.accumulate(counts)), min(histogram.total, sample_size)))
+    ratios = []
+    for _ in range(resamples):
+        base, cand = (_percentile_of_sorted(sorted(rng.choices(values, cum_weights=weights, k=size)), percent)
+                      for values, weights, size in sides)
+        ratios.append(cand / base if base else float('inf'))
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    return ratios[int(tail * (resamples - 1))], ratios[int((1 - tail) * (resamples - 1))]
+
+
+def rate_ratio_interval(baseline_count: int, baseline_rate: float, candidate_count: int, candidate_rate: float,
+                        confidence: float = 0.95) -> tuple:
+    """
+    Interval of the ratio candidate/baseline of the throughput; counts of requests are taken as Poisson
+    :return: (low, high) bounds of the ratio
+    """
+    ratio = candidate_rate / baseline_rate
+    spread = NormalDist().inv_cdf(1 - (1 - confidence) / 2) * math.sqrt(1 / baseline_count + 1 / candidate_count)
+    return ratio * math.exp(-spread), ratio * math.exp(spread)
+
+
+def compare_runs(baseline: dict, candidate: dict, threshold: float = 0.05, confidence: float = 0.95,
+                 resamples: int = 200) -> list:
+    """
+    Compares p50, p99 and throughput of the common endpoints. A latency regression is significant when
+    the whole bootstrap interval of the ratio is above 1 + threshold, a throughput regression when the whole
+    interval of the rates ratio is below 1 - threshold
+    :param baseline: run from 'ResultStore.load_run'
+    :param candidate: run from 'ResultStore.load_run'
+    :return: list of dicts (endpoint, metric, baseline, candidate, change, low and high bounds of the change,
+        regression)
+    """
+    rows = []
+    for endpoint in sorted(set(baseline) & set(candidate)):
+        old, new = baseline[endpoint]["histogram"], candidate[endpoint]["histogram"]
+        if not old.total or not new.total:
+            continue
+        for percent in COMPARED_PERCENTILES:
+            before, after = old.percentile(percent), new.percentile(percent)
+            low, high = bootstrap_ratio(old, new, percent, resamples=resamples, confidence=confidence)
+            rows.append({"endpoint": endpoint, "metric": f'p{percent}_ms', "baseline": before, "candidate": after,
+                         "change": after / before - 1 if before else 0.0, "low": low - 1, "high": high - 1,
+                         "regression": low > 1 + threshold})
+        before, after = baseline[endpoint]["throughput"], candidate[endpoint]["throughput"]
+        if before and after:
+            low, high = rate_ratio_interval(old.total, before, new.total, after, confidence=confidence)
+            rows.append({"endpoint": endpoint, "metric": 'throughput', "baseline": before, "candidate": after,
+                         "change": after / before - 1, "low": low - 1, "high": high - 1,
+                         "regression": high < 1 - threshold})
+    return rows
+
+
+def format_comparison(rows: list) -> str:
+    lines = [f'{"endpoint":<32}{"metric":<12}{"baseline":>11}{"candidate":>11}{"change":>9}{"interval":>18}  verdict']
+    for row in rows:
+        interval = f'{row["low"] * 100:+.1f}..{row["high"] * 100:+.1f}%'
+        lines.append(f'{row["endpoint"]:<32}{row["metric"]:<12}{row["baseline"]:>11.2f}{row["candidate"]:>11.2f}'
+                     f'{row["change"] * 100:>+8.1f}%{interval:>18}  {"REGRESSION" if row["regression"] else "ok"}')
+    return '\n'.join(lines)
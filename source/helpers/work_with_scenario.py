@@ -0,0 +1,241 @@
+from copy import deepcopy
+from source.helpers.work_with_api import API
+from source.helpers import work_with_reporting as reporting
+from source.helpers.work_with_schema import collect_violations, format_violations
+from source.data import data_expected_bodies, data_expected_responses
+
+ECHO = 'echo'
+
+OPERATIONS = ('post', 'get', 'put', 'delete', 'get_all', 'reset')
+
+
+class ScenarioError(Exception):
+    """
+    The scenario is described wrongly
+    """
+
+
+class Ref(object):
+    """
+    Reference to a constant of 'data_expected_bodies' or 'data_expected_responses',
+    e.g. Ref('DATA_CHANGED_NAME_FOR_PUT', 0, 'result')
+    """
+    modules = (data_expected_bodies, data_expected_responses)
+
+    def __init__(self, constant: str, *path):
+        self.constant = constant
+        self.path = path
+
+    def resolve(self):
+        """
+        :return: copy of the referenced value
+        """
+        for module in self.modules:
+            if hasattr(module, self.constant):
+                value = getattr(module, self.constant)
+                break
+        else:
+            raise ScenarioError(f'There is no {self.constant} in the data modules')
+        try:
+            for key in self.path:
+                value = value[key]
+        except (KeyError, IndexError, TypeError):
+            raise ScenarioError(f'{self!r} does not exist')
+        return deepcopy(value)
+
+    def __repr__(self):
+        return self.constant + ''.join(f'[{key!r}]' for key in self.path)
+
+
+def resolve(value):
+    return value.resolve() if isinstance(value, Ref) else deepcopy(value)
+
+
+def renamed(value, names: dict):
+    """
+    :param value: payload or expected body
+    :param names: dict (key: original name, value: name of the run)
+    :return: copy where the names are replaced, in the error messages too
+    """
+    if not names:
+        return value
+    if isinstance(value, dict):
+        return {key: renamed(item, names) for key, item in value.items()}
+    if isinstance(value, list):
+        return [renamed(item, names) for item in value]
+    if isinstance(value, str):
+        if value in names:
+            return names[value]
+        for original in sorted(names, key=len, reverse=True):
+            value = value.replace(original, names[original])
+    return value
+
+
+class Step(object):
+    """
+    One request of the scenario and its expectations
+    """
+    def __init__(self, operation: str, payload=None, name=None, status: int = 200, schema: dict = None,
+                 body=None, listed: bool = None, title: str = None):
+        """
+        :param operation: one of 'OPERATIONS'
+        :param payload: character fields or 'Ref' to them; get and delete take the name from it
+        :param name: character's name or 'Ref' to it for get and delete
+        :param status: expected status code
+        :param schema: schema of 'source.data.schema'; the body is checked if the schema requires
+            "result" or "error", otherwise the "result" of the body
+        :param body: expected body, 'Ref' to it or 'ECHO' for {"result": payload}
+        :param listed: for get_all, the character of the payload (or the name) must be listed or must not be
+        """
+        if operation not in OPERATIONS:
+            raise ScenarioError(f'Unknown operation "{operation}", expected one of {OPERATIONS}')
+        if operation in ('post', 'put') and payload is None:
+            raise ScenarioError(f'{operation} needs the payload')
+        if operation in ('get', 'delete') and payload is None and name is None:
+            raise ScenarioError(f'{operation} needs the payload or the name')
+        self.operation = operation
+        self.payload = payload
+        self.name = name
+        self.status = status
+        self.schema = schema
+        self.body = body
+        self.listed = listed
+        self.title = title or ' '.join([operation] + self.names()[:1])
+
+    def names(self) -> list:
+        """
+        :return: characters names the step works with
+        """
+        names = []
+        if self.name is not None:
+            names.append(resolve(self.name))
+        payload = resolve(self.payload)
+        if isinstance(payload, dict) and isinstance(payload.get("name"), str):
+            names.append(payload["name"])
+        return names
+
+
+class StepResult(object):
+    def __init__(self, title: str, status: int | str, elapsed_ms: float, problems: list):
+        self.title = title
+        self.status = status
+        self.elapsed_ms = elapsed_ms
+        self.problems = problems
+
+    @property
+    def passed(self) -> bool:
+        return not self.problems
+
+    def __repr__(self):
+        return f'<StepResult {self.title} {self.status} {self.elapsed_ms:.2f} ms {self.problems or "ok"}>'
+
+
+class ScenarioResult(object):
+    """
+    Results of the steps of one run; the run stops on the first failed step
+    """
+    def __init__(self, scenario: str, steps: list, leftovers: list):
+        """
+        :param leftovers: characters names created by the run and not deleted by it
+        """
+        self.scenario = scenario
+        self.steps = steps
+        self.leftovers = leftovers
+
+    @property
+    def passed(self) -> bool:
+        return all(step.passed for step in self.steps)
+
+    def report(self) -> str:
+        return '\n'.join(f'{"PASS" if step.passed else "FAIL"}  {step.title:<50}{step.status!s:>6}'
+                         f'{step.elapsed_ms:9.2f} ms  {"; ".join(step.problems)}' for step in self.steps)
+
+
+class Scenario(object):
+    """
+    Named sequence of steps. It runs as a functional test and as a script of a virtual user of the load run
+    """
+    def __init__(self, name: str, steps: list):
+        self.name = name
+        self.steps = steps
+        self._names = None
+
+    def names(self) -> list:
+        if self._names is None:
+            self._names = list(dict.fromkeys(name for step in self.steps for name in step.names()))
+        return self._names
+
+    def run(self, login: str, password: str, suffix: str = '') -> ScenarioResult:
+        """
+        :param suffix: added to every character's name of the scenario, so several runs do not collide
+        """
+        names = {name: name + suffix for name in self.names()} if suffix else {}
+        created = {}
+        results = []
+        for step in self.steps:
+            result = self.run_step(step, names, created, login, password)
+            results.append(result)
+            if not result.passed:
+                break
+        return ScenarioResult(self.name, results, list(created))
+
+    @reporting.step('Шаг сценария')
+    def run_step(self, step: Step, names: dict, created: dict, login: str, password: str) -> StepResult:
+        api = API()
+        payload = renamed(resolve(step.payload), names)
+        name = renamed(resolve(step.name), names) if step.name is not None else \
+            payload.get("name") if isinstance(payload, dict) else None
+        if step.operation == 'post':
+            response = api.post_character_by_body(json=payload, login=login, password=password)
+        elif step.operation == 'put':
+            response = api.put_character_by_name(json=payload, login=login, password=password)
+        elif step.operation == 'get':
+            response = api.get_character_by_name(raw_character_name=name, login=login, password=password)
+        elif step.operation == 'delete':
+            response = api.delete_character(raw_character_name=name, login=login, password=password)
+        elif step.operation == 'get_all':
+            response = api.get_all_characters(login=login, password=password)
+        else:
+            response = api.delete_all_characters(login=login, password=password)
+        if response.status_code == 200:
+            if step.operation == 'post':
+                created[name] = None
+            elif step.operation == 'delete':
+                created.pop(name, None)
+            elif step.operation == 'reset':
+                created.clear()
+        return StepResult(step.title, response.status_code, response.timing.elapsed_ms,
+                          self.check(step, response, payload, name, names))
+
+    @staticmethod
+    def check(step: Step, response, payload, name: str, names: dict) -> list:
+        """
+        :return: list of the problems of the answer
+        """
+        if response.status_code != step.status:
+            return [f'expected status {step.status}, got {response.status_code}: {response.text[:200]}']
+        try:
+            body = response.body
+        except ValueError:
+            return ['the body is not JSON']
+        problems = []
+        if step.schema is not None:
+            required = set(step.schema.get("required", ()))
+            instance = body if required & {"result", "error"} or not isinstance(body, dict) else body.get("result")
+            violations = collect_violations(instance, step.schema)
+            if violations:
+                problems.append(format_violations(violations))
+        if step.body is not None:
+            expected = {"result": payload} if step.body == ECHO else renamed(resolve(step.body), names)
+            if body != expected:
+                problems.append(f'expected body {expected}, got {body}')
+        if step.listed is not None:
+            listing = body.get("result") if isinstance(body, dict) else None
+            listing = listing if isinstance(listing, list) else []
+            if isinstance(payload, dict) and len(payload) > 1:
+                found = payload in listing
+            else:
+                found = any(character.get("name") == name for character in listing if isinstance(character, dict))
+            if found != step.listed:
+                problems.append(f'{name} is {"not " if step.listed else ""}listed')
+        return problems
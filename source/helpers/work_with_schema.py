@@ -0,0 +1,54 @@
+import time
+from jsonschema.validators import validator_for
+
+_VALIDATORS = {}
+
+metrics = None
+
+
+def get_validator(schema: dict):
+    """
+    Checks the schema and builds its validator once, next calls return the cached one
+    :param schema: schema sample for validation
+    :return: jsonschema validator
+    """
+    cached = _VALIDATORS.get(id(schema))
+    if cached is None or cached[0] is not schema:
+        validator_class = validator_for(schema)
+        validator_class.check_schema(schema)
+        cached = (schema, validator_class(schema))
+        _VALIDATORS[id(schema)] = cached
+    return cached[1]
+
+
+def describe_error(error) -> str:
+    path = '.'.join(str(part) for part in error.absolute_path)
+    return f'{path}: {error.message}' if path else error.message
+
+
+def collect_violations(payload: dict | list, schema: dict) -> dict:
+    """
+    Validates all characters in one pass and collects every violation
+    :param payload: character fields or list of them
+    :param schema: schema sample for validation
+    :return: dict (key: character's name or its index if there is no name, value: list of violations)
+    """
+    started = time.perf_counter()
+    validator = get_validator(schema)
+    violations = {}
+    for index, instance in enumerate(payload if isinstance(payload, list) else [payload]):
+        errors = [describe_error(error) for error in validator.iter_errors(instance)]
+        if errors:
+            name = instance.get("name") if isinstance(instance, dict) else None
+            key = name if isinstance(name, str) and name and name not in violations else f'#{index}'
+            violations[key] = errors
+    if metrics is not None:
+        metrics.validated(time.perf_counter() - started)
+    return violations
+
+
+def format_violations(violations: dict) -> str:
+    """
+    :return: report with one line per violation
+    """
+    return '\n'.join(f'{name}: {error}' for name, errors in violations.items() for error in errors)
@@ -0,0 +1,256 @@
+import socket
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family, create_connection
+from source.helpers import work_with_phases
+from source.data.data_headers import HEADERS, HEADERS_KEEP_ALIVE
+
+
+class ConnectionCounter(object):
+    """
+    Thread-safe counters of opened sockets and sent requests
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def count_opened(self):
+        with self._lock:
+            self.opened += 1
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def as_dict(self) -> dict:
+        """
+        :return: opened, reused connections and the count of sent requests
+        """
+        with self._lock:
+            return {"opened": self.opened,
+                    "reused": max(self.requests - self.opened, 0),
+                    "requests": self.requests}
+
+
+COUNTER = ConnectionCounter()
+
+
+def timed_socket(connection: HTTPConnection) -> socket.socket:
+    """
+    Opens the socket of the connection with the public 'socket.getaddrinfo' and
+    'urllib3.util.connection.create_connection'; the name resolution and TCP connect are written
+    into the phases of the current request
+    """
+    phases = work_with_phases.current()
+    started = time.perf_counter()
+    try:
+        addresses = socket.getaddrinfo(connection.host, connection.port, allowed_gai_family(), socket.SOCK_STREAM)
+    except socket.gaierror as err:
+        raise NewConnectionError(connection, f'Failed to establish a new connection: {err}')
+    resolved = time.perf_counter()
+    extra = {"socket_options": connection.socket_options} if connection.socket_options else {}
+    error = None
+    for address in dict.fromkeys(address[4][:2] for address in addresses):
+        try:
+            sock = create_connection(address, connection.timeout, source_address=connection.source_address,
+                                     **extra)
+        except socket.timeout:
+            raise ConnectTimeoutError(connection, f'Connection to {connection.host} timed out. '
+                                                  f'(connect timeout={connection.timeout})')
+        except OSError as err:
+            error = err
+            continue
+        if phases is not None:
+            phases.reused = False
+            phases.dns = (resolved - started) * 1000
+            phases.connect = (time.perf_counter() - resolved) * 1000
+        return sock
+    raise NewConnectionError(connection, f'Failed to establish a new connection: {error or "no addresses"}')
+
+
+class TimedConnectionMixin(object):
+    """
+    Connection which writes the name resolution and connect times into the phases of the request
+    """
+    def _new_conn(self):
+        return timed_socket(self)
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    """
+    HTTPS connection which writes the TLS handshake time into the phases too
+    """
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        phases = work_with_phases.current()
+        if phases is not None:
+            phases.tls = max((time.perf_counter() - started) * 1000 - phases.dns - phases.connect, 0.0)
+
+
+class TimedPoolMixin(object):
+    """
+    Connection pool which takes the time to the headers of the answer as the TTFB phase
+    """
+    def _make_request(self, *args, **kwargs):
+        phases = work_with_phases.current()
+        if phases is None:
+            return super()._make_request(*args, **kwargs)
+        phases.sent(time.perf_counter())
+        response = super()._make_request(*args, **kwargs)
+        phases.received(time.perf_counter())
+        return response
+
+
+class CountingConnectionMixin(object):
+    """
+    Connection which counts its opened sockets: urllib3 reconnects the same connection object
+    after the server has closed the socket
+    """
+    def _new_conn(self):
+        sock = super()._new_conn()
+        COUNTER.count_opened()
+        return sock
+
+
+class CountingHTTPConnection(CountingConnectionMixin, TimedHTTPConnection):
+    pass
+
+
+class CountingHTTPSConnection(CountingConnectionMixin, TimedHTTPSConnection):
+    pass
+
+
+class CountingPoolMixin(object):
+    """
+    Connection pool which counts sent requests
+    """
+    def _make_request(self, *args, **kwargs):
+        COUNTER.count_request()
+        return super()._make_request(*args, **kwargs)
+
+
+class TimedHTTPConnectionPool(TimedPoolMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(TimedPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class CountingHTTPConnectionPool(CountingPoolMixin, TimedHTTPConnectionPool):
+    ConnectionCls = CountingHTTPConnection
+
+
+class CountingHTTPSConnectionPool(CountingPoolMixin, TimedHTTPSConnectionPool):
+    ConnectionCls = CountingHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter which uses the timed connection pools
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool,
+                                                   "https": TimedHTTPSConnectionPool}
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter which uses the counting connection pools
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": CountingHTTPConnectionPool,
+                                                   "https": CountingHTTPSConnectionPool}
+
+
+class OneShotHTTP(object):
+    """
+    Replacement of the functions of 'requests' for the not pooled mode: every request gets its own session,
+    so its own connection, but the transport is timed
+    """
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        with requests.Session() as session:
+            adapter = TimedHTTPAdapter()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            return session.request(method=method, url=url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+
+ONE_SHOT_HTTP = OneShotHTTP()
+
+
+class SessionPool(object):
+    """
+    Class keeps one shared HTTP session, so all API instances reuse the same connections
+    """
+    _session = None
+    _keep_alive = True
+
+    @classmethod
+    def open(cls, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+             keep_alive: bool = True) -> requests.Session:
+        """
+        Creates the shared session. The previous one is closed
+        :param pool_connections: count of cached per-host pools
+        :param pool_maxsize: max count of connections kept per host
+        :param pool_block: wait for a free connection instead of opening an extra one
+        :param keep_alive: send 'Connection: keep-alive' instead of 'Connection: close'
+        :return: shared session
+        """
+        cls.close()
+        adapter = PooledHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                    pool_block=pool_block)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        cls._session = session
+        cls._keep_alive = keep_alive
+        return session
+
+    @classmethod
+    def current(cls) -> requests.Session | None:
+        """
+        :return: shared session or None if the pooled mode is off
+        """
+        return cls._session
+
+    @classmethod
+    def headers(cls) -> dict:
+        """
+        :return: default headers for the current mode
+        """
+        if cls._session is not None and cls._keep_alive:
+            return HEADERS_KEEP_ALIVE
+        return HEADERS
+
+    @classmethod
+    def close(cls):
+        """
+        Closes the shared session and all its connections
+        """
+        if cls._session is not None:
+            cls._session.close()
+            cls._session = None
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        :return: count of opened and reused connections
+        """
+        return COUNTER.as_dict()
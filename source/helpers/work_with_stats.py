@@ -0,0 +1,132 @@
+import math
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram(object):
+    """
+    Fixed-memory latency histogram with log-spaced buckets. Bucket bounds grow by 'precision', so every
+    percentile is reported with the relative error not bigger than 'precision'
+    """
+    def __init__(self, lowest_ms: float = 0.01, highest_ms: float = 120000.0, precision: float = 0.01):
+        self.lowest_ms = lowest_ms
+        self.highest_ms = highest_ms
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.counts = [0] * (self._index(highest_ms) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    def _index(self, value_ms: float) -> int:
+        if value_ms <= self.lowest_ms:
+            return 0
+        return int(math.log(value_ms / self.lowest_ms) / self._log_base) + 1
+
+    def _bucket_value(self, index: int) -> float:
+        """
+        :return: upper bound of the bucket
+        """
+        return self.lowest_ms * math.exp(index * self._log_base)
+
+    def record(self, value_ms: float, count: int = 1):
+        """
+        Adds the value to the histogram. Values bigger than 'highest_ms' fall into the last bucket
+        """
+        index = min(self._index(value_ms), len(self.counts) - 1)
+        self.counts[index] += count
+        self.total += count
+        self.sum_ms += value_ms * count
+        self.min_ms = min(self.min_ms, value_ms)
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, percent: float) -> float:
+        """
+        :param percent: percentile in 0..100
+        :return: value in ms or 0.0 for the empty histogram
+        """
+        if not self.total:
+            return 0.0
+        rank = max(math.ceil(self.total * percent / 100), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index == len(self.counts) - 1:
+                    return self.max_ms
+                return min(max(self._bucket_value(index), self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """
+        Adds the counts of the histogram with the same buckets
+        """
+        if len(other.counts) != len(self.counts) or other.precision != self.precision \
+                or other.lowest_ms != self.lowest_ms:
+            raise ValueError('Histograms with different buckets can not be merged')
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.sum_ms += other.sum_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        :return: compact JSON-serializable form, only not empty buckets are kept
+        """
+        return {"lowest_ms": self.lowest_ms, "highest_ms": self.highest_ms, "precision": self.precision,
+                "counts": {str(index): count for index, count in enumerate(self.counts) if count},
+                "total": self.total, "sum_ms": self.sum_ms,
+                "min_ms": self.min_ms if self.total else None, "max_ms": self.max_ms}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        histogram = cls(lowest_ms=data["lowest_ms"], highest_ms=data["highest_ms"], precision=data["precision"])
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+        histogram.total = data["total"]
+        histogram.sum_ms = data["sum_ms"]
+        histogram.min_ms = data["min_ms"] if data["min_ms"] is not None else math.inf
+        histogram.max_ms = data["max_ms"]
+        return histogram
+
+    def buckets(self) -> list:
+        """
+        :return: list of (value in ms, count) of not empty buckets, values are clamped to min and max
+        """
+        last = len(self.counts) - 1
+        return [(self.max_ms if index == last else min(max(self._bucket_value(index), self.min_ms), self.max_ms), count)
+                for index, count in enumerate(self.counts) if count]
+
+    @property
+    def mean_ms(self) -> float:
+        return self.sum_ms / self.total if self.total else 0.0
+
+    def summary(self) -> dict:
+        """
+        :return: count, mean, min, max and the main percentiles
+        """
+        result = {"count": self.total, "mean_ms": self.mean_ms,
+                  "min_ms": self.min_ms if self.total else 0.0, "max_ms": self.max_ms}
+        result.update({f"p{percent:g}_ms": self.percentile(percent) for percent in PERCENTILES})
+        return result
+
+    def format_bars(self, width: int = 40) -> str:
+        """
+        :param width: length of the longest bar
+        :return: text histogram with power-of-two ms ranges
+        """
+        ranges = {}
+        for index, count in enumerate(self.counts):
+            if count:
+                upper = 2 ** max(math.ceil(math.log2(max(self._bucket_value(index), 1e-9))), 0)
+                ranges[upper] = ranges.get(upper, 0) + count
+        if not ranges:
+            return ''
+        longest = max(ranges.values())
+        return '\n'.join(f'{"<=" + format(upper, "g") + " ms":>12} | {"#" * max(round(count / longest * width), 1)} '
+                         f'{count}' for upper, count in sorted(ranges.items()))
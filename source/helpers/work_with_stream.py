@@ -0,0 +1,133 @@
+import codecs
+import json
+import re
+from source.helpers.work_with_schema import get_validator, describe_error
+from source.helpers.work_with_duplicates import DuplicateIndex
+
+RESULT_ARRAY_START = re.compile(r'\s*\{\s*"result"\s*:\s*\[')
+SEPARATORS = ' \t\r\n,'
+
+
+def iter_result_items(chunks, holder: dict = None):
+    """
+    Parses items of '{"result": [...]}' one by one while the chunks arrive
+    :param chunks: iterable of bytes
+    :param holder: if the body is not the list of results, the whole decoded body is put into holder["body"]
+    :return: generator of items
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer, position, in_array = '', 0, False
+    chunks = iter(chunks)
+    finished = False
+    while not finished:
+        chunk = next(chunks, None)
+        finished = chunk is None
+        buffer += text_decoder.decode(chunk or b'', final=finished)
+        if not in_array:
+            match = RESULT_ARRAY_START.match(buffer)
+            if match is None:
+                if finished or len(buffer.lstrip()) > 64:
+                    break
+                continue
+            in_array, position = True, match.end()
+        while True:
+            while position < len(buffer) and buffer[position] in SEPARATORS:
+                position += 1
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            start = position
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if finished:
+                    raise
+                break
+            if position == len(buffer) and not finished and not isinstance(item, (dict, list, str)):
+                # A number at the end of the buffer may continue in the next chunk
+                position = start
+                break
+            yield item
+        # Only the unparsed tail is kept, so memory does not depend on the size of the collection
+        buffer, position = buffer[position:], 0
+    if in_array:
+        raise json.JSONDecodeError('Unterminated "result" array', buffer, position)
+    rest = buffer + ''.join(text_decoder.decode(chunk) for chunk in chunks) + text_decoder.decode(b'', final=True)
+    if holder is not None:
+        holder["body"] = json.loads(rest)
+
+
+class CollectionAudit(object):
+    """
+    Count, duplicates and schema violations of characters gathered in one pass
+    """
+    def __init__(self, schema: dict = None):
+        self.validator = get_validator(schema) if schema is not None else None
+        self.count = 0
+        self.index = DuplicateIndex(contents=False)
+        self.violations = {}
+
+    def add(self, character: dict):
+        self.count += 1
+        name = character.get("name") if isinstance(character, dict) else None
+        if isinstance(character, dict):
+            self.index.add(character)
+        if self.validator is not None:
+            errors = [describe_error(error) for error in self.validator.iter_errors(character)]
+            if errors:
+                key = name if isinstance(name, str) and name and name not in self.violations else f'#{self.count - 1}'
+                self.violations[key] = errors
+
+    @property
+    def duplicates(self) -> dict:
+        """
+        :return: dict (key: character's name, value: count of repeats)
+        """
+        return self.index.name_duplicates()
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.duplicates and not self.violations
+
+
+class CharacterStream(object):
+    """
+    Streamed answer of GET all characters. The body is read from the socket while it's iterated
+    """
+    def __init__(self, response, chunk_size: int = 16384, timing=None):
+        """
+        :param timing: 'RequestTiming' of the request till the headers of the answer
+        """
+        self.response = response
+        self.timing = timing
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.chunk_size = chunk_size
+        self.body = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.response.close()
+
+    def iter_characters(self):
+        """
+        :return: generator of characters. Not a list body (e.g. an error) is put into 'body'
+        """
+        holder = {}
+        yield from iter_result_items(self.response.iter_content(chunk_size=self.chunk_size), holder)
+        self.body = holder.get("body")
+
+    def audit(self, schema: dict = None) -> CollectionAudit:
+        """
+        Counts, looks for duplicates and validates characters in one pass over the stream
+        :param schema: schema sample for validation or None to skip it
+        """
+        audit = CollectionAudit(schema)
+        for character in self.iter_characters():
+            audit.add(character)
+        return audit
@@ -0,0 +1,68 @@
+import threading
+from urllib.parse import urlsplit, parse_qsl
+
+_LISTENERS = []
+_LISTENERS_LOCK = threading.Lock()
+
+
+class RequestTiming(object):
+    """
+    Timing of one request. 'started' and 'finished' are 'time.perf_counter()' values,
+    'phases' is 'PhaseTiming' of the transport or None if the request did not go through it
+    """
+    def __init__(self, method: str, endpoint: str, status: int | str, started: float, finished: float,
+                 phases=None):
+        self.method = method
+        self.endpoint = endpoint
+        self.status = status
+        self.started = started
+        self.finished = finished
+        self.phases = phases
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (self.finished - self.started) * 1000
+
+    @property
+    def key(self) -> str:
+        """
+        :return: method and endpoint template, e.g. 'GET /character?name='
+        """
+        return f'{self.method} {self.endpoint}'
+
+    def __repr__(self):
+        return f'<RequestTiming {self.key} {self.status} {self.elapsed_ms:.2f} ms>'
+
+
+def endpoint_template(url: str, base_url: str = '') -> str:
+    """
+    Removes the host, the base path and values of the query from the URL
+    :param url: called URL, e.g. 'http://host/v2/character?name=Spider-Man'
+    :param base_url: base URL of the service, e.g. 'http://host/v2'
+    :return: template like '/character?name='
+    """
+    split = urlsplit(url)
+    base_path = urlsplit(base_url).path.rstrip('/')
+    path = split.path[len(base_path):] if base_path and split.path.startswith(base_path) else split.path
+    if split.query:
+        path += '?' + '&'.join(f'{key}=' for key, _ in parse_qsl(split.query, keep_blank_values=True))
+    return path or '/'
+
+
+def subscribe(listener):
+    """
+    :param listener: callable which gets every 'RequestTiming'
+    """
+    with _LISTENERS_LOCK:
+        _LISTENERS.append(listener)
+
+
+def unsubscribe(listener):
+    with _LISTENERS_LOCK:
+        if listener in _LISTENERS:
+            _LISTENERS.remove(listener)
+
+
+def publish(timing: RequestTiming):
+    for listener in tuple(_LISTENERS):
+        listener(timing)
@@ -0,0 +1,125 @@
+import argparse
+import json
+import sys
+from source.helpers.work_with_api import API
+from source.helpers.work_with_bulk import BulkCharacters
+from source.helpers.work_with_limiter import AdaptiveLimiter
+from source.helpers.work_with_cache import ResponseCache
+from source.helpers.work_with_results import ResultStore
+from source.load.generator import LoadGenerator, DEFAULT_MIX, parse_mix, start_metrics
+from source.load.workers import ProcessPoolLoad
+from source.load.target import LoadTarget
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m source.load',
+                                     description='Load generator for the characters service')
+    parser.add_argument('--login_auth', default=None)
+    parser.add_argument('--password_auth', default=None)
+    parser.add_argument('--base_url', default=None, help='Base URL of the service, e.g. http://127.0.0.1:8000/v2')
+    parser.add_argument('--emulator', action='store_true', help='Load the in-process emulator of the service')
+    parser.add_argument('--mode', choices=('closed', 'open'), default='closed',
+                        help='closed: fixed concurrency; open: fixed request rate')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Workers count (max in-flight requests) of every process')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Count of load processes, 0 is one per core; the open mode rate is shared between them')
+    parser.add_argument('--report_interval', type=float, default=1.0,
+                        help='Seconds between the live lines of the load processes, 0 disables them')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Find the sustainable concurrency with the AIMD limiter, --concurrency is its maximum')
+    parser.add_argument('--response_cache', type=int, default=None,
+                        help='Answer repeated GET of a character and of the listing from a client cache of this size')
+    parser.add_argument('--response_cache_ttl', type=float, default=5.0, help='Lifetime of a cached answer, s')
+    parser.add_argument('--metrics_port', type=int, default=None,
+                        help='Serve the live metrics on http://127.0.0.1:<port>/metrics, 0 takes a free port')
+    parser.add_argument('--metrics_jsonl', default=None, help='Append the snapshots of the live metrics to the file')
+    parser.add_argument('--metrics_interval', type=float, default=5.0, help='Seconds between the snapshots')
+    parser.add_argument('--rate', type=float, default=50.0, help='Requests per second in the open mode')
+    parser.add_argument('--duration', type=float, default=10.0, help='Duration of the run in seconds')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='Weights of operations, e.g. get=4,get_all=1,post=2,put=1,delete=2')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--no_session_pool', action='store_true', help='Open a new connection for every request')
+    parser.add_argument('--keep_characters', action='store_true', help='Do not delete the created characters')
+    parser.add_argument('--json', default=None, help='Write the report as JSON into the file')
+    parser.add_argument('--results_store', default=None,
+                        help='SQLite file the results are saved into, see "python -m source.load.results"')
+    parser.add_argument('--scenario', default=None, help='Scenario name of the saved results; the mode by default')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.adaptive and args.processes != 1:
+        parser.error('--adaptive works in one process only')
+    if args.response_cache and args.processes != 1:
+        parser.error('--response_cache works in one process only')
+    if (args.metrics_port is not None or args.metrics_jsonl) and args.processes != 1:
+        parser.error('--metrics_port and --metrics_jsonl work in one process only')
+    target = LoadTarget.from_args(args)
+    if target is None:
+        return 2
+    if args.processes != 1:
+        return run_processes(args, target)
+    target.open(pool_maxsize=None if args.no_session_pool else args.concurrency)
+    login, password = target.login, target.password
+    if args.adaptive:
+        API.limiter = AdaptiveLimiter(initial=1, max_limit=args.concurrency)
+    if args.response_cache:
+        API.cache = ResponseCache(max_size=args.response_cache, ttl_s=args.response_cache_ttl)
+    exporter = start_metrics(args)
+    generator = LoadGenerator(login, password, mix=args.mix, concurrency=args.concurrency, seed=args.seed,
+                              limiter=API.limiter)
+    try:
+        if args.mode == 'closed':
+            report = generator.run_closed(args.duration)
+        else:
+            report = generator.run_open(args.duration, args.rate)
+        if not args.keep_characters:
+            BulkCharacters(login, password, workers=args.concurrency).delete_characters(generator.live.names())
+        if API.cache is not None:
+            stats = API.cache.stats()
+            print(f'Response cache: hits {stats["hits"]}, misses {stats["misses"]} '
+                  f'({stats["hit_ratio"]:.1%}), invalidations {stats["invalidations"]}')
+    finally:
+        API.limiter = None
+        API.cache = None
+        if exporter is not None:
+            exporter.stop()
+        target.close()
+    return write_report(args, report)
+
+
+def run_processes(args, target: LoadTarget) -> int:
+    pool = ProcessPoolLoad(target.login, target.password, processes=args.processes or None, mix=args.mix,
+                           concurrency=args.concurrency, seed=args.seed, session_pool=not args.no_session_pool,
+                           keep_characters=args.keep_characters, report_interval=args.report_interval)
+    try:
+        if args.mode == 'closed':
+            report = pool.run_closed(args.duration)
+        else:
+            report = pool.run_open(args.duration, args.rate)
+    finally:
+        target.close()
+    return write_report(args, report)
+
+
+def write_report(args, report) -> int:
+    print(report.format_table())
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report.as_dict(), file, indent=2)
+    if args.results_store:
+        store = ResultStore(args.results_store)
+        run_id = store.save_run(args.scenario or f'load-{args.mode}', 'emulator' if args.emulator else API.base_url,
+                                {operation: stats.histogram for operation, stats in report.endpoints.items()},
+                                duration_s=report.duration_s)
+        store.close()
+        print(f'Saved as run {run_id} into {args.results_store}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
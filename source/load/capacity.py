@@ -0,0 +1,239 @@
+import argparse
+import csv
+import json
+import math
+import random
+import sys
+from copy import deepcopy
+from source.helpers.work_with_api import API
+from source.helpers.work_with_bulk import BulkCharacters
+from source.helpers.work_with_fields import WorkCharacters
+from source.helpers.work_with_stats import LatencyHistogram
+from source.helpers.work_with_results import ResultStore
+from source.load.target import LoadTarget
+from source.data.data_emulator import EMULATOR_COLLECTION_LIMIT, EMULATOR_FIELD_MAX_LENGTH
+from source.data.data_expected_bodies import DATA_STANDARD_CHARACTER
+
+MEASURED_OPERATIONS = ("get_all", "get", "delete")
+
+
+def field_width(number: int, max_width: int = EMULATOR_FIELD_MAX_LENGTH) -> int:
+    """
+    :return: width of the fields of the character with the number; widths go over 1..max_width evenly
+    """
+    return 1 + (number * 97) % max_width
+
+
+def capacity_payload(number: int, max_width: int = EMULATOR_FIELD_MAX_LENGTH) -> dict:
+    """
+    Boundary payload of 'WorkCharacters.make_field_symbols' with the unique name of the same width
+    :param number: number of the character in the benchmark
+    :return: character fields
+    """
+    width = field_width(number, max_width)
+    payload = WorkCharacters().make_field_symbols(deepcopy(DATA_STANDARD_CHARACTER[0]["result"]), width)
+    label = f'capacity-{number}-'
+    payload["name"] = (label + payload["name"])[:max(width, len(label))]
+    return payload
+
+
+def scaling_exponent(sizes: list, values: list) -> float | None:
+    """
+    Slope of log(value) by log(size): 1 is linear growth, more than 1 is worse than linear
+    :return: exponent or None if there are less than 2 usable points
+    """
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, values) if size > 0 and value > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+class CapacityStep(object):
+    """
+    Measurements of one size of the collection; the TTFB of the listing is the time from the sent request
+    to its headers, so it is the time of the service plus one round trip
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.operations = {operation: LatencyHistogram() for operation in MEASURED_OPERATIONS}
+        self.ttfb = LatencyHistogram()
+        self.listing_bytes = 0
+        self.errors = 0
+
+    def record(self, operation: str, response):
+        self.operations[operation].record(response.timing.elapsed_ms)
+        if response.status_code != 200:
+            self.errors += 1
+        if operation == "get_all":
+            self.listing_bytes = len(response.response.content)
+            if response.phases is not None:
+                self.ttfb.record(response.phases.ttfb)
+
+    def as_row(self) -> dict:
+        row = {"size": self.size, "listing_bytes": self.listing_bytes, "errors": self.errors}
+        for operation, histogram in self.operations.items():
+            summary = histogram.summary()
+            row.update({f'{operation}_p50_ms': round(summary["p50_ms"], 3),
+                        f'{operation}_p99_ms': round(summary["p99_ms"], 3),
+                        f'{operation}_max_ms': round(summary["max_ms"], 3)})
+        row["get_all_ttfb_p50_ms"] = round(self.ttfb.summary()["p50_ms"], 3)
+        return row
+
+
+class CapacityBenchmark(object):
+    """
+    Fills the collection in steps up to the limit with concurrent POSTs and measures GET of all characters,
+    GET by name and DELETE at every step. The collection is reset at the start and at the end
+    """
+    def __init__(self, login: str, password: str, limit: int = EMULATOR_COLLECTION_LIMIT, step: int = 50,
+                 samples: int = 20, concurrency: int = 8, seed: int = None):
+        self.login = login
+        self.password = password
+        self.limit = limit
+        self.step = step
+        self.samples = samples
+        self.bulk = BulkCharacters(login, password, workers=concurrency)
+        self.created = []
+        self._random = random.Random(seed)
+        self._numbers = iter(range(sys.maxsize))
+
+    def _count(self) -> int:
+        """
+        :return: size of the collection
+        :raise RuntimeError: if the listing fails, e.g. with wrong credentials
+        """
+        response = API().get_all_characters(self.login, self.password)
+        if response.status_code != 200:
+            raise RuntimeError(f'Listing of the characters failed with {response.status_code}: {response.text}')
+        return response.count_all_characters()
+
+    def fill_to(self, size: int) -> int:
+        """
+        POSTs new characters concurrently until the collection has the size
+        :return: size of the collection
+        """
+        current = self._count()
+        payloads = [capacity_payload(next(self._numbers)) for _ in range(max(size - current, 0))]
+        responses = self.bulk.create_characters(payloads)
+        self.created.extend(payload for payload in payloads if responses[payload["name"]].status_code == 200)
+        return self._count()
+
+    def measure(self, size: int) -> CapacityStep:
+        result = CapacityStep(size)
+        for _ in range(self.samples):
+            result.record("get_all", API().get_all_characters(self.login, self.password))
+        if not self.created:
+            return result
+        for _ in range(self.samples):
+            payload = self._random.choice(self.created)
+            result.record("get", API().get_character_by_name(payload["name"], self.login, self.password))
+        for payload in self._random.sample(self.created, min(self.samples, len(self.created))):
+            result.record("delete", API().delete_character(payload["name"], self.login, self.password))
+            if API().post_character_by_body(json=payload, login=self.login, password=self.password).status_code != 200:
+                result.errors += 1
+                self.created.remove(payload)
+        return result
+
+    def run(self, keep_characters: bool = False) -> list:
+        """
+        :return: 'CapacityStep' of every size
+        """
+        API().delete_all_characters(self.login, self.password)
+        steps = []
+        try:
+            for target in list(range(self.step, self.limit, self.step)) + [self.limit]:
+                size = self.fill_to(target)
+                steps.append(self.measure(size))
+                if size < target:
+                    break
+        finally:
+            if not keep_characters:
+                API().delete_all_characters(self.login, self.password)
+        return steps
+
+
+def format_table(steps: list) -> str:
+    lines = [f'{"size":>6}{"bytes":>10}{"get_all p50":>13}{"p99":>9}{"ttfb p50":>10}{"get p50":>10}'
+             f'{"delete p50":>12}{"errors":>8}']
+    for step in steps:
+        row = step.as_row()
+        lines.append(f'{row["size"]:>6}{row["listing_bytes"]:>10}{row["get_all_p50_ms"]:>13.2f}'
+                     f'{row["get_all_p99_ms"]:>9.2f}{row["get_all_ttfb_p50_ms"]:>10.2f}{row["get_p50_ms"]:>10.2f}'
+                     f'{row["delete_p50_ms"]:>12.2f}{row["errors"]:>8}')
+    sizes = [step.size for step in steps]
+    for operation in MEASURED_OPERATIONS:
+        exponent = scaling_exponent(sizes, [step.operations[operation].percentile(50) for step in steps])
+        if exponent is not None:
+            lines.append(f'Scaling exponent of {operation} p50 by collection size: {exponent:.2f} '
+                         f'(1 is linear)')
+    lines.append('Latencies are in ms')
+    return '\n'.join(lines)
+
+
+def write_csv(steps: list, path: str):
+    rows = [step.as_row() for step in steps]
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]) if rows else ["size"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m source.load.capacity',
+                                     description='Capacity benchmark: latencies by the size of the collection. '
+                                                 'It resets the database of the service!')
+    parser.add_argument('--login_auth', default=None)
+    parser.add_argument('--password_auth', default=None)
+    parser.add_argument('--base_url', default=None, help='Base URL of the service, e.g. http://127.0.0.1:8000/v2')
+    parser.add_argument('--emulator', action='store_true', help='Measure the in-process emulator of the service')
+    parser.add_argument('--limit', type=int, default=EMULATOR_COLLECTION_LIMIT, help='Max size of the collection')
+    parser.add_argument('--step', type=int, default=50, help='Count of characters added at every step')
+    parser.add_argument('--samples', type=int, default=20, help='Requests of every operation at every step')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent POSTs while filling')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--keep_characters', action='store_true', help='Do not reset the database at the end')
+    parser.add_argument('--csv', default=None, help='Write the scaling curve as CSV into the file')
+    parser.add_argument('--json', default=None, help='Write the scaling curve as JSON into the file')
+    parser.add_argument('--results_store', default=None,
+                        help='SQLite file the results are saved into, see "python -m source.load.results"')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = make_parser().parse_args(argv)
+    target = LoadTarget.from_args(args)
+    if target is None:
+        return 2
+    target.open(pool_maxsize=args.concurrency)
+    benchmark = CapacityBenchmark(target.login, target.password, limit=args.limit, step=args.step,
+                                  samples=args.samples, concurrency=args.concurrency, seed=args.seed)
+    try:
+        steps = benchmark.run(keep_characters=args.keep_characters)
+    except RuntimeError as err:
+        print(err, file=sys.stderr)
+        return 1
+    finally:
+        target.close()
+    print(format_table(steps))
+    if args.csv:
+        write_csv(steps, args.csv)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump([step.as_row() for step in steps], file, indent=2)
+    if args.results_store:
+        store = ResultStore(args.results_store)
+        run_id = store.save_run('capacity', 'emulator' if args.emulator else API.base_url,
+                                {f'{operation} size={step.size}': histogram for step in steps
+                                 for operation, histogram in step.operations.items()})
+        store.close()
+        print(f'Saved as run {run_id} into {args.results_store}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
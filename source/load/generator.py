@@ -0,0 +1,290 @@
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from source.helpers.work_with_api import API
+from source.helpers.work_with_stats import LatencyHistogram
+from source.helpers.work_with_payloads import PreparedPayload
+from source.helpers.work_with_metrics import MetricsExporter
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY, DATA_FOR_MANY_CHARS_MANIPULATIONS, \
+    DATA_STANDARD_CHARACTER
+
+DEFAULT_MIX = {"get": 4, "get_all": 1, "post": 2, "put": 1, "delete": 2}
+
+LOAD_PAYLOADS = DATA_FOR_POST_CHARACTER_BY_BODY + \
+    [character["result"] for character in DATA_FOR_MANY_CHARS_MANIPULATIONS + DATA_STANDARD_CHARACTER]
+
+LOAD_TEMPLATES = [PreparedPayload(payload) for payload in LOAD_PAYLOADS]
+
+
+def parse_mix(raw_mix: str) -> dict:
+    """
+    :param raw_mix: weights like 'get=4,get_all=1,post=2'
+    :return: dict (key: operation, value: weight)
+    """
+    mix = {}
+    for part in raw_mix.split(','):
+        operation, _, weight = part.partition('=')
+        if operation.strip() not in OPERATIONS:
+            raise ValueError(f'Unknown operation "{operation.strip()}", expected one of {sorted(OPERATIONS)}')
+        mix[operation.strip()] = float(weight or 1)
+    return mix
+
+
+class LiveCharacters(object):
+    """
+    Thread-safe set of the characters names created by the load run
+    """
+    def __init__(self, prefix: str = 'load'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._names = []
+        self._counter = itertools.count()
+
+    def new_payload(self) -> dict:
+        number = next(self._counter)
+        payload = deepcopy(LOAD_PAYLOADS[number % len(LOAD_PAYLOADS)])
+        payload["name"] = f'{payload["name"]} {self.prefix}-{number}'
+        return payload
+
+    def new_prepared(self) -> PreparedPayload:
+        """
+        :return: the same payload as 'new_payload' spliced from the bytes serialized once
+        """
+        number = next(self._counter)
+        template = LOAD_TEMPLATES[number % len(LOAD_TEMPLATES)]
+        return template.renamed(f'{template.name} {self.prefix}-{number}')
+
+    def add(self, name: str):
+        with self._lock:
+            self._names.append(name)
+
+    def pick(self) -> str | None:
+        with self._lock:
+            return random.choice(self._names) if self._names else None
+
+    def pop(self) -> str | None:
+        with self._lock:
+            if not self._names:
+                return None
+            index = random.randrange(len(self._names))
+            self._names[index], self._names[-1] = self._names[-1], self._names[index]
+            return self._names.pop()
+
+    def names(self) -> list:
+        with self._lock:
+            return list(self._names)
+
+
+def operation_get(api: API, live: LiveCharacters, login: str, password: str):
+    name = live.pick() or LOAD_PAYLOADS[0]["name"]
+    return api.get_character_by_name(raw_character_name=name, login=login, password=password)
+
+
+def operation_get_all(api: API, live: LiveCharacters, login: str, password: str):
+    return api.get_all_characters(login=login, password=password)
+
+
+def operation_post(api: API, live: LiveCharacters, login: str, password: str):
+    payload = live.new_prepared()
+    response = api.post_character_by_body(json=payload, login=login, password=password)
+    if response.status_code == 200:
+        live.add(payload.name)
+    return response
+
+
+def operation_put(api: API, live: LiveCharacters, login: str, password: str):
+    name = live.pick()
+    payload = deepcopy(LOAD_PAYLOADS[hash(name) % len(LOAD_PAYLOADS)]) if name else live.new_payload()
+    payload["name"] = name or payload["name"]
+    payload["identity"] = f'Changed at {time.time():.6f}'
+    return api.put_character_by_name(json=payload, login=login, password=password)
+
+
+def operation_delete(api: API, live: LiveCharacters, login: str, password: str):
+    name = live.pop() or live.new_payload()["name"]
+    return api.delete_character(raw_character_name=name, login=login, password=password)
+
+
+OPERATIONS = {"get": operation_get, "get_all": operation_get_all, "post": operation_post, "put": operation_put,
+              "delete": operation_delete}
+
+
+class EndpointStats(object):
+    """
+    Latency histogram and status codes of one operation
+    """
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.statuses = Counter()
+
+    def record(self, latency_ms: float, status: int | str):
+        self.histogram.record(latency_ms)
+        self.statuses[status] += 1
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if not isinstance(status, int) or status >= 400)
+
+    def to_dict(self) -> dict:
+        return {"histogram": self.histogram.to_dict(),
+                "statuses": [[status, count] for status, count in self.statuses.items()]}
+
+    def merge_dict(self, data: dict) -> 'EndpointStats':
+        self.histogram.merge(LatencyHistogram.from_dict(data["histogram"]))
+        for status, count in data["statuses"]:
+            self.statuses[status] += count
+        return self
+
+
+class LoadReport(object):
+    """
+    Result of the load run
+    """
+    def __init__(self, mode: str, duration_s: float, endpoints: dict, limiter=None):
+        self.mode = mode
+        self.duration_s = duration_s
+        self.endpoints = endpoints
+        self.limiter = limiter
+
+    @property
+    def total(self) -> int:
+        return sum(stats.histogram.total for stats in self.endpoints.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.duration_s if self.duration_s else 0.0
+
+    def as_dict(self) -> dict:
+        endpoints = {}
+        for operation, stats in self.endpoints.items():
+            endpoints[operation] = dict(stats.histogram.summary(),
+                                        throughput=stats.histogram.total / self.duration_s if self.duration_s else 0,
+                                        error_rate=stats.errors / stats.histogram.total if stats.histogram.total else 0,
+                                        statuses={str(status): count for status, count in stats.statuses.items()})
+        report = {"mode": self.mode, "duration_s": self.duration_s, "requests": self.total,
+                  "throughput": self.throughput, "endpoints": endpoints}
+        if self.limiter is not None:
+            report["limiter"] = self.limiter.summary()
+        return report
+
+    def format_table(self) -> str:
+        width = max([10] + [len(operation) + 2 for operation in self.endpoints])
+        lines = [f'Mode: {self.mode}; duration: {self.duration_s:.2f} s; requests: {self.total}; '
+                 f'throughput: {self.throughput:.1f} req/s',
+                 f'{"endpoint":<{width}}{"count":>8}{"req/s":>9}{"err %":>8}{"p50":>9}{"p90":>9}{"p99":>9}'
+                 f'{"p99.9":>9}{"max":>9}  statuses']
+        for operation, summary in self.as_dict()["endpoints"].items():
+            statuses = ', '.join(f'{status}: {count}' for status, count in sorted(summary["statuses"].items()))
+            lines.append(f'{operation:<{width}}{summary["count"]:>8}{summary["throughput"]:>9.1f}'
+                         f'{summary["error_rate"] * 100:>8.2f}{summary["p50_ms"]:>9.2f}{summary["p90_ms"]:>9.2f}'
+                         f'{summary["p99_ms"]:>9.2f}{summary["p99.9_ms"]:>9.2f}{summary["max_ms"]:>9.2f}  {statuses}')
+        lines.append('Latencies are in ms')
+        if self.limiter is not None:
+            summary = self.limiter.summary()
+            drops = sum(1 for change in summary["changes"] if change[2] not in ('initial', 'increase'))
+            lines.append(f'Adaptive limit: {summary["limit"]} (seen {summary["min_limit_seen"]}..'
+                         f'{summary["max_limit_seen"]}); limit drops: {drops}')
+        return '\n'.join(lines)
+
+
+class LoadGenerator(object):
+    """
+    Drives the API with a weighted mix of operations in a closed loop (fixed concurrency)
+    or in an open loop (fixed request rate)
+    """
+    def __init__(self, login: str, password: str, mix: dict = None, concurrency: int = 8, seed: int = None,
+                 limiter=None, prefix: str = 'load'):
+        """
+        :param limiter: 'AdaptiveLimiter' set to 'API.limiter'; 'concurrency' is the upper bound then
+        :param prefix: prefix of the names of created characters
+        """
+        self.login = login
+        self.password = password
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.limiter = limiter
+        self.live = LiveCharacters(prefix)
+        self._operations = list(self.mix)
+        self._weights = [self.mix[operation] for operation in self._operations]
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.endpoints = {operation: EndpointStats() for operation in self._operations}
+
+    def snapshot(self) -> dict:
+        """
+        :return: dict (key: operation, value: 'EndpointStats.to_dict') of the requests made so far
+        """
+        with self._stats_lock:
+            return {operation: stats.to_dict() for operation, stats in self.endpoints.items()}
+
+    def _choose(self) -> str:
+        with self._random_lock:
+            return self._random.choices(self._operations, weights=self._weights)[0]
+
+    def _execute(self, operation: str, started: float):
+        """
+        :param started: time the request had to start; in the open loop it is the scheduled time,
+            so the waiting in the queue is counted too (coordinated omission correction)
+        """
+        try:
+            status = OPERATIONS[operation](API(), self.live, self.login, self.password).status_code
+        except Exception as err:
+            status = type(err).__name__
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self.endpoints[operation].record(latency_ms, status)
+
+    def run_closed(self, duration_s: float) -> LoadReport:
+        """
+        Every worker sends the next request right after the previous one is answered
+        """
+        deadline = time.perf_counter() + duration_s
+
+        def worker():
+            while time.perf_counter() < deadline:
+                self._execute(self._choose(), time.perf_counter())
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return LoadReport('closed', time.perf_counter() - started, self.endpoints, self.limiter)
+
+    def run_open(self, duration_s: float, rate: float) -> LoadReport:
+        """
+        Requests are scheduled with the fixed rate regardless of the answers.
+        Latency is counted from the scheduled time
+        """
+        interval = 1.0 / rate
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for number in itertools.count():
+                scheduled = started + number * interval
+                if scheduled - started >= duration_s:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._execute, self._choose(), scheduled)
+        return LoadReport('open', time.perf_counter() - started, self.endpoints, self.limiter)
+
+
+def start_metrics(args) -> MetricsExporter | None:
+    """
+    :param args: parsed arguments with metrics_port, metrics_jsonl and metrics_interval
+    :return: started exporter or None if the metrics are not asked for
+    """
+    if args.metrics_port is None and not args.metrics_jsonl:
+        return None
+    exporter = MetricsExporter(port=args.metrics_port, jsonl=args.metrics_jsonl,
+                               interval_s=args.metrics_interval).start()
+    if exporter.server is not None:
+        print(f'Metrics on {exporter.server.url}', flush=True)
+    return exporter
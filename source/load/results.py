@@ -0,0 +1,61 @@
+import argparse
+import sys
+from datetime import datetime
+from source.helpers.work_with_results import ResultStore, compare_runs, format_comparison
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m source.load.results',
+                                     description='Stored latency results and regressions between runs')
+    parser.add_argument('--store', default='results.db', help='SQLite file of the results')
+    commands = parser.add_subparsers(dest='command', required=True)
+    listing = commands.add_parser('list', help='Show the stored runs')
+    listing.add_argument('--scenario', default=None)
+    compare = commands.add_parser('compare', help='Compare the candidate run with the baseline run')
+    compare.add_argument('--baseline', default=None,
+                         help='Id of the baseline run; the previous run of the same scenario and base URL by default')
+    compare.add_argument('--candidate', default=None, help='Id of the candidate run; the latest run by default')
+    compare.add_argument('--threshold', type=float, default=0.05, help='Ignored relative change, 0.05 is 5%%')
+    compare.add_argument('--confidence', type=float, default=0.95, help='Confidence of the bootstrap interval')
+    compare.add_argument('--resamples', type=int, default=200, help='Count of bootstrap resamples')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = make_parser().parse_args(argv)
+    store = ResultStore(args.store)
+    try:
+        if args.command == 'list':
+            for run in store.runs(scenario=args.scenario):
+                created = datetime.fromtimestamp(run["created"]).strftime('%Y-%m-%d %H:%M:%S')
+                print(f'{run["run_id"]}  {created}  {run["commit"]:<10}{run["scenario"]:<14}'
+                      f'{run["endpoints"]:>4} endpoints  {run["base_url"]}')
+            return 0
+        runs = store.runs()
+        if not runs:
+            print(f'No runs in {args.store}', file=sys.stderr)
+            return 2
+        candidate_id = args.candidate or runs[-1]["run_id"]
+        candidate = next((run for run in runs if run["run_id"] == candidate_id), None)
+        if candidate is None:
+            print(f'No run "{candidate_id}" in {args.store}', file=sys.stderr)
+            return 2
+        baseline_id = args.baseline
+        if baseline_id is None:
+            previous = [run for run in runs[:runs.index(candidate)] if run["scenario"] == candidate["scenario"]
+                        and run["base_url"] == candidate["base_url"]]
+            if not previous:
+                print(f'No baseline run for "{candidate_id}"', file=sys.stderr)
+                return 2
+            baseline_id = previous[-1]["run_id"]
+        rows = compare_runs(store.load_run(baseline_id), store.load_run(candidate_id), threshold=args.threshold,
+                            confidence=args.confidence, resamples=args.resamples)
+    finally:
+        store.close()
+    print(f'Baseline: {baseline_id}; candidate: {candidate_id}')
+    print(format_comparison(rows))
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+from source.helpers.work_with_api import API
+from source.helpers.work_with_bulk import BulkCharacters
+from source.helpers.work_with_results import ResultStore
+from source.data.data_scenarios import SCENARIOS
+from source.load.generator import EndpointStats, LoadReport, start_metrics
+from source.load.target import LoadTarget
+
+
+class StepStats(EndpointStats):
+    """
+    Latencies of one step or of the whole scenario. Expected statuses of a step are kept as they are, an answer
+    which does not meet the expectations is counted as 'failed <status>'; the scenario is 'passed' or 'failed'
+    """
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items()
+                   if isinstance(status, str) and status != 'passed')
+
+
+class ScenarioLoad(object):
+    """
+    Virtual users run the scenarios one after another in a closed loop. Every step gets its own latency
+    histogram ('endpoints'), the whole iterations of every scenario too ('iterations')
+    """
+    def __init__(self, login: str, password: str, scenarios: list = None, users: int = 8, prefix: str = 'vu'):
+        """
+        :param scenarios: 'Scenario' list; every user takes them in turn starting from its own one
+        :param prefix: prefix of the suffix of the characters names of every iteration
+        """
+        self.login = login
+        self.password = password
+        self.scenarios = scenarios or SCENARIOS
+        self.users = users
+        self.prefix = prefix
+        self.leftovers = []
+        self.endpoints = {self.key(scenario, number, step.title): StepStats()
+                          for scenario in self.scenarios for number, step in enumerate(scenario.steps, 1)}
+        self.iterations = {scenario.name: StepStats() for scenario in self.scenarios}
+        self.duration_s = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(scenario, number: int, title: str) -> str:
+        return f'{scenario.name} #{number} {title}'
+
+    def run_iteration(self, scenario, suffix: str):
+        started = time.perf_counter()
+        try:
+            result = scenario.run(self.login, self.password, suffix=suffix)
+        except Exception as err:
+            with self._lock:
+                self.iterations[scenario.name].record((time.perf_counter() - started) * 1000, type(err).__name__)
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            for number, step in enumerate(result.steps, 1):
+                status = step.status if step.passed else f'failed {step.status}'
+                self.endpoints[self.key(scenario, number, step.title)].record(step.elapsed_ms, status)
+            self.iterations[scenario.name].record(elapsed_ms, 'passed' if result.passed else 'failed')
+            self.leftovers.extend(result.leftovers)
+
+    def run_closed(self, duration_s: float) -> LoadReport:
+        """
+        :return: report of the steps; 'iterations_report' is the report of the whole scenarios
+        """
+        deadline = time.perf_counter() + duration_s
+
+        def user(number: int):
+            for iteration in itertools.count():
+                if time.perf_counter() >= deadline:
+                    break
+                scenario = self.scenarios[(number + iteration) % len(self.scenarios)]
+                self.run_iteration(scenario, f' {self.prefix}{number}-{iteration}')
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=user, args=(number,), daemon=True) for number in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.duration_s = time.perf_counter() - started
+        return LoadReport('scenario steps', self.duration_s, self.endpoints)
+
+    def iterations_report(self) -> LoadReport:
+        return LoadReport('scenario iterations', self.duration_s, self.iterations)
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m source.load.scenarios',
+                                     description='Scenarios of source.data.data_scenarios as virtual users')
+    parser.add_argument('--login_auth', default=None)
+    parser.add_argument('--password_auth', default=None)
+    parser.add_argument('--base_url', default=None, help='Base URL of the service, e.g. http://127.0.0.1:8000/v2')
+    parser.add_argument('--emulator', action='store_true', help='Load the in-process emulator of the service')
+    parser.add_argument('--scenarios', default=None,
+                        help=f'Comma separated names, all by default: {",".join(s.name for s in SCENARIOS)}')
+    parser.add_argument('--users', type=int, default=8, help='Count of virtual users')
+    parser.add_argument('--duration', type=float, default=10.0, help='Duration of the run in seconds')
+    parser.add_argument('--metrics_port', type=int, default=None,
+                        help='Serve the live metrics on http://127.0.0.1:<port>/metrics, 0 takes a free port')
+    parser.add_argument('--metrics_jsonl', default=None, help='Append the snapshots of the live metrics to the file')
+    parser.add_argument('--metrics_interval', type=float, default=5.0, help='Seconds between the snapshots')
+    parser.add_argument('--json', default=None, help='Write the report as JSON into the file')
+    parser.add_argument('--results_store', default=None,
+                        help='SQLite file the results are saved into, see "python -m source.load.results"')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    scenarios = SCENARIOS
+    if args.scenarios:
+        known = {scenario.name: scenario for scenario in SCENARIOS}
+        unknown = [name for name in args.scenarios.split(',') if name not in known]
+        if unknown:
+            parser.error(f'Unknown scenarios {unknown}, expected some of {sorted(known)}')
+        scenarios = [known[name] for name in args.scenarios.split(',')]
+    target = LoadTarget.from_args(args)
+    if target is None:
+        return 2
+    target.open(pool_maxsize=args.users)
+    load = ScenarioLoad(target.login, target.password, scenarios=scenarios, users=args.users)
+    exporter = start_metrics(args)
+    try:
+        report = load.run_closed(args.duration)
+        BulkCharacters(target.login, target.password, workers=args.users).delete_characters(load.leftovers)
+    finally:
+        if exporter is not None:
+            exporter.stop()
+        target.close()
+    print(load.iterations_report().format_table())
+    print(report.format_table())
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({"iterations": load.iterations_report().as_dict(), "steps": report.as_dict()}, file, indent=2)
+    if args.results_store:
+        store = ResultStore(args.results_store)
+        run_id = store.save_run('scenarios', 'emulator' if args.emulator else API.base_url,
+                                {key: stats.histogram for key, stats in report.endpoints.items()},
+                                duration_s=report.duration_s)
+        store.close()
+        print(f'Saved as run {run_id} into {args.results_store}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
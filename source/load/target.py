@@ -0,0 +1,59 @@
+import sys
+from source.helpers.work_with_api import API
+from source.helpers.work_with_asserting_respose import ParseResponse
+from source.helpers.work_with_session import SessionPool
+from source.emulator.server import CharacterService
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+
+
+class LoadTarget(object):
+    """
+    Service the load tools work with: the in-process emulator of '--emulator' or the service of '--base_url',
+    with the credentials of the command line
+    """
+    def __init__(self, login: str, password: str, service: CharacterService = None):
+        """
+        :param service: started emulator or None for a remote service
+        """
+        self.login = login
+        self.password = password
+        self.service = service
+
+    @classmethod
+    def from_args(cls, args) -> 'LoadTarget | None':
+        """
+        Starts the emulator or points 'API' at the base URL
+        :param args: parsed arguments with 'login_auth', 'password_auth', 'base_url' and 'emulator'
+        :return: target or None, the message is printed, if there are no credentials without the emulator
+        """
+        login, password = args.login_auth, args.password_auth
+        if args.emulator:
+            login, password = login or EMULATOR_LOGIN, password or EMULATOR_PASSWORD
+        elif args.base_url:
+            API.base_url = args.base_url.rstrip('/')
+        if login is None or password is None:
+            print('--login_auth and --password_auth are required without --emulator', file=sys.stderr)
+            return None
+        service = None
+        if args.emulator:
+            service = CharacterService(login=login, password=password).start()
+            API.base_url = service.base_url
+        return cls(login, password, service)
+
+    def open(self, pool_maxsize: int = None) -> 'LoadTarget':
+        """
+        Turns on the lean answers and opens the shared keep-alive session
+        :param pool_maxsize: connections of the session; None works without the shared session
+        """
+        if pool_maxsize is not None:
+            SessionPool.open(pool_connections=4, pool_maxsize=pool_maxsize, keep_alive=True)
+        ParseResponse.verbose = False
+        return self
+
+    def close(self):
+        """
+        Closes the shared session and stops the emulator
+        """
+        SessionPool.close()
+        if self.service is not None:
+            self.service.stop()
@@ -0,0 +1,138 @@
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from source.helpers.work_with_api import API
+from source.helpers.work_with_bulk import BulkCharacters
+from source.helpers.work_with_asserting_respose import ParseResponse
+from source.helpers.work_with_session import SessionPool
+from source.load.generator import LoadGenerator, LoadReport, EndpointStats
+
+
+def merge_snapshots(snapshots: list) -> dict:
+    """
+    :param snapshots: results of 'LoadGenerator.snapshot' of the workers
+    :return: dict (key: operation, value: 'EndpointStats') of all workers
+    """
+    endpoints = {}
+    for snapshot in snapshots:
+        for operation, data in snapshot.items():
+            endpoints.setdefault(operation, EndpointStats()).merge_dict(data)
+    return endpoints
+
+
+def run_worker(number: int, options: dict, results: multiprocessing.Queue):
+    """
+    Body of the worker process: its own session pool, generator and histograms. Snapshots of the histograms
+    are put into the queue every 'report_interval' seconds, the final one with the wall time of the run
+    """
+    try:
+        API.base_url = options["base_url"]
+        ParseResponse.verbose = False
+        if options["session_pool"]:
+            SessionPool.open(pool_connections=4, pool_maxsize=options["concurrency"], keep_alive=True)
+        seed = options["seed"] + number if options["seed"] is not None else None
+        generator = LoadGenerator(options["login"], options["password"], mix=options["mix"],
+                                  concurrency=options["concurrency"], seed=seed, prefix=f'load{number}')
+        finished = threading.Event()
+
+        def reporter():
+            while not finished.wait(options["report_interval"]):
+                results.put(('snapshot', number, generator.snapshot()))
+
+        started = time.time()
+        results.put(('started', number, started))
+        if options["report_interval"]:
+            threading.Thread(target=reporter, daemon=True).start()
+        if options["mode"] == 'closed':
+            generator.run_closed(options["duration"])
+        else:
+            generator.run_open(options["duration"], options["rate"])
+        finished.set()
+        results.put(('final', number, {"snapshot": generator.snapshot(), "started": started,
+                                       "finished": time.time()}))
+        if not options["keep_characters"]:
+            BulkCharacters(options["login"], options["password"],
+                           workers=options["concurrency"]).delete_characters(generator.live.names())
+        SessionPool.close()
+        results.put(('done', number, None))
+    except Exception:
+        results.put(('error', number, traceback.format_exc()))
+
+
+class ProcessPoolLoad(object):
+    """
+    Runs 'LoadGenerator' in several processes, one per core by default, so the client is not limited by the GIL.
+    Every worker keeps its own histograms; the parent merges their snapshots for the live line and the report
+    """
+    def __init__(self, login: str, password: str, processes: int = None, mix: dict = None, concurrency: int = 8,
+                 seed: int = None, session_pool: bool = True, keep_characters: bool = False,
+                 report_interval: float = 1.0):
+        """
+        :param processes: count of worker processes, count of cores if None
+        :param concurrency: workers count of every process
+        :param report_interval: seconds between the live lines, 0 disables them
+        """
+        self.processes = processes or multiprocessing.cpu_count()
+        self.options = {"login": login, "password": password, "mix": mix, "concurrency": concurrency, "seed": seed,
+                        "session_pool": session_pool, "keep_characters": keep_characters,
+                        "report_interval": report_interval, "base_url": API.base_url}
+        self.snapshots = {}
+
+    def live_line(self, elapsed_s: float) -> str:
+        endpoints = merge_snapshots(list(self.snapshots.values()))
+        total = EndpointStats()
+        for stats in endpoints.values():
+            total.histogram.merge(stats.histogram)
+            total.statuses.update(stats.statuses)
+        summary = total.histogram.summary()
+        return (f'[{elapsed_s:6.1f} s] requests: {summary["count"]}; errors: {total.errors}; '
+                f'throughput: {summary["count"] / elapsed_s if elapsed_s else 0:.1f} req/s; '
+                f'p50: {summary["p50_ms"]:.2f} ms; p99: {summary["p99_ms"]:.2f} ms')
+
+    def _run(self, mode: str, duration_s: float, rate: float = None) -> LoadReport:
+        options = dict(self.options, mode=mode, duration=duration_s,
+                       rate=rate / self.processes if rate else None)
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        workers = [context.Process(target=run_worker, args=(number, options, results), daemon=True)
+                   for number in range(self.processes)]
+        for worker in workers:
+            worker.start()
+        running, errors, started, finished = set(range(self.processes)), [], {}, {}
+        while running:
+            try:
+                kind, number, payload = results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    errors.append('Worker processes have exited without the result')
+                    break
+                continue
+            if kind == 'started':
+                started[number] = payload
+            elif kind == 'snapshot':
+                self.snapshots[number] = payload
+                print(self.live_line(time.time() - min(started.values())), flush=True)
+            elif kind == 'final':
+                self.snapshots[number] = payload["snapshot"]
+                finished[number] = payload["finished"]
+            else:
+                running.discard(number)
+                if kind == 'error':
+                    errors.append(payload)
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise RuntimeError('Load worker failed:\n' + '\n'.join(errors))
+        return LoadReport(f'{mode}, {self.processes} processes', max(finished.values()) - min(started.values()),
+                          merge_snapshots(list(self.snapshots.values())))
+
+    def run_closed(self, duration_s: float) -> LoadReport:
+        return self._run('closed', duration_s)
+
+    def run_open(self, duration_s: float, rate: float) -> LoadReport:
+        """
+        :param rate: total rate of all processes
+        """
+        return self._run('open', duration_s, rate)
@@ -0,0 +1,54 @@
+import pytest
+from source.helpers.work_with_api import API
+from source.helpers.work_with_cleanup import CleanupRegistry, MAX_PENDING, RESET_THRESHOLD
+from source.plugins.parallel import collection_lock
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--cleanup_scope", action="store", default="module", choices=("test", "module", "session"),
+        help="When characters created by tests are deleted: after every test or in one batch after a module "
+             "or the session"
+    )
+    parser.addoption(
+        "--cleanup_reset_threshold", action="store", type=int, default=RESET_THRESHOLD,
+        help=f"Reset the database at the end of a module or the session instead of deleting a batch of so many "
+             f"characters, at most {MAX_PENDING}; 0 turns it off. It's never used under xdist"
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    xdist_worker = getattr(config, 'workerinput', None) is not None
+    if config.getoption("--cleanup_reset_threshold") > MAX_PENDING:
+        raise pytest.UsageError(f'--cleanup_reset_threshold can not exceed {MAX_PENDING}: a bigger batch '
+                                f'is deleted by name before it is reached')
+    API.cleanup = CleanupRegistry(config.option.login_auth, config.option.password_auth,
+                                  deferred=config.getoption("--cleanup_scope") != 'test',
+                                  reset_threshold=0 if xdist_worker else config.getoption("--cleanup_reset_threshold"))
+
+
+def pytest_unconfigure(config):
+    API.cleanup = None
+
+
+def flushing_cleanup(config, tmp_path_factory):
+    """
+    Deletes the characters left by the tests; under xdist it holds the shared lock of the collection
+    """
+    if API.cleanup is not None and API.cleanup.pending:
+        with collection_lock(config, tmp_path_factory):
+            API.cleanup.flush(reset=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cleanup_session(request, tmp_path_factory):
+    yield
+    flushing_cleanup(request.config, tmp_path_factory)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def cleanup_module(request, tmp_path_factory):
+    yield
+    if request.config.getoption("--cleanup_scope") == 'module':
+        flushing_cleanup(request.config, tmp_path_factory)
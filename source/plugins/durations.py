@@ -0,0 +1,219 @@
+import heapq
+import json
+import os
+import time
+import pytest
+
+DURATIONS_FILE = '.test_durations.json'
+
+SMOOTHING = 0.5
+
+
+def history_id(nodeid: str) -> str:
+    """
+    :return: node id without the suffix '@<group>' xdist adds to the tests of a group
+    """
+    return nodeid.rsplit('@', 1)[0] if group_of(nodeid) else nodeid
+
+
+def group_of(nodeid: str) -> str | None:
+    """
+    :return: xdist group of the node id with the suffix '@<group>' or None
+    """
+    tail = nodeid.rsplit('::', 1)[-1].rsplit(']', 1)[-1]
+    return tail.rsplit('@', 1)[1] if '@' in tail else None
+
+
+def smoothed(old: float | None, new: float) -> float:
+    return new if old is None else SMOOTHING * new + (1 - SMOOTHING) * old
+
+
+def work_units(items: list) -> list:
+    """
+    :return: lists of the items which are sent to a worker together: the tests of one xdist group
+        in their collection order or a single test
+    """
+    units, groups = [], {}
+    for item in items:
+        marker = item.get_closest_marker('xdist_group')
+        group = (marker.args[0] if marker.args else marker.kwargs.get('name')) if marker is not None else None
+        if group is None:
+            units.append([item])
+        elif group in groups:
+            groups[group].append(item)
+        else:
+            groups[group] = [item]
+            units.append(groups[group])
+    return units
+
+
+def lpt_order(weights: list) -> list:
+    """
+    Longest processing time first: a worker which gets free takes the heaviest unit left
+    :param weights: durations of the work units
+    :return: indexes of the units from the heaviest one, equal ones keep their order
+    """
+    return sorted(range(len(weights)), key=lambda index: -weights[index])
+
+
+def lpt_shards(weights: list, workers: int) -> list:
+    """
+    :return: load of every worker when the units are taken in the 'lpt_order'
+    """
+    loads = [(0.0, worker) for worker in range(max(workers, 1))]
+    for index in lpt_order(weights):
+        load, worker = heapq.heappop(loads)
+        heapq.heappush(loads, (load + weights[index], worker))
+    return [load for load, _ in sorted(loads, key=lambda load: load[1])]
+
+
+class DurationHistory(object):
+    """
+    Smoothed wall-clock durations of the tests (setup, call and teardown) and of the fixtures setup
+    across runs, kept in a JSON file
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.tests = {}
+        self.fixtures = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as file:
+                    data = json.load(file)
+                self.tests, self.fixtures = data.get("tests", {}), data.get("fixtures", {})
+            except (ValueError, OSError, AttributeError):
+                self.tests, self.fixtures = {}, {}
+
+    def weight(self, nodeid: str) -> float:
+        """
+        :return: known duration of the test; the mean duration of the known tests for a new one
+        """
+        if nodeid in self.tests:
+            return self.tests[nodeid]
+        return sum(self.tests.values()) / len(self.tests) if self.tests else 0.0
+
+    def update(self, tests: dict, fixtures: dict):
+        """
+        :param tests: dict (key: test id, value: duration of this run in seconds)
+        :param fixtures: dict (key: fixture name, value: mean setup duration of this run in seconds)
+        """
+        for nodeid, duration in tests.items():
+            self.tests[nodeid] = smoothed(self.tests.get(nodeid), duration)
+        for name, duration in fixtures.items():
+            self.fixtures[name] = smoothed(self.fixtures.get(name), duration)
+
+    def save(self):
+        with open(self.path + '.tmp', 'w') as file:
+            json.dump({"tests": dict(sorted(self.tests.items())), "fixtures": dict(sorted(self.fixtures.items()))},
+                      file, indent=1)
+        os.replace(self.path + '.tmp', self.path)
+
+
+class DurationScheduler(object):
+    """
+    Plugin records the durations of the session into the history. Under xdist it orders the work units
+    by the history, so the slowest tests start first and the workers finish at about the same time;
+    the tests of the serial lane stay together in their order only with '--dist loadgroup'
+    """
+    def __init__(self, history: DurationHistory, order: bool = True, save: bool = False):
+        """
+        :param order: reorder the tests on the xdist workers
+        :param save: write the durations of the session into the history file
+        """
+        self.history = history
+        self.order = order
+        self.save = save
+        self.tests = {}
+        self.units = {}
+        self.fixtures = {}
+        self.workers = 0
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config, items):
+        if not self.order or getattr(config, 'workerinput', None) is None or not self.history.tests:
+            return
+        units = work_units(items)
+        weights = [sum(self.history.weight(history_id(item.nodeid)) for item in unit) for unit in units]
+        items[:] = [item for index in lpt_order(weights) for item in units[index]]
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef):
+        started = time.perf_counter()
+        yield
+        total, count = self.fixtures.get(fixturedef.argname, (0.0, 0))
+        self.fixtures[fixturedef.argname] = (total + time.perf_counter() - started, count + 1)
+
+    def pytest_runtest_logreport(self, report):
+        nodeid = history_id(report.nodeid)
+        self.tests[nodeid] = self.tests.get(nodeid, 0.0) + report.duration
+        unit = '@' + group_of(report.nodeid) if group_of(report.nodeid) else nodeid
+        self.units[unit] = self.units.get(unit, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        workeroutput = getattr(session.config, 'workeroutput', None)
+        if workeroutput is not None:
+            workeroutput['fixture_durations'] = self.fixtures
+            return
+        if self.save and self.tests:
+            self.history.update(self.tests, {name: total / count for name, (total, count) in self.fixtures.items()})
+            self.history.save()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodeready(self, node):
+        self.workers += 1
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        """
+        Merges the fixtures durations of the xdist worker; the tests durations come with the reports
+        """
+        for name, (total, count) in getattr(node, 'workeroutput', {}).get('fixture_durations', {}).items():
+            known_total, known_count = self.fixtures.get(name, (0.0, 0))
+            self.fixtures[name] = (known_total + total, known_count + count)
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if getattr(config, 'workerinput', None) is not None or not self.tests:
+            return
+        terminalreporter.section('Test durations, s')
+        for nodeid, duration in sorted(self.tests.items(), key=lambda test: -test[1])[:5]:
+            terminalreporter.write_line(f'{duration:9.3f}  {nodeid}')
+        if self.workers > 1:
+            loads = lpt_shards(list(self.units.values()), self.workers)
+            terminalreporter.write_line(f'Estimated load of {self.workers} workers in the longest first order: '
+                                        + ', '.join(f'{load:.2f}' for load in loads))
+        if self.save:
+            terminalreporter.write_line(f'Saved into {self.history.path}')
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--durations_file", action="store", default=None,
+        help=f"Save the durations of the tests and fixtures into the JSON file; the order is taken from "
+             f"{DURATIONS_FILE} of the rootdir when no file is given"
+    )
+    parser.addini(
+        "durations_file", default=None,
+        help="JSON file the durations are saved into, same as --durations_file"
+    )
+    parser.addoption(
+        "--no_duration_order", action="store_true", default=False,
+        help="Do not order the tests on the xdist workers by their durations"
+    )
+
+
+def pytest_configure(config):
+    path = config.getoption("--durations_file") or config.getini("durations_file")
+    order = not config.getoption("--no_duration_order")
+    if order and getattr(config.option, "numprocesses", None) and getattr(config.option, "dist", None) != 'loadgroup':
+        config.issue_config_time_warning(pytest.PytestConfigWarning(
+            'The serial lane and the duration order need "--dist loadgroup", '
+            'other modes ignore the xdist groups'), stacklevel=2)
+    config.pluginmanager.register(DurationScheduler(DurationHistory(path or str(config.rootpath / DURATIONS_FILE)),
+                                                    order=order, save=bool(path)),
+                                  'duration_scheduler')
+
+
+def pytest_unconfigure(config):
+    plugin = config.pluginmanager.get_plugin('duration_scheduler')
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import Counter
+import allure
+import pytest
+from source.helpers.work_with_api import API
+from source.helpers.work_with_results import ResultStore
+from source.helpers.work_with_stats import LatencyHistogram
+from source.helpers.work_with_phases import PHASES
+from source.helpers.work_with_timing import subscribe, unsubscribe
+
+
+class EndpointLatency(object):
+    """
+    Latency histogram, status codes and histograms of the transport phases of one endpoint
+    """
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.statuses = Counter()
+        self.phases = {}
+        self.new_connections = 0
+
+    def record(self, timing):
+        self.histogram.record(timing.elapsed_ms)
+        self.statuses[timing.status] += 1
+        if timing.phases is not None:
+            for phase in PHASES:
+                self.phases.setdefault(phase, LatencyHistogram()).record(getattr(timing.phases, phase))
+            self.new_connections += not timing.phases.reused
+
+    def to_dict(self) -> dict:
+        return {"histogram": self.histogram.to_dict(),
+                "statuses": [[status, count] for status, count in self.statuses.items()],
+                "phases": {phase: histogram.to_dict() for phase, histogram in self.phases.items()},
+                "new_connections": self.new_connections}
+
+    def merge_dict(self, data: dict):
+        self.histogram.merge(LatencyHistogram.from_dict(data["histogram"]))
+        for status, count in data["statuses"]:
+            self.statuses[status] += count
+        for phase, histogram in data["phases"].items():
+            self.phases.setdefault(phase, LatencyHistogram()).merge(LatencyHistogram.from_dict(histogram))
+        self.new_connections += data["new_connections"]
+
+
+def format_endpoints(endpoints: dict, with_bars: bool = False) -> str:
+    """
+    :param endpoints: dict (key: method and endpoint template, value: 'EndpointLatency')
+    :param with_bars: add the text histogram of every endpoint
+    :return: table of latencies in ms
+    """
+    lines = [f'{"endpoint":<32}{"count":>7}{"mean":>9}{"p50":>9}{"p90":>9}{"p99":>9}{"max":>9}  statuses']
+    for key in sorted(endpoints):
+        endpoint = endpoints[key]
+        summary = endpoint.histogram.summary()
+        statuses = ', '.join(f'{status}: {count}' for status, count in sorted(endpoint.statuses.items(), key=str))
+        lines.append(f'{key:<32}{summary["count"]:>7}{summary["mean_ms"]:>9.2f}{summary["p50_ms"]:>9.2f}'
+                     f'{summary["p90_ms"]:>9.2f}{summary["p99_ms"]:>9.2f}{summary["max_ms"]:>9.2f}  {statuses}')
+        if with_bars:
+            lines.append(endpoint.histogram.format_bars())
+    return '\n'.join(lines)
+
+
+def format_phases(endpoints: dict) -> str:
+    """
+    :param endpoints: dict (key: method and endpoint template, value: 'EndpointLatency')
+    :return: table of mean and p99 of the transport phases in ms
+    """
+    lines = [f'{"endpoint":<32}{"new conn":>9}' + ''.join(f'{phase + " mean/p99":>20}' for phase in PHASES)]
+    for key in sorted(endpoints):
+        endpoint = endpoints[key]
+        if not endpoint.phases:
+            continue
+        cells = ''.join(f'{endpoint.phases[phase].mean_ms:>11.2f}/{endpoint.phases[phase].percentile(99):<8.2f}'
+                        for phase in PHASES)
+        lines.append(f'{key:<32}{endpoint.new_connections:>9}{cells}')
+    return '\n'.join(lines) if len(lines) > 1 else ''
+
+
+class LatencyReport(object):
+    """
+    Plugin gathers the timings of all requests into per-endpoint histograms
+    """
+    def __init__(self, with_bars: bool = False, results_store: str = None, scenario: str = 'suite'):
+        """
+        :param results_store: SQLite file of 'ResultStore' the latencies of the session are saved into
+        :param scenario: scenario name of the saved run
+        """
+        self.with_bars = with_bars
+        self.results_store = results_store
+        self.scenario = scenario
+        self.endpoints = {}
+        self._lock = threading.Lock()
+        self._current_test = None
+        self._started = time.perf_counter()
+
+    def __call__(self, timing):
+        with self._lock:
+            self.endpoints.setdefault(timing.key, EndpointLatency()).record(timing)
+            if self._current_test is not None:
+                self._current_test.append(timing)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        with self._lock:
+            self._current_test = []
+        yield
+        with self._lock:
+            timings, self._current_test = self._current_test, None
+        if timings:
+            endpoints = {}
+            for timing in timings:
+                endpoints.setdefault(timing.key, EndpointLatency()).record(timing)
+            allure.attach(body=format_endpoints(endpoints, with_bars=True) + '\n\n' + format_phases(endpoints),
+                          name='request_latency', attachment_type=allure.attachment_type.TEXT)
+
+    def pytest_sessionfinish(self, session):
+        workeroutput = getattr(session.config, 'workeroutput', None)
+        if workeroutput is not None:
+            workeroutput['latency_report'] = {key: endpoint.to_dict() for key, endpoint in self.endpoints.items()}
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        """
+        Merges the latency of the xdist worker into the summary of the controller
+        """
+        for key, data in getattr(node, 'workeroutput', {}).get('latency_report', {}).items():
+            with self._lock:
+                self.endpoints.setdefault(key, EndpointLatency()).merge_dict(data)
+
+    def pytest_terminal_summary(self, terminalreporter, config):
+        if self.endpoints:
+            terminalreporter.section('Request latency, ms')
+            terminalreporter.write_line(format_endpoints(self.endpoints, with_bars=self.with_bars))
+            phases = format_phases(self.endpoints)
+            if phases:
+                terminalreporter.section('Request phases, ms')
+                terminalreporter.write_line(phases)
+            if self.results_store:
+                run_id = self.save_results(config)
+                terminalreporter.write_line(f'Saved as run {run_id} into {self.results_store}')
+
+    def save_results(self, config) -> str:
+        """
+        :return: id of the run in the results store
+        """
+        base_url = 'emulator' if getattr(config, 'character_service', None) is not None else API.base_url
+        store = ResultStore(self.results_store)
+        try:
+            return store.save_run(self.scenario, base_url,
+                                  {key: endpoint.histogram for key, endpoint in self.endpoints.items()},
+                                  duration_s=time.perf_counter() - self._started)
+        finally:
+            store.close()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no_latency_report", action="store_true", default=False,
+        help="Do not gather the latency of requests"
+    )
+    parser.addoption(
+        "--latency_histograms", action="store_true", default=False,
+        help="Show the text histogram of every endpoint in the latency summary"
+    )
+    parser.addoption(
+        "--results_store", action="store", default=None,
+        help="SQLite file the latencies of the session are saved into, see 'python -m source.load.results'"
+    )
+    parser.addoption(
+        "--results_scenario", action="store", default="suite", help="Scenario name of the saved latencies"
+    )
+
+
+def pytest_configure(config):
+    if not config.getoption("--no_latency_report"):
+        report = LatencyReport(with_bars=config.getoption("--latency_histograms"),
+                               results_store=config.getoption("--results_store"),
+                               scenario=config.getoption("--results_scenario"))
+        subscribe(report)
+        config.pluginmanager.register(report, 'latency_report')
+
+
+def pytest_unconfigure(config):
+    report = config.pluginmanager.get_plugin('latency_report')
+    if report is not None:
+        unsubscribe(report)
+        config.pluginmanager.unregister(report)
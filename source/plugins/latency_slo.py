@@ -0,0 +1,150 @@
+import allure
+import pytest
+from source.helpers.work_with_api import API
+from source.helpers.work_with_stats import LatencyHistogram
+
+SLO_KEYS = ('p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms')
+
+SLO_STASH = pytest.StashKey()
+
+
+def parse_slo(values: dict) -> dict:
+    """
+    :param values: kwargs of the 'latency' marker or values of a line of the 'latency_slo' ini setting
+    :return: dict (key: one of 'SLO_KEYS' or 'repeat', value: budget in ms or count of repeats)
+    """
+    slo = {}
+    for key, value in values.items():
+        if key == 'repeat':
+            slo[key] = int(value)
+        elif key in SLO_KEYS:
+            slo[key] = float(value)
+        else:
+            raise pytest.UsageError(f'Unknown latency SLO "{key}", expected repeat or one of {SLO_KEYS}')
+    return slo
+
+
+def parse_groups(lines: list) -> dict:
+    """
+    :param lines: lines like 'test_http_functional: p95_ms=300 max_ms=1000 repeat=10'
+    :return: dict (key: marker, value: SLO of the tests with this marker)
+    """
+    groups = {}
+    for line in lines:
+        marker, _, values = line.partition(':')
+        try:
+            groups[marker.strip()] = parse_slo(dict(value.split('=', 1) for value in values.split()))
+        except ValueError:
+            raise pytest.UsageError(f'Wrong latency_slo line "{line}"')
+    return groups
+
+
+def breaches(histogram: LatencyHistogram, slo: dict) -> list:
+    """
+    :return: descriptions of the budgets exceeded by the histogram
+    """
+    summary = histogram.summary()
+    found = []
+    for key in SLO_KEYS:
+        if key in slo:
+            actual = summary["max_ms"] if key == 'max_ms' else histogram.percentile(float(key[1:-3]))
+            if actual > slo[key]:
+                found.append(f'{key} {actual:.2f} > {slo[key]:.2f}')
+    return found
+
+
+class LatencySLO(object):
+    """
+    Plugin repeats the GET and HEAD requests of a passed test which has a latency SLO
+    and fails the test if the distribution of their latencies exceeds the budgets.
+    The repeats are not published into the latency report and the live metrics;
+    the answers of a replayed cassette have no latency to check
+    """
+    def __init__(self, groups: dict, repeat: int):
+        """
+        :param groups: SLO of marker groups, see 'parse_groups'
+        :param repeat: count of repeats of every request if the SLO has no 'repeat'
+        """
+        self.groups = groups
+        self.repeat = repeat
+
+    def pytest_collection_modifyitems(self, items):
+        for item in items:
+            slo = {}
+            for marker, values in self.groups.items():
+                if item.get_closest_marker(marker) is not None:
+                    slo.update(values)
+            marker = item.get_closest_marker('latency')
+            if marker is not None:
+                slo.update(parse_slo(marker.kwargs))
+            if set(slo) & set(SLO_KEYS):
+                item.stash[SLO_STASH] = slo
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        slo = item.stash.get(SLO_STASH, None)
+        if slo is None or (API.cassette is not None and API.cassette.replaying):
+            yield
+            return
+        API.capture = []
+        try:
+            outcome = yield
+        finally:
+            captured, API.capture = API.capture, None
+        if outcome.excinfo is None and captured:
+            self.enforce(slo, captured)
+
+    def enforce(self, slo: dict, captured: list):
+        """
+        Repeats every distinct captured request bypassing the response cache
+        """
+        targets = {}
+        for method, args, kwargs in captured:
+            targets.setdefault(f'{method} {kwargs.get("url", args[0] if args else "")}', (method, args, kwargs))
+        report, failed = [], []
+        for target, (method, args, kwargs) in targets.items():
+            histogram = LatencyHistogram()
+            for _ in range(slo.get('repeat', self.repeat)):
+                histogram.record(API().send_uncached(method, *args, quiet=True, **dict(kwargs)).timing.elapsed_ms)
+            found = breaches(histogram, slo)
+            summary = histogram.summary()
+            report.append(f'{target}: count {summary["count"]}, p50 {summary["p50_ms"]:.2f}, '
+                          f'p95 {histogram.percentile(95):.2f}, max {summary["max_ms"]:.2f} ms'
+                          + (f'; SLO breached: {", ".join(found)}' if found else '') + '\n' + histogram.format_bars())
+            if found:
+                failed.append(f'{target}: {", ".join(found)}')
+        if failed:
+            allure.attach(body='\n\n'.join(report), name='latency_slo', attachment_type=allure.attachment_type.TEXT)
+            pytest.fail('Latency SLO is breached: ' + '; '.join(failed))
+
+
+def pytest_addoption(parser):
+    parser.addini(
+        "latency_slo", type="linelist", default=[],
+        help="Latency SLO of marker groups, e.g. 'test_http_functional: p95_ms=300 max_ms=1000 repeat=10'"
+    )
+    parser.addoption(
+        "--latency_slo", action="store_true", default=False,
+        help="Check the latency SLO of the tests with the 'latency' marker; "
+             "the lines of the latency_slo ini setting turn the check on too"
+    )
+    parser.addoption(
+        "--latency_repeat", action="store", type=int, default=20,
+        help="Count of repeats of every request of a test with a latency SLO"
+    )
+    parser.addoption(
+        "--no_latency_slo", action="store_true", default=False,
+        help="Do not check the latency SLO of the tests"
+    )
+
+
+def pytest_configure(config):
+    groups = parse_groups(config.getini("latency_slo"))
+    if (groups or config.getoption("--latency_slo")) and not config.getoption("--no_latency_slo"):
+        config.pluginmanager.register(LatencySLO(groups, config.getoption("--latency_repeat")), 'latency_slo')
+
+
+def pytest_unconfigure(config):
+    plugin = config.pluginmanager.get_plugin('latency_slo')
+    if plugin is not None:
+        config.pluginmanager.unregister(plugin)
@@ -0,0 +1,47 @@
+import pytest
+from source.helpers.work_with_metrics import MetricsExporter
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--metrics_port", action="store", type=int, default=None,
+        help="Serve the live metrics of the requests on http://127.0.0.1:<port>/metrics, 0 takes a free port; "
+             "xdist workers take the next ports"
+    )
+    parser.addoption(
+        "--metrics_jsonl", action="store", default=None,
+        help="Append the snapshots of the live metrics to the file as JSON lines; xdist workers add their id"
+    )
+    parser.addoption(
+        "--metrics_interval", action="store", type=float, default=5.0, help="Seconds between the snapshots"
+    )
+
+
+def pytest_configure(config):
+    port, jsonl = config.getoption("--metrics_port"), config.getoption("--metrics_jsonl")
+    if port is None and jsonl is None:
+        return
+    workerinput = getattr(config, 'workerinput', None)
+    if workerinput is not None:
+        if port:
+            port += 1 + int(workerinput['workerid'].lstrip('gw'))
+        if jsonl:
+            jsonl = f'{jsonl}.{workerinput["workerid"]}'
+    elif config.getoption("numprocesses", None):
+        return
+    config.metrics_exporter = MetricsExporter(port=port, jsonl=jsonl,
+                                              interval_s=config.getoption("--metrics_interval")).start()
+
+
+def pytest_report_header(config):
+    exporter = getattr(config, 'metrics_exporter', None)
+    if exporter is not None and exporter.server is not None:
+        return f'metrics: {exporter.server.url}'
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_unconfigure(config):
+    exporter = getattr(config, 'metrics_exporter', None)
+    if exporter is not None:
+        exporter.stop()
+        config.metrics_exporter = None
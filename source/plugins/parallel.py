@@ -0,0 +1,123 @@
+import os
+from contextlib import contextmanager
+import pytest
+from source.helpers.work_with_api import API
+from source.helpers.work_with_namespace import CharacterNamespace
+from source.helpers.work_with_timing import subscribe, unsubscribe
+from source.data.data_emulator import EMULATOR_COLLECTION_LIMIT
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SERIAL_FIXTURES = {"reset_database_before", "reset_database_after"}
+
+RESETS_FILE = 'characters.resets'
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--collection_budget", action="store", type=int, default=EMULATOR_COLLECTION_LIMIT,
+        help="Count of characters the tests may keep in the collection; it's shared equally between xdist workers"
+    )
+
+
+def pytest_configure(config):
+    workerinput = getattr(config, 'workerinput', None)
+    if workerinput is not None:
+        workers = int(workerinput.get('workercount') or os.environ.get('PYTEST_XDIST_WORKER_COUNT', 1))
+        config.character_namespace = CharacterNamespace(workerinput['workerid'],
+                                                        budget=config.getoption("--collection_budget") // workers)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Tests which reset the database go to the serial lane, and the lane is kept on one xdist worker
+    """
+    for item in items:
+        if item.get_closest_marker('serial') is None and SERIAL_FIXTURES & set(item.fixturenames):
+            item.add_marker(pytest.mark.serial)
+        if item.get_closest_marker('serial') is not None:
+            item.add_marker(pytest.mark.xdist_group('serial'))
+
+
+def resets_of_run(directory) -> int:
+    """
+    :param directory: directory of the lock shared by the xdist workers
+    :return: count of the resets of the database made by the serial tests of all workers
+    """
+    path = directory / RESETS_FILE
+    return int(path.read_text() or 0) if path.exists() else 0
+
+
+def sync_resets(namespace: CharacterNamespace, directory):
+    """
+    Drops the count of the characters of the worker if a serial test has reset the database since the last check
+    """
+    resets = resets_of_run(directory)
+    if resets != namespace.resets:
+        namespace.forget(resets)
+
+
+def record_reset(namespace: CharacterNamespace, directory):
+    """
+    Counts the reset made by a serial test of the worker; the exclusive lock must be held
+    """
+    resets = resets_of_run(directory) + 1
+    (directory / RESETS_FILE).write_text(str(resets))
+    namespace.forget(resets)
+
+
+@contextmanager
+def collection_lock(config, tmp_path_factory, serial: bool = False):
+    """
+    Under xdist holds the lock of the shared collection: the exclusive one for a serial test, the shared one
+    for the others. The counts of the namespace are dropped if the database was reset meanwhile.
+    Without xdist it does nothing
+    :return: namespace of the worker or None
+    """
+    namespace = getattr(config, 'character_namespace', None)
+    if namespace is None or fcntl is None:
+        yield None
+        return
+    directory = tmp_path_factory.getbasetemp().parent
+    with open(directory / 'characters.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if serial else fcntl.LOCK_SH)
+        try:
+            sync_resets(namespace, directory)
+            yield namespace
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@pytest.fixture(autouse=True)
+def character_lane(request, tmp_path_factory):
+    """
+    Under xdist a usual test works in the namespace of its worker and holds the shared lock.
+    A serial test holds the exclusive lock, so it runs when no other test works with the collection;
+    its resets of the database are counted for all workers
+    """
+    serial = request.node.get_closest_marker('serial') is not None
+    with collection_lock(request.config, tmp_path_factory, serial) as namespace:
+        if namespace is None:
+            yield
+            return
+        API.namespace = None if serial else namespace
+        resets = []
+
+        def count_reset(timing):
+            if timing.key == 'POST /reset' and timing.status == 200:
+                resets.append(timing)
+
+        if serial:
+            subscribe(count_reset)
+        try:
+            yield
+        finally:
+            API.namespace = None
+            if serial:
+                unsubscribe(count_reset)
+                if resets:
+                    record_reset(namespace, tmp_path_factory.getbasetemp().parent)
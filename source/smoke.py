@@ -0,0 +1,167 @@
+import argparse
+import sys
+import uuid
+import requests
+from source.helpers.work_with_api import API
+from source.helpers.work_with_asserting_respose import ParseResponse
+from source.helpers.work_with_schema import collect_violations, format_violations
+from source.data.schema import CHARACTER_SCHEMA, RESULT_SCHEMA
+from source.data.data_expected_bodies import DATA_STANDARD_CHARACTER
+
+
+class SmokeStep(object):
+    """
+    Result of one step of the probe
+    """
+    def __init__(self, name: str, passed: bool, elapsed_ms: float = None, details: str = ''):
+        self.name = name
+        self.passed = passed
+        self.elapsed_ms = elapsed_ms
+        self.details = details
+
+    def __str__(self):
+        elapsed = f'{self.elapsed_ms:9.2f} ms' if self.elapsed_ms is not None else ' ' * 12
+        line = f'{"PASS" if self.passed else "FAIL"}  {self.name:<26}{elapsed}'
+        return f'{line}  {self.details}' if self.details else line
+
+
+class SmokeProbe(object):
+    """
+    POST, GET, PUT, GET all, DELETE and reset of one probe character; the cycle stops on the first failed step
+    """
+    def __init__(self, login: str, password: str, reset: bool = True):
+        """
+        :param reset: reset the database at the end of the cycle
+        """
+        self.login = login
+        self.password = password
+        self.reset = reset
+        self.character = dict(DATA_STANDARD_CHARACTER[0]["result"], name=f'Smoke probe {uuid.uuid4().hex[:8]}')
+        self.changed = dict(self.character, weight=self.character["weight"] + 1)
+        self.planned = []
+
+    def steps(self) -> list:
+        """
+        :return: list of (step name, function sending the request, function checking the answer)
+        """
+        api = API()
+        steps = [
+            ('POST /character', lambda: api.post_character_by_body(json=self.character, login=self.login,
+                                                                   password=self.password),
+             lambda response: self.check_character(response, self.character)),
+            ('GET /character?name=', lambda: api.get_character_by_name(self.character["name"], self.login,
+                                                                        self.password),
+             lambda response: self.check_character(response, self.character)),
+            ('PUT /character', lambda: api.put_character_by_name(json=self.changed, login=self.login,
+                                                                 password=self.password),
+             lambda response: self.check_character(response, self.changed)),
+            ('GET /characters', lambda: api.get_all_characters(self.login, self.password), self.check_listing),
+            ('DELETE /character?name=', lambda: api.delete_character(self.character["name"], self.login,
+                                                                      self.password),
+             self.check_result),
+        ]
+        if self.reset:
+            steps.append(('POST /reset', lambda: api.delete_all_characters(self.login, self.password),
+                          self.check_result))
+        return steps
+
+    @staticmethod
+    def result_of(response):
+        """
+        :return: value of "result" of the JSON body or None
+        """
+        return response.body.get("result") if isinstance(response.body, dict) else None
+
+    @staticmethod
+    def check_character(response, expected: dict) -> str:
+        """
+        :return: description of the problem or an empty string
+        """
+        if response.status_code != 200:
+            return f'status {response.status_code}: {response.text[:200]}'
+        result = SmokeProbe.result_of(response)
+        violations = collect_violations(result, CHARACTER_SCHEMA)
+        if violations:
+            return format_violations(violations)
+        return '' if result == expected else f'unexpected character {result}'
+
+    def check_listing(self, response) -> str:
+        if response.status_code != 200:
+            return f'status {response.status_code}: {response.text[:200]}'
+        characters = self.result_of(response)
+        violations = collect_violations(characters, CHARACTER_SCHEMA)
+        if violations:
+            return format_violations(violations)
+        if isinstance(characters, list) and self.changed in characters:
+            return ''
+        return 'the changed character is not listed'
+
+    @staticmethod
+    def check_result(response) -> str:
+        if response.status_code != 200:
+            return f'status {response.status_code}: {response.text[:200]}'
+        violations = collect_violations(response.body, RESULT_SCHEMA)
+        return format_violations(violations) if violations else ''
+
+    def run(self) -> list:
+        """
+        Runs the steps, they are kept in 'planned'
+        :return: list of 'SmokeStep'
+        """
+        self.planned = self.steps()
+        deleting = [name for name, _, _ in self.planned].index('DELETE /character?name=')
+        results = []
+        for name, send, check in self.planned:
+            try:
+                response = send()
+                problem = check(response)
+            except (requests.RequestException, ValueError) as err:
+                results.append(SmokeStep(name, False, details=f'{type(err).__name__}: {err}'))
+                break
+            results.append(SmokeStep(name, not problem, response.timing.elapsed_ms, problem))
+            if problem:
+                break
+        if results and not results[-1].passed and len(results) <= deleting:
+            self.remove_character()
+        return results
+
+    def remove_character(self):
+        """
+        Deletes the probe character after a failed step, errors are ignored
+        """
+        try:
+            API().delete_character(self.character["name"], self.login, self.password)
+        except requests.RequestException:
+            pass
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m source.smoke',
+                                     description='One CRUD cycle against the characters service without pytest')
+    parser.add_argument('--login_auth', required=True)
+    parser.add_argument('--password_auth', required=True)
+    parser.add_argument('--base_url', default=None, help='Base URL of the service, e.g. http://127.0.0.1:8000/v2')
+    parser.add_argument('--no_reset', action='store_true', help='Do not reset the database at the end')
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """
+    :return: exit code: 0 if every step passed, 1 if a step failed (argparse exits with 2 on wrong arguments)
+    """
+    args = make_parser().parse_args(argv)
+    if args.base_url:
+        API.base_url = args.base_url.rstrip('/')
+    ParseResponse.verbose = False
+    probe = SmokeProbe(args.login_auth, args.password_auth, reset=not args.no_reset)
+    results = probe.run()
+    for step in results:
+        print(step)
+    passed = len(results) == len(probe.planned) and all(step.passed for step in results)
+    total = sum(step.elapsed_ms or 0.0 for step in results)
+    print(f'{"PASSED" if passed else "FAILED"} in {total:.2f} ms')
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -93,7 +93,8 @@ class TestAPI(object):
         """
         Check headers fields by GET method
         """
-        response = API().head_characters_page(login=login_auth, password=password_auth)
+        api = API()
+        response = api.head_characters_page(login=login_auth, password=password_auth)
         assert response.compare_status_code(200)
         headers = response.return_headers()
         for key in headers.keys():
@@ -107,7 +108,7 @@ class TestAPI(object):
                 case "Content-Length":
                     assert int(headers[key]) > 0
                 case "Connection":
-                    assert headers[key] == HEADERS["Connection"]
+                    assert headers[key] == api.headers["Connection"]
 
     @allure.feature('Тестирование API')
     @allure.step('Тест изменения поля существующего персонажа')
@@ -141,6 +142,7 @@ class TestAPI(object):
     @allure.story('Работа с со всеми экземплярами персонажей')
     @allure.step('Тест получения всех экземпляров персонажей')
     @pytest.mark.test_http_functional
+    @pytest.mark.serial
     def test_get_all_characters(self, login_auth, password_auth, delete_3_characters_same_time):
         """
         Tests GET all objects. The status is checked before the creation of 3 characters and after
@@ -376,6 +378,7 @@ class TestAPI(object):
     @allure.feature('Тестирование API')
     @allure.story('Проверки полей')
     @pytest.mark.test_http_functional
+    @pytest.mark.serial
     @pytest.mark.parametrize('data', DATA_STANDARD_CHARACTER)
     def test_reset_database(self, data, login_auth, password_auth, create_character):
         """
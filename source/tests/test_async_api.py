@@ -0,0 +1,153 @@
+import asyncio
+import pytest
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_async_api import AsyncAPI, AsyncConnection
+from source.helpers.work_with_payloads import PreparedPayload
+from source.helpers.work_with_session import SessionPool
+from source.helpers.work_with_namespace import CharacterNamespace
+from source.helpers.work_with_cleanup import CleanupRegistry
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY, DATA_CHANGED_NAME_FOR_PUT
+from source.data.data_expected_responses import RESPONSE_NO_SUCH_NAME_CHARACTER, RESPONSE_NEEDED_AUTHORIZATION
+
+
+def answer(raw: bytes, method: str = 'GET') -> tuple:
+    """
+    :param raw: bytes of the HTTP answer
+    :return: status code, headers, body and the flag of connection reusing read by 'AsyncAPI'
+    """
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await AsyncAPI._read_response(AsyncConnection(None, reader, None), method)
+
+    return asyncio.run(read())
+
+
+@allure.title('Тестирование асинхронного клиента')
+class TestAsyncAPI(object):
+    """
+    Class checks 'AsyncAPI' against the emulator
+    """
+
+    @allure.feature('Асинхронный клиент')
+    def test_name_requests_ignore_api_hooks(self, emulator_service, monkeypatch):
+        """
+        Tests that GET and DELETE by name work while the namespace and the cleanup of 'API' are set
+        """
+        monkeypatch.setattr(API, 'namespace', CharacterNamespace('gw0', budget=2))
+        monkeypatch.setattr(API, 'cleanup', CleanupRegistry(EMULATOR_LOGIN, EMULATOR_PASSWORD))
+        data = DATA_FOR_POST_CHARACTER_BY_BODY[0]
+
+        async def scenario():
+            async with AsyncAPI(limit=2) as api:
+                await api.post_character_by_body(EMULATOR_LOGIN, EMULATOR_PASSWORD, json=data)
+                found = await api.get_character_by_name(data["name"], EMULATOR_LOGIN, EMULATOR_PASSWORD)
+                deleted = await api.delete_character(data["name"], EMULATOR_LOGIN, EMULATOR_PASSWORD)
+                missing = await api.get_character_by_name(data["name"], EMULATOR_LOGIN, EMULATOR_PASSWORD)
+            return found, deleted, missing
+
+        found, deleted, missing = asyncio.run(scenario())
+        assert found.compare_status_code(200) and found.compare_body({"result": data})
+        assert deleted.compare_status_code(200)
+        assert missing.compare_status_code(400) and missing.compare_body(RESPONSE_NO_SUCH_NAME_CHARACTER)
+        assert not API.cleanup.pending
+
+    @allure.feature('Асинхронный клиент')
+    def test_character_coroutines(self, emulator_service):
+        """
+        Tests every coroutine of the characters endpoints through one keep-alive connection
+        """
+        data, changed = DATA_FOR_POST_CHARACTER_BY_BODY[0], dict(DATA_FOR_POST_CHARACTER_BY_BODY[0], weight=1)
+
+        async def scenario():
+            async with AsyncAPI(limit=1) as api:
+                responses = [await api.post_character_by_body(EMULATOR_LOGIN, EMULATOR_PASSWORD, json=data),
+                             await api.put_character_by_name(EMULATOR_LOGIN, EMULATOR_PASSWORD, json=changed),
+                             await api.get_character_by_name(data["name"], EMULATOR_LOGIN, EMULATOR_PASSWORD),
+                             await api.get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD),
+                             await api.head_characters_page(EMULATOR_LOGIN, EMULATOR_PASSWORD),
+                             await api.delete_character(data["name"], EMULATOR_LOGIN, EMULATOR_PASSWORD),
+                             await api.delete_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD),
+                             await api.get_all_characters('wrong', 'wrong')]
+                idle = [len(connections) for connections in api._pool._idle.values()]
+            return responses, idle, api._pool._idle
+
+        responses, idle, idle_after_close = asyncio.run(scenario())
+        posted, put, got, listing, head, deleted, reset, unauthorized = responses
+        assert posted.compare_status_code(200) and posted.compare_body({"result": data})
+        assert put.compare_status_code(200) and put.compare_body({"result": changed})
+        assert got.compare_status_code(200) and got.compare_body({"result": changed})
+        assert listing.compare_status_code(200) and listing.compare_body({"result": [changed]})
+        assert head.compare_status_code(200) and head.response.content == b''
+        assert deleted.compare_status_code(200) and reset.compare_status_code(200)
+        assert unauthorized.compare_status_code(401) and unauthorized.compare_body(RESPONSE_NEEDED_AUTHORIZATION)
+        assert idle == [1] and not idle_after_close
+
+    @allure.feature('Асинхронный клиент')
+    def test_request_coroutines(self, emulator_service):
+        """
+        Tests the coroutines of the HTTP methods with a prepared body and without keep-alive
+        """
+        payload = PreparedPayload(DATA_CHANGED_NAME_FOR_PUT[0]["result"])
+        auth = (EMULATOR_LOGIN, EMULATOR_PASSWORD)
+
+        async def scenario():
+            api = AsyncAPI(limit=2, keep_alive=False)
+            headers = payload.headers(api.headers)
+            try:
+                responses = [await api.post_request(url=api.raw_url, headers=headers, auth=auth, json=payload),
+                             await api.put_request(url=api.raw_url, headers=headers, auth=auth, json=payload),
+                             await api.get_request(url=api.raw_url + 's', headers=api.headers, auth=auth),
+                             await api.head_request(url=api.raw_url + 's', headers=api.headers, auth=auth),
+                             await api.delete_request(url=api.make_url(payload.name), headers=api.headers,
+                                                      auth=auth),
+                             await api.request('GET', api.make_url(payload.name), headers=api.headers, auth=auth)]
+                idle = sum(len(connections) for connections in api._pool._idle.values())
+            finally:
+                await api.close()
+            return responses, idle
+
+        (posted, put, listing, head, deleted, missing), idle = asyncio.run(scenario())
+        assert posted.compare_status_code(200) and posted.compare_body({"result": payload.fields})
+        assert put.compare_status_code(200)
+        assert listing.count_all_characters() == 1 and head.compare_status_code(200)
+        assert deleted.compare_status_code(200)
+        assert missing.compare_status_code(400) and missing.compare_body(RESPONSE_NO_SUCH_NAME_CHARACTER)
+        assert idle == 0
+
+    @allure.feature('Асинхронный клиент')
+    def test_keep_alive_argument(self, monkeypatch):
+        """
+        Tests that the explicit keep-alive mode wins over the mode of the shared session
+        """
+        monkeypatch.setattr(SessionPool, '_session', None)
+        SessionPool.open(keep_alive=True)
+        try:
+            assert AsyncAPI(keep_alive=False).headers["Connection"] == 'close'
+            assert AsyncAPI().headers["Connection"] == 'keep-alive'
+            SessionPool.open(keep_alive=False)
+            assert AsyncAPI(keep_alive=True).headers["Connection"] == 'keep-alive'
+            assert AsyncAPI().headers["Connection"] == 'close'
+        finally:
+            SessionPool.close()
+        assert AsyncAPI().headers["Connection"] == 'keep-alive'
+
+    @allure.feature('Асинхронный клиент')
+    @pytest.mark.parametrize('raw, method, expected', [
+        (b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}', 'GET', (200, b'{}', True)),
+        (b'HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n3;ext=1\r\n{"a\r\n4\r\n": 1\r\n1\r\n}\r\n'
+         b'0\r\nTrailer: x\r\n\r\n', 'GET', (200, b'{"a": 1}', True)),
+        (b'HTTP/1.1 200 OK\r\nConnection: close\r\n\r\nuntil the end', 'GET', (200, b'until the end', False)),
+        (b'HTTP/1.1 200 OK\r\n\r\nno length', 'GET', (200, b'no length', False)),
+        (b'HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n', 'HEAD', (200, b'', True)),
+        (b'HTTP/1.1 204 No Content\r\n\r\n', 'DELETE', (204, b'', True)),
+    ], ids=['content-length', 'chunked', 'close', 'no-length', 'head', 'no-content'])
+    def test_response_framing(self, raw, method, expected):
+        """
+        Tests reading of the body by Content-Length, by chunks and till the end of the connection
+        """
+        status_code, headers, content, reusable = answer(raw, method)
+        assert (status_code, content, reusable) == expected
@@ -0,0 +1,59 @@
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_bulk import BulkCharacters
+from source.helpers.work_with_fields import WorkCharacters
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY, DATA_FOR_MANY_CHARS_MANIPULATIONS
+
+
+@allure.title('Тестирование пакетных операций с персонажами')
+class TestBulkCharacters(object):
+    """
+    Class checks the concurrent writes of many characters and their verification
+    """
+
+    @allure.feature('Пакетные операции')
+    def test_partial_failures(self, emulator_service):
+        """
+        Tests that every name gets its own response and only the posted characters are verified as present
+        """
+        bulk = BulkCharacters(EMULATOR_LOGIN, EMULATOR_PASSWORD, workers=3)
+        payloads = DATA_FOR_POST_CHARACTER_BY_BODY[:3]
+        verified = bulk.create_and_verify(payloads)
+        assert sorted(verified) == sorted(payload["name"] for payload in payloads)
+        assert sorted(verified.values()) == [False, True, True]
+        responses = bulk.create_characters([payload for payload in payloads if verified[payload["name"]]])
+        assert all(response.compare_status_code(400) for response in responses.values())
+        deleted = bulk.delete_characters([payload["name"] for payload in payloads])
+        assert sorted(response.status_code for response in deleted.values()) == [200, 200, 400]
+        assert bulk.verify_characters(absent=list(deleted)) == {name: True for name in deleted}
+
+    @allure.feature('Пакетные операции')
+    def test_single_and_listing_verification(self, emulator_service, recorded_timings):
+        """
+        Tests that one character is verified by GET of its name and several ones by one listing
+        """
+        bulk = BulkCharacters(EMULATOR_LOGIN, EMULATOR_PASSWORD)
+        first, second = DATA_FOR_POST_CHARACTER_BY_BODY[:2]
+        bulk.create_characters([first])
+        del recorded_timings[:]
+        assert bulk.verify_characters(present=[first]) == {first["name"]: True}
+        assert bulk.verify_characters(absent=[second["name"]]) == {second["name"]: True}
+        assert bulk.verify_characters(present=[first], absent=[second["name"]]) == \
+            {first["name"]: True, second["name"]: True}
+        assert bulk.verify_characters(present=[dict(first, height=1)], absent=[first["name"]]) == \
+            {first["name"]: False}
+        assert [timing.key for timing in recorded_timings] == ['GET /character?name=', 'GET /character?name=',
+                                                               'GET /characters', 'GET /characters']
+        assert bulk.verify_characters() == {}
+
+    @allure.feature('Пакетные операции')
+    def test_count_with_existing_character(self, emulator_service, monkeypatch):
+        """
+        Tests that a character which exists already does not fail the count after creating
+        """
+        monkeypatch.setattr(emulator_service.storage, 'limit', len(DATA_FOR_MANY_CHARS_MANIPULATIONS))
+        existing = DATA_FOR_MANY_CHARS_MANIPULATIONS[0]["result"]
+        API().post_character_by_body(json=existing, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        count = WorkCharacters().count_after_create_chars(EMULATOR_LOGIN, EMULATOR_PASSWORD)
+        assert count == len(DATA_FOR_MANY_CHARS_MANIPULATIONS)
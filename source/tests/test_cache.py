@@ -0,0 +1,35 @@
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_cache import ResponseCache
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY
+
+
+@allure.title('Тестирование кэша ответов')
+class TestResponseCache(object):
+    """
+    Class checks the client cache of the answers
+    """
+
+    @allure.feature('Кэш ответов')
+    def test_response_cache(self, emulator_service, monkeypatch, recorded_timings):
+        """
+        Tests that repeated reads are answered by the cache and writes of the same client invalidate them
+        """
+        monkeypatch.setattr(API, 'cache', ResponseCache(max_size=2, ttl_s=60))
+        data = DATA_FOR_POST_CHARACTER_BY_BODY[0]
+        for _ in range(2):
+            assert API().get_character_by_name(data["name"], EMULATOR_LOGIN, EMULATOR_PASSWORD) \
+                .compare_status_code(400)
+        API().post_character_by_body(json=data, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        for _ in range(2):
+            response = API().get_character_by_name(data["name"], EMULATOR_LOGIN, EMULATOR_PASSWORD)
+            assert response.compare_body({"result": data})
+            assert API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD).count_all_characters() == 1
+        API().delete_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD)
+        assert API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD).count_all_characters() == 0
+        assert [timing.key for timing in recorded_timings] == ['GET /character?name=', 'POST /character',
+                                                               'GET /character?name=', 'GET /characters',
+                                                               'POST /reset', 'GET /characters']
+        stats = API.cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (3, 4, 1)
@@ -0,0 +1,60 @@
+import pytest
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_asserting_respose import ParseResponse
+from source.helpers.work_with_fields import WorkCharacters
+from source.load.capacity import CapacityBenchmark, capacity_payload, scaling_exponent, main
+from source.data.schema import CHARACTER_SCHEMA
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+
+
+@allure.title('Тестирование замера ёмкости коллекции')
+class TestCapacityBenchmark(object):
+    """
+    Class checks the benchmark of latencies against the size of the collection
+    """
+
+    @allure.feature('Ёмкость коллекции')
+    def test_capacity_benchmark(self, emulator_service):
+        """
+        Tests that the benchmark fills the collection up to the limit with valid boundary payloads
+        """
+        payloads = [capacity_payload(number) for number in range(350)]
+        assert WorkCharacters.validate_fields(payloads, CHARACTER_SCHEMA)
+        assert len({payload["name"] for payload in payloads}) == len(payloads)
+        steps = CapacityBenchmark(EMULATOR_LOGIN, EMULATOR_PASSWORD, limit=2, step=1, samples=2).run()
+        assert [step.size for step in steps] == [1, 2]
+        assert [step.operations["delete"].total for step in steps] == [1, 2]
+        assert all(step.errors == 0 for step in steps)
+        assert [step.ttfb.total for step in steps] == [2, 2]
+        assert API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD).count_all_characters() == 0
+        assert round(scaling_exponent([100, 200, 400], [3.0, 6.0, 12.0]), 6) == 1.0
+
+    @allure.feature('Ёмкость коллекции')
+    def test_failed_recreate(self, emulator_service, monkeypatch):
+        """
+        Tests that a character which is not created again after DELETE is counted as an error
+        and is not requested anymore
+        """
+        benchmark = CapacityBenchmark(EMULATOR_LOGIN, EMULATOR_PASSWORD, limit=1, step=1, samples=1)
+        assert benchmark.fill_to(1) == 1
+        post = API.post_character_by_body
+        monkeypatch.setattr(API, 'post_character_by_body',
+                            lambda api, login, password, **kwargs: post(api, login, 'wrong', **kwargs))
+        step = benchmark.measure(1)
+        assert step.errors == 1 and benchmark.created == []
+
+    @allure.feature('Ёмкость коллекции')
+    def test_failed_listing(self, emulator_service, monkeypatch, capsys):
+        """
+        Tests that a failed listing stops the benchmark with its status instead of a KeyError
+        """
+        with pytest.raises(RuntimeError, match='failed with 401'):
+            CapacityBenchmark(EMULATOR_LOGIN, 'wrong', limit=1, step=1, samples=1).run()
+        monkeypatch.setattr(ParseResponse, 'verbose', ParseResponse.verbose)
+        assert main(['--base_url', emulator_service.base_url, '--login_auth', EMULATOR_LOGIN,
+                     '--password_auth', 'wrong', '--limit', '1', '--step', '1']) == 1
+        assert 'failed with 401' in capsys.readouterr().err
+        assert main(['--base_url', emulator_service.base_url]) == 2
+        assert main(['--emulator', '--limit', '2', '--step', '1', '--samples', '1']) == 0
+        assert 'Latencies are in ms' in capsys.readouterr().out
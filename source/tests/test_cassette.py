@@ -0,0 +1,43 @@
+import pytest
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_cassette import Cassette, CassetteMiss
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY
+
+
+@allure.title('Тестирование записи и воспроизведения трафика')
+class TestCassette(object):
+    """
+    Class checks the cassette of HTTP traffic
+    """
+
+    @allure.feature('Кассеты')
+    def test_cassette_replay(self, emulator_service, monkeypatch, tmp_path):
+        """
+        Tests that the recorded answers are replayed in order without the service
+        """
+        path = str(tmp_path / 'characters.jsonl')
+        monkeypatch.setattr(API, 'cassette', Cassette(path, mode='record'))
+        recorded = [API().post_character_by_body(json=DATA_FOR_POST_CHARACTER_BY_BODY[0], login=EMULATOR_LOGIN,
+                                                 password=EMULATOR_PASSWORD),
+                    API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD),
+                    API().delete_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD),
+                    API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD)]
+        API.cassette.close()
+        with open(path, encoding='utf-8') as file:
+            content = file.read()
+        assert EMULATOR_PASSWORD not in content and '"Date"' not in content
+        emulator_service.stop()
+        monkeypatch.setattr(API, 'cassette', Cassette(path, mode='replay'))
+        replayed = [API().post_character_by_body(json=DATA_FOR_POST_CHARACTER_BY_BODY[0], login='other',
+                                                 password='other'),
+                    API().get_all_characters('other', 'other'),
+                    API().delete_all_characters('other', 'other'),
+                    API().get_all_characters('other', 'other')]
+        for expected, response in zip(recorded, replayed):
+            assert response.compare_status_code(expected.status_code)
+            assert response.compare_body(expected.body)
+        with pytest.raises(CassetteMiss):
+            API().get_character_by_name('Nobody', 'other', 'other')
+        API.cassette.close()
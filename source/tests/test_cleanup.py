@@ -0,0 +1,59 @@
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_cleanup import CleanupRegistry
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY
+
+
+@allure.title('Тестирование отложенной очистки')
+class TestCleanupRegistry(object):
+    """
+    Class checks the deferred batched removal of the characters created by the tests
+    """
+
+    @allure.feature('Очистка')
+    def test_cleanup_registry(self, emulator_service, monkeypatch, recorded_timings):
+        """
+        Tests that registered characters live till their name or the listing is requested, and a big batch
+        is removed by the reset
+        """
+        names = [data["name"] for data in DATA_FOR_POST_CHARACTER_BY_BODY[:2]]
+        registry = CleanupRegistry(EMULATOR_LOGIN, EMULATOR_PASSWORD, reset_threshold=2)
+        monkeypatch.setattr(API, 'cleanup', registry)
+        for data in DATA_FOR_POST_CHARACTER_BY_BODY[:2]:
+            API().post_character_by_body(json=data, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        registry.register(names + names[:1])
+        assert len(registry.pending) == 2
+        response = API().get_character_by_name(names[0], EMULATOR_LOGIN, EMULATOR_PASSWORD)
+        assert response.compare_status_code(400)
+        assert list(registry.pending) == [(None, names[1])]
+        assert API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD).count_all_characters() == 0
+        assert not registry.pending and not registry.failed
+        for data in DATA_FOR_POST_CHARACTER_BY_BODY[:2]:
+            API().post_character_by_body(json=data, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        registry.register(names)
+        del recorded_timings[:]
+        assert registry.flush(reset=True) == {name: True for name in names}
+        assert [timing.key for timing in recorded_timings] == ['POST /reset', 'GET /characters']
+
+    @allure.feature('Очистка')
+    def test_listing_keeps_own_characters(self, emulator_service, monkeypatch, recorded_timings):
+        """
+        Tests that the listing in the middle of a test deletes the pending batch by name even if it is big enough
+        for the reset, so the character the test has just created stays
+        """
+        monkeypatch.setattr(emulator_service.storage, 'limit', 3)
+        names = [data["name"] for data in DATA_FOR_POST_CHARACTER_BY_BODY[:2]]
+        registry = CleanupRegistry(EMULATOR_LOGIN, EMULATOR_PASSWORD, reset_threshold=2)
+        monkeypatch.setattr(API, 'cleanup', registry)
+        for data in DATA_FOR_POST_CHARACTER_BY_BODY[:2]:
+            API().post_character_by_body(json=data, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        registry.register(names)
+        mine = DATA_FOR_POST_CHARACTER_BY_BODY[2]
+        assert API().post_character_by_body(json=mine, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD) \
+            .compare_status_code(200)
+        del recorded_timings[:]
+        response = API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD)
+        assert response.compare_body({"result": [mine]})
+        assert 'POST /reset' not in [timing.key for timing in recorded_timings]
+        assert not registry.pending and not registry.failed
@@ -0,0 +1,41 @@
+import allure
+from source.helpers.work_with_api import API
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY
+from source.data.data_expected_responses import RESPONSE_FULL_DB, RESPONSE_INVALID_POST_JSON, RESPONSE_WRONG_FIELD
+
+
+@allure.title('Тестирование эмулятора сервиса персонажей')
+class TestEmulator(object):
+    """
+    Class checks the behaviour of the emulator which is not covered by 'TestAPI'
+    """
+
+    @allure.feature('Эмулятор')
+    def test_full_collection(self, emulator_service):
+        """
+        Tests that the collection can't contain more items than the limit
+        """
+        for data in DATA_FOR_POST_CHARACTER_BY_BODY[:2]:
+            response = API().post_character_by_body(json=data, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+            assert response.compare_status_code(200)
+        response = API().post_character_by_body(json=DATA_FOR_POST_CHARACTER_BY_BODY[2], login=EMULATOR_LOGIN,
+                                                password=EMULATOR_PASSWORD)
+        assert response.compare_status_code(400)
+        assert response.compare_body(RESPONSE_FULL_DB)
+        response = API().delete_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD)
+        assert response.compare_status_code(200)
+        assert API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD).count_all_characters() == 0
+
+    @allure.feature('Эмулятор')
+    def test_wrong_payloads(self, emulator_service):
+        """
+        Tests error bodies of invalid JSON and invalid fields
+        """
+        response = API().post_character_by_body(data='{', login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        assert response.compare_status_code(400)
+        assert response.compare_body(RESPONSE_INVALID_POST_JSON)
+        response = API().post_character_by_body(json={"weight": "heavy"}, login=EMULATOR_LOGIN,
+                                                password=EMULATOR_PASSWORD)
+        assert response.compare_status_code(400)
+        assert response.compare_body(RESPONSE_WRONG_FIELD)
@@ -0,0 +1,113 @@
+import json
+import pytest
+import allure
+from copy import deepcopy
+from jsonschema import ValidationError
+from source.helpers.work_with_fields import WorkCharacters
+from source.helpers.work_with_schema import collect_violations, get_validator
+from source.helpers.work_with_stream import iter_result_items, CollectionAudit
+from source.helpers.work_with_duplicates import DuplicateIndex, normalize_name
+from source.helpers.work_with_corpus import CORPUS
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY
+from source.data.schema import CHARACTER_SCHEMA
+
+
+@allure.title('Тестирование логики работы с полями персонажей')
+class TestWorkCharacters(object):
+    """
+    Class checks the helpers of 'WorkCharacters' without the service
+    """
+
+    @allure.feature('Валидация полей')
+    def test_validator_is_cached(self):
+        """
+        Tests that the schema is compiled once
+        """
+        assert get_validator(CHARACTER_SCHEMA) is get_validator(CHARACTER_SCHEMA)
+
+    @allure.feature('Валидация полей')
+    def test_all_violations_are_collected(self):
+        """
+        Tests that validation of a list reports every bad character
+        """
+        payload = deepcopy(DATA_FOR_POST_CHARACTER_BY_BODY)
+        payload[0]["height"] = 0
+        payload[2]["name"] = ""
+        payload[2]["weight"] = "heavy"
+        violations = collect_violations(payload, CHARACTER_SCHEMA)
+        assert list(violations) == ["Hawkeye", "#2"]
+        assert len(violations["#2"]) == 2
+        with pytest.raises(ValidationError, match='2 invalid record'):
+            WorkCharacters.validate_fields(payload, CHARACTER_SCHEMA)
+        assert WorkCharacters.validate_fields(DATA_FOR_POST_CHARACTER_BY_BODY, CHARACTER_SCHEMA)
+
+    @allure.feature('Потоковый разбор')
+    @pytest.mark.parametrize('chunk_size', [1, 13, 4096])
+    def test_stream_parsing_and_audit(self, chunk_size):
+        """
+        Tests that characters are parsed from any chunks and audited in one pass
+        """
+        payload = DATA_FOR_POST_CHARACTER_BY_BODY + [DATA_FOR_POST_CHARACTER_BY_BODY[0]]
+        raw_body = json.dumps({"result": payload}, ensure_ascii=False).encode('utf-8')
+        chunks = [raw_body[index:index + chunk_size] for index in range(0, len(raw_body), chunk_size)]
+        audit = CollectionAudit(CHARACTER_SCHEMA)
+        for character in iter_result_items(chunks):
+            audit.add(character)
+        assert audit.count == 4
+        assert audit.duplicates == {"Hawkeye": 2}
+        assert audit.violations == {}
+        assert audit.index.by_name["Hawkeye"] == 2 and audit.index.hashes == {} and audit.index.by_content == {}
+        with pytest.raises(ValueError):
+            audit.index.diff(DuplicateIndex().add_all(payload))
+
+    @allure.feature('Поиск дубликатов')
+    def test_duplicate_index(self):
+        """
+        Tests exact, normalized and content duplicates
+        """
+        payload = deepcopy(DATA_FOR_POST_CHARACTER_BY_BODY)
+        payload.append(dict(payload[0], name=" HAWKEYE "))
+        payload.append(dict(payload[1], name="Spider+Man", height=178.0))
+        assert normalize_name("Sabretooth+(House  of M)") == "sabretooth (house of m)"
+        assert WorkCharacters().find_duplicate_characters(payload)
+        assert not WorkCharacters().find_duplicate_characters(payload, normalized=True)
+        index = DuplicateIndex(fields=("education", "height", "identity", "universe")).add_all(payload)
+        assert index.near_duplicates() == {"hawkeye": ["Hawkeye", " HAWKEYE "]}
+        assert sorted(map(sorted, index.content_duplicates().values())) == \
+            [[" HAWKEYE ", "Hawkeye"], ["Spider+Man", "Spider-Man"]]
+
+    @allure.feature('Поиск дубликатов')
+    def test_snapshots_diff(self):
+        """
+        Tests the difference between two snapshots of the collection
+        """
+        older = DuplicateIndex().add_all(DATA_FOR_POST_CHARACTER_BY_BODY[:2])
+        newer_payload = deepcopy(DATA_FOR_POST_CHARACTER_BY_BODY[1:])
+        newer_payload[0]["identity"] = "Publicly known"
+        diff = older.diff(DuplicateIndex().add_all(newer_payload))
+        assert diff.as_dict() == {"added": ["Iron-Man"], "removed": ["Hawkeye"], "changed": ["Spider-Man"]}
+
+    @allure.feature('Поиск дубликатов')
+    def test_snapshots_diff_of_repeated_names(self):
+        """
+        Tests that a change of any of the characters with the same name is found
+        """
+        repeated = [dict(DATA_FOR_POST_CHARACTER_BY_BODY[0], height=height) for height in (190, 180)]
+        newer_payload = deepcopy(repeated)
+        newer_payload[0]["height"] = 200
+        older = DuplicateIndex().add_all(repeated)
+        assert older.diff(DuplicateIndex().add_all(newer_payload)).changed == [repeated[0]["name"]]
+        assert not older.diff(DuplicateIndex().add_all(repeated[::-1]))
+
+    @allure.feature('Подготовленные тела запросов')
+    def test_prepared_payloads(self):
+        """
+        Tests that prepared bytes are the same as the serialized fields, also after renaming
+        """
+        for name, prepared in CORPUS.payloads.items():
+            assert json.loads(prepared.body) == prepared.fields, name
+            assert prepared.content_headers["Content-Length"] == str(len(prepared.body))
+        assert list(json.loads(CORPUS["wrong_order"].body)) == list(CORPUS["wrong_order"].fields)
+        renamed = CORPUS["standard"].renamed('Wolverine "Logan" 2')
+        assert json.loads(renamed.body) == dict(CORPUS["standard"].fields, name='Wolverine "Logan" 2')
+        assert renamed.headers({"Connection": "close"})["Content-Length"] == str(len(renamed.body))
@@ -0,0 +1,39 @@
+import json
+import allure
+import requests
+from source.helpers.work_with_api import API
+from source.helpers.work_with_fields import WorkCharacters
+from source.helpers.work_with_metrics import MetricsExporter
+from source.data.schema import CHARACTER_SCHEMA
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY
+
+
+@allure.title('Тестирование живых метрик')
+class TestMetricsExporter(object):
+    """
+    Class checks the live metrics of the requests
+    """
+
+    @allure.feature('Метрики')
+    def test_metrics_exporter(self, emulator_service, tmp_path):
+        """
+        Tests that the requests of 'API' and the schema validation are served for Prometheus and written as snapshots
+        """
+        exporter = MetricsExporter(port=0, jsonl=str(tmp_path / 'metrics.jsonl'), interval_s=60).start()
+        try:
+            data = DATA_FOR_POST_CHARACTER_BY_BODY[0]
+            API().post_character_by_body(json=data, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+            response = API().get_character_by_name(data["name"], EMULATOR_LOGIN, EMULATOR_PASSWORD)
+            assert WorkCharacters.validate_fields(response.return_body(), CHARACTER_SCHEMA)
+            API().delete_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD)
+            text = requests.get(exporter.server.url).text
+        finally:
+            exporter.stop()
+        assert 'characters_api_requests_total{method="POST",endpoint="/character",status="200"} 1' in text
+        assert 'characters_api_requests_in_flight 0' in text
+        assert 'characters_api_schema_validation_seconds_count 1' in text
+        snapshot = json.loads((tmp_path / 'metrics.jsonl').read_text().splitlines()[-1])
+        endpoint = snapshot["endpoints"]["GET /character?name="]
+        assert endpoint["window_requests"] == 1 and endpoint["bytes_received"] > 0
+        assert snapshot["endpoints"]["POST /character"]["bytes_sent"] > 0
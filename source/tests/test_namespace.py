@@ -0,0 +1,46 @@
+import pytest
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_namespace import CharacterNamespace, NamespaceBudgetExceeded
+from source.plugins.parallel import record_reset, sync_resets
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY
+
+
+@allure.title('Тестирование пространств имен воркеров')
+class TestCharacterNamespace(object):
+    """
+    Class checks the count of the characters of a worker across the resets of the database
+    """
+
+    @allure.feature('Пространства имен')
+    def test_reset_drops_count(self, emulator_service, monkeypatch):
+        """
+        Tests that the reset of the database lets the worker post its whole budget again
+        """
+        monkeypatch.setattr(API, 'namespace', CharacterNamespace('gw0', budget=1))
+        first, second = DATA_FOR_POST_CHARACTER_BY_BODY[:2]
+        API().post_character_by_body(json=first, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        with pytest.raises(NamespaceBudgetExceeded):
+            API().post_character_by_body(json=second, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        assert API().delete_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD).compare_status_code(200)
+        assert API.namespace.live == 0
+        assert API().post_character_by_body(json=second, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD) \
+            .compare_status_code(200)
+
+    @allure.feature('Пространства имен')
+    def test_serial_reset_of_other_worker(self, tmp_path):
+        """
+        Tests that the reset recorded by the serial test of one worker drops the count of another one once
+        """
+        serial, other = CharacterNamespace('gw0', budget=2), CharacterNamespace('gw1', budget=2)
+        serial.live, other.live = 1, 2
+        sync_resets(other, tmp_path)
+        assert other.live == 2
+        record_reset(serial, tmp_path)
+        assert serial.live == 0 and serial.resets == 1
+        sync_resets(other, tmp_path)
+        assert other.live == 0 and other.resets == 1
+        other.reserve()
+        sync_resets(other, tmp_path)
+        assert other.live == 1
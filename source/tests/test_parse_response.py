@@ -0,0 +1,81 @@
+import pytest
+import allure
+from source.helpers.work_with_asserting_respose import ParseResponse
+from source.helpers.work_with_raw_response import RawRequest
+
+
+class StubResponse(object):
+    """
+    Answer with the fields 'ParseResponse' uses, which counts the reads of its body
+    """
+    def __init__(self, content: bytes, status_code: int = 200):
+        self.request = RawRequest('GET', 'http://127.0.0.1/v2/characters')
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self._content = content
+        self.reads = 0
+
+    @property
+    def content(self) -> bytes:
+        self.reads += 1
+        return self._content
+
+    @property
+    def text(self) -> str:
+        self.reads += 1
+        return self._content.decode('utf-8')
+
+
+@allure.title('Тестирование разбора ответов')
+class TestParseResponse(object):
+    """
+    Class checks the lazy decoding and the lean mode of the parsed answers
+    """
+
+    @allure.feature('Разбор ответов')
+    def test_lazy_decoding(self, capsys):
+        """
+        Tests that the body and the text are decoded on the first access only and once
+        """
+        stub = StubResponse(b'{"result": [{"name": "Hawkeye"}]}')
+        response = ParseResponse(stub, verbose=False)
+        assert stub.reads == 0
+        assert response.body == response.body == {"result": [{"name": "Hawkeye"}]}
+        assert response.text == response.text == '{"result": [{"name": "Hawkeye"}]}'
+        assert stub.reads == 2
+        assert response.count_all_characters() == 1
+        assert capsys.readouterr().out == ''
+
+    @allure.feature('Разбор ответов')
+    def test_lean_mode(self, capsys):
+        """
+        Tests that the lean mode prints the data of the request only when a comparison fails
+        """
+        response = ParseResponse(StubResponse(b'{"error": "No such name"}', status_code=400), verbose=False)
+        assert response.compare_status_code(400) and response.compare_body({"error": "No such name"})
+        assert response.compare_raw_text('{"error": "No such name"}')
+        assert capsys.readouterr().out == ''
+        assert not response.compare_status_code(200)
+        printed = capsys.readouterr().out
+        assert 'Data of executed request' in printed and '"200"' in printed
+        assert not response.compare_body({"result": []})
+        assert 'Data of executed request' in capsys.readouterr().out
+
+    @allure.feature('Разбор ответов')
+    def test_verbose_mode(self, capsys):
+        """
+        Tests that the verbose mode prints the data of every request
+        """
+        ParseResponse(StubResponse(b'{"result": []}'), verbose=True)
+        assert 'Callable URL: http://127.0.0.1/v2/characters' in capsys.readouterr().out
+
+    @allure.feature('Разбор ответов')
+    def test_not_json_body(self, capsys):
+        """
+        Tests that a body which is not JSON is None and can't be returned as a JSON body
+        """
+        response = ParseResponse(StubResponse(b'<html>Bad Gateway</html>', status_code=502), verbose=False)
+        assert response.body is None and response.text == '<html>Bad Gateway</html>'
+        with pytest.raises(TypeError):
+            response.return_body()
+        assert capsys.readouterr().out == ''
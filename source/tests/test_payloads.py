@@ -0,0 +1,34 @@
+import pytest
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_corpus import CORPUS
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_responses import RESPONSE_FIELD_LENGTH_ERROR
+
+
+@allure.title('Тестирование отправки подготовленных тел запросов')
+class TestPreparedPayloads(object):
+    """
+    Class checks that 'API' sends the prepared bytes of the corpus as they are
+    """
+
+    @allure.feature('Подготовленные тела запросов')
+    @pytest.mark.parametrize('width, status_code', [(1, 200), (350, 200), (0, 400), (351, 400)])
+    def test_boundary_bytes(self, emulator_service, width, status_code):
+        """
+        Tests that POST and PUT send the bytes and Content-Length of the payload and the service stores its fields
+        """
+        payload = CORPUS.boundary(width)
+        response = API().post_character_by_body(json=payload, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        request = response.response.request
+        assert request.body == payload.body
+        assert request.headers["Content-Length"] == payload.content_headers["Content-Length"]
+        assert response.compare_status_code(status_code)
+        if status_code != 200:
+            assert response.compare_body(RESPONSE_FIELD_LENGTH_ERROR)
+            return
+        assert response.compare_body({"result": payload.fields})
+        response = API().put_character_by_name(EMULATOR_LOGIN, EMULATOR_PASSWORD, json=payload)
+        assert response.response.request.body == payload.body and response.compare_status_code(200)
+        assert API().get_character_by_name(payload.name, EMULATOR_LOGIN, EMULATOR_PASSWORD) \
+            .compare_body({"result": payload.fields})
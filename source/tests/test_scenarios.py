@@ -0,0 +1,67 @@
+import pytest
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_scenario import Scenario, Step, Ref, ScenarioError
+from source.load.scenarios import ScenarioLoad
+from source.data.data_scenarios import SCENARIOS
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+
+
+@allure.title('Тестирование бизнес-сценариев')
+class TestScenarios(object):
+    """
+    Class runs the declarative scenarios of 'data_scenarios' as functional tests
+    """
+
+    @allure.feature('Сценарии')
+    @allure.story('Сценарии из нескольких запросов')
+    @pytest.mark.test_http_functional
+    @pytest.mark.parametrize('scenario', SCENARIOS, ids=[scenario.name for scenario in SCENARIOS])
+    def test_scenario(self, scenario, login_auth, password_auth):
+        """
+        Test of every step of the scenario
+        :param scenario: 'Scenario' of 'data_scenarios'
+        """
+        result = scenario.run(login_auth, password_auth, suffix=f' ({scenario.name})')
+        if result.leftovers and API.cleanup is not None:
+            API.cleanup.register(result.leftovers)
+        allure.attach(body=result.report(), name='scenario_steps', attachment_type=allure.attachment_type.TEXT)
+        assert result.passed, result.report()
+
+    @allure.feature('Сценарии')
+    @allure.story('Движок сценариев')
+    def test_failed_step_stops_scenario(self, login_auth, password_auth):
+        """
+        Tests that the run stops on the first unexpected answer and reports the characters it left
+        """
+        with pytest.raises(ScenarioError):
+            Step('put')
+        payload = Ref('DATA_FOR_POST_CHARACTER_BY_BODY', 2)
+        scenario = Scenario('wrong_status', [Step('post', payload, status=400), Step('delete', payload)])
+        result = scenario.run(login_auth, password_auth, suffix=' (wrong_status)')
+        if API.cleanup is not None:
+            API.cleanup.register(result.leftovers)
+        assert not result.passed
+        assert [step.status for step in result.steps] == [200]
+        assert result.leftovers == ['Iron-Man (wrong_status)']
+
+
+@allure.title('Тестирование сценариев под нагрузкой')
+class TestScenarioLoad(object):
+    """
+    Class checks the scenarios run by the virtual users
+    """
+
+    @allure.feature('Сценарии')
+    @allure.story('Сценарии как виртуальные пользователи')
+    def test_scenario_load(self, emulator_service):
+        """
+        Tests that the virtual users pass the scenarios and every step gets its histogram
+        """
+        load = ScenarioLoad(EMULATOR_LOGIN, EMULATOR_PASSWORD, users=1)
+        report = load.run_closed(0.3)
+        iterations = load.iterations_report()
+        assert iterations.total >= len(load.scenarios)
+        assert all(stats.errors == 0 for stats in iterations.endpoints.values())
+        assert report.total > iterations.total and not load.leftovers
+        assert API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD).count_all_characters() == 0
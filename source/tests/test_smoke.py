@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from pathlib import Path
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_asserting_respose import ParseResponse
+from source.smoke import SmokeProbe, main
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+
+
+@allure.title('Тестирование смоук-проверки')
+class TestSmokeProbe(object):
+    """
+    Class checks the smoke probe which runs without pytest
+    """
+
+    @allure.feature('Смоук-проверка')
+    def test_smoke_probe(self, emulator_service):
+        """
+        Tests that the smoke probe passes the CRUD cycle and its startup does not import the pytest stack
+        """
+        steps = SmokeProbe(EMULATOR_LOGIN, EMULATOR_PASSWORD).run()
+        assert [step.name for step in steps if step.passed] == ['POST /character', 'GET /character?name=',
+                                                                'PUT /character', 'GET /characters',
+                                                                'DELETE /character?name=', 'POST /reset']
+        code = 'import sys, source.smoke; print(sorted({"pytest", "allure", "colorama"} & set(sys.modules)))'
+        imported = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                  cwd=Path(__file__).resolve().parents[2])
+        assert imported.stdout.strip() == '[]'
+
+    @allure.feature('Смоук-проверка')
+    def test_failed_step(self, emulator_service, monkeypatch, capsys):
+        """
+        Tests that a step failed before DELETE stops the cycle, the probe character is removed and the exit code is 1
+        """
+        monkeypatch.setattr(SmokeProbe, 'check_listing', lambda probe, response: 'broken listing')
+        monkeypatch.setattr(ParseResponse, 'verbose', ParseResponse.verbose)
+        assert main(['--login_auth', EMULATOR_LOGIN, '--password_auth', EMULATOR_PASSWORD, '--no_reset']) == 1
+        output = capsys.readouterr().out
+        assert 'broken listing' in output and 'FAILED' in output and 'DELETE' not in output
+        assert API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD).count_all_characters() == 0
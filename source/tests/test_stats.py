@@ -0,0 +1,189 @@
+import pytest
+import allure
+from source.helpers.work_with_stats import LatencyHistogram
+from source.helpers.work_with_limiter import AdaptiveLimiter
+from source.helpers.work_with_results import ResultStore, compare_runs
+from source.load.workers import merge_snapshots
+from source.load.generator import EndpointStats
+from source.helpers.work_with_api import API
+from source.helpers.work_with_metrics import MetricsRegistry
+from source.plugins.latency_slo import LatencySLO, parse_groups, breaches
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.plugins.durations import work_units, lpt_order, lpt_shards, history_id
+
+
+@allure.title('Тестирование гистограммы задержек')
+class TestLatencyHistogram(object):
+    """
+    Class checks the precision of the latency histogram
+    """
+
+    @allure.feature('Гистограмма задержек')
+    @pytest.mark.parametrize('percent', [50, 90, 99, 99.9])
+    def test_percentile_precision(self, percent):
+        """
+        Tests that percentiles fit into the relative precision of the buckets
+        """
+        histogram = LatencyHistogram(precision=0.01)
+        for value in range(1, 10001):
+            histogram.record(value / 10)
+        expected = percent * 10
+        assert abs(histogram.percentile(percent) - expected) <= expected * 0.01 + 0.1
+
+    @allure.feature('Гистограмма задержек')
+    def test_summary_of_empty_and_outliers(self):
+        """
+        Tests the empty histogram and values out of the tracked range
+        """
+        histogram = LatencyHistogram(highest_ms=1000.0)
+        assert histogram.summary()["p99_ms"] == 0.0
+        histogram.record(5000.0)
+        histogram.record(0.001)
+        assert histogram.summary()["count"] == 2
+        assert histogram.percentile(100) == 5000.0
+        assert histogram.percentile(50) <= histogram.lowest_ms
+
+
+    @allure.feature('Гистограмма задержек')
+    def test_merge_worker_snapshots(self):
+        """
+        Tests that snapshots of load processes merge into the same stats as one process would gather
+        """
+        single, workers = EndpointStats(), [EndpointStats(), EndpointStats()]
+        for value in range(1, 2001):
+            status = 200 if value % 10 else 'ConnectionError'
+            single.record(value / 10, status)
+            workers[value % 2].record(value / 10, status)
+        merged = merge_snapshots([{"get": stats.to_dict()} for stats in workers])["get"]
+        assert merged.histogram.summary() == single.histogram.summary()
+        assert merged.statuses == single.statuses and merged.errors == 200
+
+
+@allure.title('Тестирование хранилища результатов')
+class TestResultStore(object):
+    """
+    Class checks the stored runs and their comparison
+    """
+
+    @allure.feature('Сравнение запусков')
+    def test_compare_runs(self, tmp_path):
+        """
+        Tests that the shift of latencies is a regression and the noise of the same distribution is not
+        """
+        histograms = [LatencyHistogram() for _ in range(3)]
+        for value in range(1, 1001):
+            histograms[0].record(value / 100)
+            histograms[1].record((value * 7 % 1000 + 1) / 100)
+            histograms[2].record(value / 100 * 1.5)
+        store = ResultStore(str(tmp_path / 'results.db'))
+        runs = [store.save_run('suite', 'emulator', {"GET /characters": histogram}, duration_s=10.0, commit='abc')
+                for histogram in histograms]
+        assert [run["run_id"] for run in store.runs(scenario='suite')] == runs
+        baseline, same, slower = (store.load_run(run_id) for run_id in runs)
+        store.close()
+        assert baseline["GET /characters"]["histogram"].summary() == histograms[0].summary()
+        assert not any(row["regression"] for row in compare_runs(baseline, same))
+        verdicts = {row["metric"]: row["regression"] for row in compare_runs(baseline, slower)}
+        assert verdicts == {"p50_ms": True, "p99_ms": True, "throughput": False}
+
+
+@allure.title('Тестирование адаптивного ограничения параллельности')
+class TestAdaptiveLimiter(object):
+    """
+    Class checks the AIMD steps of the limiter
+    """
+
+    @allure.feature('Адаптивное ограничение')
+    def test_increase_and_backoff(self):
+        """
+        Tests that healthy answers grow the limit, and a burst of 5xx halves it only once
+        """
+        limiter = AdaptiveLimiter(initial=2, max_limit=8)
+        for _ in range(20):
+            limiter.release(limiter.acquire(), elapsed_ms=1.0)
+        limit = limiter.limit
+        assert limit == 6
+        burst = [limiter.acquire() for _ in range(limit)]
+        for sent in burst:
+            limiter.release(sent, failed=True)
+        assert limiter.limit == limit // 2
+        assert [change.reason for change in limiter.history][-1] == 'failure'
+
+    @allure.feature('Адаптивное ограничение')
+    def test_latency_spike(self):
+        """
+        Tests that a latency far above the baseline drops the limit
+        """
+        limiter = AdaptiveLimiter(initial=4, latency_floor_ms=1.0)
+        for _ in range(5):
+            limiter.release(limiter.acquire(), elapsed_ms=2.0)
+        limit = limiter.limit
+        limiter.release(limiter.acquire(), elapsed_ms=50.0)
+        assert limiter.limit == limit // 2
+        assert limiter.history[-1].reason == 'latency'
+
+
+@allure.title('Тестирование SLO задержек')
+class TestLatencySLO(object):
+    """
+    Class checks the budgets of the latency SLO
+    """
+
+    @allure.feature('SLO задержек')
+    def test_breaches(self):
+        """
+        Tests that the marker groups are parsed and only the exceeded budgets are reported
+        """
+        groups = parse_groups(['test_http_functional: p95_ms=50 max_ms=100 repeat=5'])
+        assert groups == {"test_http_functional": {"p95_ms": 50.0, "max_ms": 100.0, "repeat": 5}}
+        histogram = LatencyHistogram()
+        for elapsed_ms in [10.0] * 99 + [150.0]:
+            histogram.record(elapsed_ms)
+        found = breaches(histogram, groups["test_http_functional"])
+        assert len(found) == 1 and found[0].startswith('max_ms')
+        with pytest.raises(pytest.UsageError):
+            parse_groups(['test_http_functional: p42_ms=1'])
+
+    @allure.feature('SLO задержек')
+    def test_repeats_are_quiet(self, emulator_service, recorded_timings):
+        """
+        Tests that the repeats of the SLO check reach the service but not the latency report and the metrics
+        """
+        registry = MetricsRegistry().install()
+        api = API()
+        captured = [('GET', (), {"url": api.raw_url + 's', "headers": api.headers,
+                                 "auth": (EMULATOR_LOGIN, EMULATOR_PASSWORD)})]
+        try:
+            with pytest.raises(pytest.fail.Exception, match='max_ms'):
+                LatencySLO({}, repeat=3).enforce({"max_ms": 0.0}, captured)
+        finally:
+            registry.uninstall()
+        assert recorded_timings == [] and registry.endpoints == {}
+
+
+@allure.title('Тестирование порядка тестов по длительности')
+class TestDurationOrder(object):
+    """
+    Class checks the longest first order of the tests
+    """
+
+    @allure.feature('Порядок тестов по длительности')
+    def test_serial_lane_keeps_order(self):
+        """
+        Tests that the heaviest units go first and the serial lane keeps the order of its tests
+        """
+        class Item(object):
+            def __init__(self, nodeid, group=None):
+                self.nodeid = nodeid
+                self.group = group
+
+            def get_closest_marker(self, name):
+                return pytest.mark.xdist_group(self.group).mark if self.group else None
+
+        durations = {"reset_1": 0.1, "fast": 0.2, "reset_2": 0.3, "slow": 0.5}
+        items = [Item('reset_1', 'serial'), Item('fast'), Item('reset_2@serial', 'serial'), Item('slow')]
+        units = work_units(items)
+        weights = [sum(durations[history_id(item.nodeid)] for item in unit) for unit in units]
+        ordered = [item.nodeid for index in lpt_order(weights) for item in units[index]]
+        assert ordered == ['slow', 'reset_1', 'reset_2@serial', 'fast']
+        assert lpt_shards([5, 4, 3, 3, 3], 2) == [8, 10]
@@ -0,0 +1,63 @@
+import pytest
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_fields import WorkCharacters
+from source.helpers.work_with_namespace import CharacterNamespace
+from source.helpers.work_with_cassette import Cassette
+from source.data.schema import CHARACTER_SCHEMA
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+from source.data.data_expected_bodies import DATA_FOR_POST_CHARACTER_BY_BODY
+
+
+@allure.title('Тестирование потокового списка персонажей')
+class TestCharacterStream(object):
+    """
+    Class checks the streamed GET of all characters against the emulator
+    """
+
+    @allure.feature('Потоковый разбор')
+    def test_stream_is_timed(self, emulator_service, recorded_timings):
+        """
+        Tests that the streamed listing is audited and its request is timed like the others
+        """
+        for data in DATA_FOR_POST_CHARACTER_BY_BODY[:2]:
+            API().post_character_by_body(json=data, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        audit = WorkCharacters().audit_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD, CHARACTER_SCHEMA)
+        assert audit.count == 2 and audit.is_valid
+        with API().get_all_characters_stream(EMULATOR_LOGIN, EMULATOR_PASSWORD) as stream:
+            names = [character["name"] for character in stream.iter_characters()]
+        assert names == [data["name"] for data in DATA_FOR_POST_CHARACTER_BY_BODY[:2]]
+        assert stream.timing.status == 200 and stream.timing.phases is not None
+        assert [timing.key for timing in recorded_timings][-2:] == ['GET /characters', 'GET /characters']
+
+    @allure.feature('Потоковый разбор')
+    @pytest.mark.parametrize('chunk_size', [1, 5, 16384])
+    def test_stream_in_namespace(self, emulator_service, monkeypatch, chunk_size):
+        """
+        Tests that the suffix of the namespace is stripped from the streamed body, even split between chunks
+        """
+        monkeypatch.setattr(API, 'namespace', CharacterNamespace('gw0', budget=2))
+        for data in DATA_FOR_POST_CHARACTER_BY_BODY[:2]:
+            API().post_character_by_body(json=data, login=EMULATOR_LOGIN, password=EMULATOR_PASSWORD)
+        assert all(character["name"].endswith(' [gw0]') for character in emulator_service.storage.all())
+        with API().get_all_characters_stream(EMULATOR_LOGIN, EMULATOR_PASSWORD, chunk_size=chunk_size) as stream:
+            characters = list(stream.iter_characters())
+        assert characters == DATA_FOR_POST_CHARACTER_BY_BODY[:2]
+
+    @allure.feature('Потоковый разбор')
+    def test_stream_is_replayed(self, emulator_service, monkeypatch, tmp_path):
+        """
+        Tests that the streamed listing is recorded into the cassette and replayed without the service
+        """
+        path = str(tmp_path / 'stream.jsonl')
+        API().post_character_by_body(json=DATA_FOR_POST_CHARACTER_BY_BODY[0], login=EMULATOR_LOGIN,
+                                     password=EMULATOR_PASSWORD)
+        monkeypatch.setattr(API, 'cassette', Cassette(path, mode='record'))
+        with API().get_all_characters_stream(EMULATOR_LOGIN, EMULATOR_PASSWORD) as stream:
+            recorded = list(stream.iter_characters())
+        API.cassette.close()
+        emulator_service.stop()
+        monkeypatch.setattr(API, 'cassette', Cassette(path, mode='replay'))
+        with API().get_all_characters_stream(EMULATOR_LOGIN, EMULATOR_PASSWORD, chunk_size=7) as stream:
+            assert list(stream.iter_characters()) == recorded == DATA_FOR_POST_CHARACTER_BY_BODY[:1]
+        API.cassette.close()
@@ -0,0 +1,57 @@
+import pytest
+import allure
+from source.helpers.work_with_api import API
+from source.helpers.work_with_session import SessionPool
+from source.data.data_emulator import EMULATOR_LOGIN, EMULATOR_PASSWORD
+
+
+@allure.title('Тестирование фаз запросов')
+class TestRequestPhases(object):
+    """
+    Class checks the transport phases of the requests
+    """
+
+    @allure.feature('Фазы запросов')
+    def test_request_phases(self, emulator_service):
+        """
+        Tests that a new connection has the connect phase and the reused one of the session pool has not
+        """
+        response = API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD)
+        assert not response.phases.reused and response.phases.connect > 0
+        assert response.phases.ttfb > 0
+        assert response.phases.dns + response.phases.connect + response.phases.ttfb + response.phases.download \
+            <= response.timing.elapsed_ms
+        if SessionPool.current() is None:
+            SessionPool.open()
+            try:
+                API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD)
+                response = API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD)
+            finally:
+                SessionPool.close()
+            assert response.phases.reused and response.phases.connect == 0
+
+
+@allure.title('Тестирование счётчика соединений')
+class TestConnectionCounter(object):
+    """
+    Class checks the counters of the session pool
+    """
+
+    @allure.feature('Пул сессий')
+    @pytest.mark.parametrize('keep_alive, reused', [(True, 2), (False, 0)])
+    def test_opened_sockets(self, emulator_service, monkeypatch, keep_alive, reused):
+        """
+        Tests that every new socket is counted as opened, so nothing is reused without keep-alive
+        """
+        monkeypatch.setattr(SessionPool, '_session', None)
+        monkeypatch.setattr(SessionPool, '_keep_alive', True)
+        before = SessionPool.stats()
+        SessionPool.open(keep_alive=keep_alive)
+        try:
+            for _ in range(3):
+                assert API().get_all_characters(EMULATOR_LOGIN, EMULATOR_PASSWORD).compare_status_code(200)
+        finally:
+            SessionPool.close()
+        after = SessionPool.stats()
+        assert after["requests"] - before["requests"] == 3
+        assert (after["requests"] - before["requests"]) - (after["opened"] - before["opened"]) == reused